@@ -28,7 +28,6 @@ License: MIT (Educational Use)
 """
 
 import asyncio
-import hashlib
 import json
 import logging
 import math
@@ -41,6 +40,21 @@ from enum import Enum
 import numpy as np
 from collections import defaultdict, deque
 
+try:
+    from .pseudonymization import (
+        DEFAULT_ROTATION,
+        STUDENT_NAMESPACE,
+        PseudonymizationService,
+        get_default_pseudonymizer,
+    )
+except ImportError:
+    from src.analytics.pseudonymization import (
+        DEFAULT_ROTATION,
+        STUDENT_NAMESPACE,
+        PseudonymizationService,
+        get_default_pseudonymizer,
+    )
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -98,7 +112,7 @@ class PrivacyPreservingSession:
 
     # Pseudonymized identifiers (salted hash, no reverse lookup)
     session_hash: str  # SHA-256 with daily salt
-    learner_pseudonym: str  # Consistent within day, changes daily
+    learner_pseudonym: str  # Same as the connector's player id, rotates with it
 
     # Bucketed temporal data
     start_time_bucket: str  # Hour-level precision only
@@ -122,9 +136,18 @@ class PrivacyRespectingAnalytics:
     while ensuring complete FERPA compliance and student privacy protection.
     """
 
-    def __init__(self, privacy_level: AnalyticsLevel = AnalyticsLevel.EDUCATIONAL):
+    def __init__(
+        self,
+        privacy_level: AnalyticsLevel = AnalyticsLevel.EDUCATIONAL,
+        pseudonymizer: Optional[PseudonymizationService] = None,
+        pseudonym_rotation: str = DEFAULT_ROTATION,
+    ):
         self.privacy_level = privacy_level
-        self.daily_salt = self._generate_daily_salt()
+        # Shared with the Canvas connector (one key and cache); learner
+        # pseudonyms are the connector's student pseudonyms, so pass the
+        # connector's rotation
+        self.pseudonymizer = pseudonymizer or get_default_pseudonymizer()
+        self.pseudonym_rotation = pseudonym_rotation
 
         # Anonymized data storage (no PII ever stored)
         self.aggregated_metrics: Dict[str, AnonymizedLearningMetrics] = {}
@@ -148,17 +171,17 @@ class PrivacyRespectingAnalytics:
             f"🔒 Privacy-Respecting Analytics initialized at {privacy_level.value} level"
         )
 
-    def _generate_daily_salt(self) -> str:
-        """Generate salt that changes daily for pseudonymization"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        return hashlib.sha256(f"eagle_adventures_salt_{today}".encode()).hexdigest()[
-            :16
-        ]
-
     def _pseudonymize_id(self, user_id: str) -> str:
-        """Create pseudonymized ID that changes daily"""
-        combined = f"{user_id}_{self.daily_salt}"
-        return hashlib.sha256(combined.encode()).hexdigest()[:16]
+        """Create pseudonymized ID (the student's pseudonym for this epoch)"""
+        return self.pseudonymizer.pseudonymize(
+            user_id, namespace=STUDENT_NAMESPACE, granularity=self.pseudonym_rotation
+        )
+
+    def pseudonymize_ids(self, user_ids: List[str]) -> List[str]:
+        """Batch version of ``_pseudonymize_id`` for full-roster processing"""
+        return self.pseudonymizer.pseudonymize_many(
+            user_ids, namespace=STUDENT_NAMESPACE, granularity=self.pseudonym_rotation
+        )
 
     def _add_differential_privacy_noise(
         self, value: float, sensitivity: float = 1.0
@@ -396,7 +419,7 @@ class PrivacyRespectingAnalytics:
             "privacy_level": self.privacy_level.value,
             "ferpa_compliant": True,
             "pii_storage": "none",
-            "pseudonymization": "daily_rotating_salt",
+            "pseudonymization": f"keyed_blake2b_{self.pseudonym_rotation}_epoch",
             "differential_privacy": f"epsilon={self.epsilon}, delta={self.delta}",
             "k_anonymity_threshold": self.min_group_size,
             "data_retention": "automatic_expiration",
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared Pseudonymization Service
+===============================
+
+Keyed-hash pseudonyms for student identifiers, shared by the Canvas live
+connector and the privacy-respecting analytics system (one key, one set of
+hasher prototypes and memo caches per process).
+
+Both derive student pseudonyms in ``STUDENT_NAMESPACE`` with the
+connector's configured rotation (monthly by default), so an analytics
+learner pseudonym equals the connector's player id for the same student.
+
+Identifiers stored before this service used unkeyed SHA-256 formulas;
+``legacy_pseudonyms`` reproduces them and ``migration_map`` maps them to
+the current pseudonyms so stored records can be rewritten.
+
+Features:
+- Keyed BLAKE2b (no reverse lookup without the secret key)
+- Salt epochs ("day", "month" or "static") derived from the key, so
+  rotation needs no stored salts
+- Per-epoch hasher prototypes: hashing an ID is one ``copy``/``update``
+- Bounded LRU memo cache per namespace, granularity and epoch
+- Batch API for hashing a full roster at once
+
+FERPA Compliance:
+- Only pseudonyms are cached; the mapping is lost when the process exits
+- Pseudonyms rotate with the epoch unless the granularity is "static"
+
+Author: AI Agent Development Team
+License: MIT (Educational Use)
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EPOCH_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+# Used only when no key is configured; set PSEUDONYM_SECRET_KEY in production
+_FALLBACK_SECRET = b"eagle_adventures_salt"
+
+# Student pseudonyms shared by the connector and analytics
+STUDENT_NAMESPACE = "student"
+DEFAULT_ROTATION = "month"
+
+
+def legacy_pseudonyms(user_id: Any, now: Optional[datetime] = None) -> Tuple[str, str]:
+    """
+    Connector player id and analytics learner id of the unkeyed scheme
+
+    Player ids were ``sha256("student_<id>_<YYYY-MM>")`` and learner ids
+    ``sha256("<id>_<daily salt>")``, both truncated to 16 hex digits.
+    """
+    now = now or datetime.now()
+    player_id = hashlib.sha256(
+        f"student_{user_id}_{now.strftime('%Y-%m')}".encode()
+    ).hexdigest()[:16]
+    daily_salt = hashlib.sha256(
+        f"eagle_adventures_salt_{now.strftime('%Y-%m-%d')}".encode()
+    ).hexdigest()[:16]
+    learner_id = hashlib.sha256(f"{user_id}_{daily_salt}".encode()).hexdigest()[:16]
+    return player_id, learner_id
+
+
+def legacy_email_hash(email: str) -> str:
+    """Email hash of the unkeyed scheme (``sha256(email)``, 16 hex digits)"""
+    return hashlib.sha256(email.encode()).hexdigest()[:16] if email else ""
+
+
+class PseudonymizationService:
+    """
+    Keyed BLAKE2b pseudonymization with a memo cache per salt epoch.
+
+    ``namespace`` separates identifier spaces (students, emails, analytics
+    learners) so the same raw value yields unrelated pseudonyms in each.
+    """
+
+    def __init__(
+        self,
+        secret_key: Optional[Union[str, bytes]] = None,
+        digest_size: int = 8,
+        cache_size: int = 100_000,
+    ):
+        secret_key = secret_key or os.getenv("PSEUDONYM_SECRET_KEY")
+        if not secret_key:
+            logger.warning(
+                "🔒 No PSEUDONYM_SECRET_KEY configured, using development fallback key"
+            )
+            secret_key = _FALLBACK_SECRET
+        if isinstance(secret_key, str):
+            secret_key = secret_key.encode()
+
+        # BLAKE2b keys are limited to 64 bytes; longer secrets are condensed
+        if len(secret_key) > 64:
+            secret_key = hashlib.blake2b(secret_key).digest()
+
+        self._secret_key = secret_key
+        self.digest_size = digest_size
+        self.cache_size = cache_size
+
+        # Keyed by (namespace, granularity, epoch)
+        self._hashers: Dict[Tuple[str, str, str], Any] = {}
+        self._caches: Dict[Tuple[str, str, str], "OrderedDict[str, str]"] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def epoch_key(granularity: str = "month", now: Optional[datetime] = None) -> str:
+        """Salt epoch label for the given rotation granularity"""
+        if granularity == "static":
+            return "static"
+        if granularity not in EPOCH_FORMATS:
+            raise ValueError(f"Unknown pseudonym rotation granularity: {granularity}")
+        return (now or datetime.now()).strftime(EPOCH_FORMATS[granularity])
+
+    def _epoch_state(
+        self, namespace: str, granularity: str, now: Optional[datetime] = None
+    ):
+        """Hasher prototype and memo cache for the current epoch of a namespace"""
+        epoch = self.epoch_key(granularity, now)
+        state_key = (namespace, granularity, epoch)
+        hasher = self._hashers.get(state_key)
+        if hasher is None:
+            # Drop previous epochs of this namespace and granularity; their
+            # pseudonyms are stale. Other granularities keep their state.
+            for stale_key in [
+                k for k in self._hashers if k[:2] == (namespace, granularity)
+            ]:
+                del self._hashers[stale_key]
+                del self._caches[stale_key]
+
+            epoch_secret = hashlib.blake2b(
+                f"{namespace}|{epoch}".encode(), key=self._secret_key
+            ).digest()
+            hasher = hashlib.blake2b(key=epoch_secret, digest_size=self.digest_size)
+            self._hashers[state_key] = hasher
+            self._caches[state_key] = OrderedDict()
+
+        return hasher, self._caches[state_key]
+
+    def pseudonymize(
+        self,
+        value: Any,
+        namespace: str = STUDENT_NAMESPACE,
+        granularity: str = DEFAULT_ROTATION,
+        now: Optional[datetime] = None,
+    ) -> str:
+        """Pseudonym (hex) for a single identifier"""
+        hasher, cache = self._epoch_state(namespace, granularity, now)
+        return self._lookup(hasher, cache, str(value))
+
+    def pseudonymize_many(
+        self,
+        values: Iterable[Any],
+        namespace: str = STUDENT_NAMESPACE,
+        granularity: str = DEFAULT_ROTATION,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Pseudonyms for many identifiers sharing one namespace and epoch"""
+        hasher, cache = self._epoch_state(namespace, granularity, now)
+        return [self._lookup(hasher, cache, str(value)) for value in values]
+
+    def _lookup(self, hasher, cache: "OrderedDict[str, str]", raw: str) -> str:
+        pseudonym = cache.get(raw)
+        if pseudonym is not None:
+            cache.move_to_end(raw)
+            self.cache_hits += 1
+            return pseudonym
+
+        self.cache_misses += 1
+        h = hasher.copy()
+        h.update(raw.encode())
+        pseudonym = h.hexdigest()
+
+        cache[raw] = pseudonym
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return pseudonym
+
+    def migration_map(
+        self,
+        user_ids: Iterable[Any],
+        granularity: str = DEFAULT_ROTATION,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, str]:
+        """
+        Legacy player and learner ids of a roster -> current student pseudonyms
+
+        Legacy ids rotated monthly (players) and daily (learners), so the map
+        covers the ids of the epoch containing ``now``.
+        """
+        user_ids = list(user_ids)
+        pseudonyms = self.pseudonymize_many(user_ids, granularity=granularity, now=now)
+        mapping = {}
+        for user_id, pseudonym in zip(user_ids, pseudonyms):
+            for legacy_id in legacy_pseudonyms(user_id, now):
+                mapping[legacy_id] = pseudonym
+        return mapping
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics (no identifiers)"""
+        return {
+            "active_epochs": [f"{ns}:{epoch}" for ns, _, epoch in self._hashers],
+            "cached_pseudonyms": sum(len(c) for c in self._caches.values()),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+_default_service: Optional[PseudonymizationService] = None
+
+
+def get_default_pseudonymizer() -> PseudonymizationService:
+    """Process-wide service shared by the connector and analytics"""
+    global _default_service
+    if _default_service is None:
+        _default_service = PseudonymizationService()
+    return _default_service
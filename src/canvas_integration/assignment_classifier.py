@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Compiled Assignment Classifier
+==============================
+
+Single rule engine that maps a Canvas assignment to its gamification
+settings (assignment type, skill category, XP multiplier and XP value).
+
+The keyword rules come from the ``classification`` section of the Canvas
+integration YAML and are compiled once into one combined regular expression
+per field, so classifying an assignment is a single scan of its name (and
+description, for the skill category) instead of a chain of substring
+checks. Results are cached per assignment id and ``updated_at`` so repeat
+syncs of unchanged assignments cost a dictionary lookup.
+
+Keywords match at word starts, case-insensitively: ``hw`` matches "HW3"
+but not "Matthew", ``eigen`` matches "Eigenvalues". When several rules
+match, the rule listed first wins.
+
+Assignment types are free-form strings, so configs may add their own (e.g.
+"lab") with matching ``xp_values`` and ``xp_multipliers`` entries; the live
+connector reports types outside its ``AssignmentType`` enum as the default
+type.
+
+Author: AI Agent Development Team
+License: MIT (Educational Use)
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLASSIFICATION_RULES: Dict[str, Any] = {
+    # Ordered by priority: the first rule with a matching keyword wins
+    "assignment_types": [
+        {"type": "project", "keywords": ["project", "paper", "essay"]},
+        {"type": "exam", "keywords": ["exam", "midterm", "final", "test"]},
+        {"type": "quiz", "keywords": ["quiz"]},
+        {
+            "type": "participation",
+            "keywords": ["participation", "discussion", "forum"],
+        },
+        {"type": "homework", "keywords": ["homework", "hw"]},
+    ],
+    "skill_categories": [
+        {
+            "category": "eigenvalue_expertise",
+            "keywords": ["eigen"],
+        },
+        {
+            "category": "vector_operations",
+            "keywords": ["vector", "dot product", "linear combination"],
+        },
+        {
+            "category": "matrix_mastery",
+            "keywords": ["matrix", "matrices", "determinant"],
+        },
+        {
+            "category": "linear_equations",
+            "keywords": ["linear equation", "linear system", "equation", "system"],
+        },
+    ],
+    # Canvas submission types that imply an assignment type
+    "submission_type_hints": {
+        "online_quiz": "quiz",
+        "discussion_topic": "participation",
+    },
+    "default_type": "homework",
+    "default_skill_category": "general_practice",
+}
+
+DEFAULT_XP_VALUES = {
+    "homework": 25,
+    "quiz": 50,
+    "exam": 100,
+    "project": 75,
+    "participation": 10,
+    "skill_check": 15,
+}
+
+
+@dataclass(frozen=True)
+class AssignmentClassification:
+    """Gamification settings derived from a Canvas assignment"""
+
+    assignment_type: str
+    skill_category: str
+    xp_multiplier: float
+    xp_value: int
+
+
+def _compile_rules(rules: List[Tuple[str, List[str]]]) -> Optional[Pattern]:
+    """Compile ordered (label, keywords) rules into one alternation regex"""
+    alternatives = []
+    for index, (_, keywords) in enumerate(rules):
+        if not keywords:
+            continue
+        # Longest keywords first so "linear system" wins over "linear"
+        escaped = sorted(
+            (re.escape(k.lower()) for k in keywords), key=len, reverse=True
+        )
+        alternatives.append(f"(?P<r{index}>{'|'.join(escaped)})")
+
+    if not alternatives:
+        return None
+    return re.compile(r"\b(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+
+
+def _best_rule(pattern: Optional[Pattern], text: str) -> Optional[int]:
+    """Index of the highest-priority rule matching anywhere in ``text``"""
+    if pattern is None or not text:
+        return None
+
+    best = None
+    for match in pattern.finditer(text):
+        index = int(match.lastgroup[1:])
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                break
+    return best
+
+
+class AssignmentClassifier:
+    """
+    Classify Canvas assignments with precompiled keyword rules.
+
+    Build it from the full integration config with ``from_config``; the
+    ``classification`` section overrides the default rules and the
+    ``gamification.xp_multipliers`` / ``gamification.xp_values`` sections
+    provide the XP settings.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, Any]] = None,
+        xp_multipliers: Optional[Dict[str, float]] = None,
+        xp_values: Optional[Dict[str, int]] = None,
+        cache_size: int = 10000,
+    ):
+        rules = {**DEFAULT_CLASSIFICATION_RULES, **(rules or {})}
+
+        self._type_rules = [
+            (rule["type"], rule.get("keywords", []))
+            for rule in rules["assignment_types"]
+        ]
+        self._category_rules = [
+            (rule["category"], rule.get("keywords", []))
+            for rule in rules["skill_categories"]
+        ]
+        self._type_pattern = _compile_rules(self._type_rules)
+        self._category_pattern = _compile_rules(self._category_rules)
+
+        self.submission_type_hints: Dict[str, str] = rules["submission_type_hints"]
+        self.default_type: str = rules["default_type"]
+        self.default_skill_category: str = rules["default_skill_category"]
+
+        self.xp_multipliers = xp_multipliers or {}
+        self.xp_values = {**DEFAULT_XP_VALUES, **(xp_values or {})}
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[Any, Any], AssignmentClassification]" = (
+            OrderedDict()
+        )
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AssignmentClassifier":
+        """Build a classifier from the Canvas integration configuration"""
+        gamification = config.get("gamification", {})
+        return cls(
+            rules=config.get("classification"),
+            xp_multipliers=gamification.get("xp_multipliers"),
+            xp_values=gamification.get("xp_values"),
+        )
+
+    @property
+    def assignment_types(self) -> Set[str]:
+        """Every assignment type the rules can produce"""
+        return {
+            *(assignment_type for assignment_type, _ in self._type_rules),
+            *self.submission_type_hints.values(),
+            self.default_type,
+        }
+
+    def classify(self, assignment_data: Dict[str, Any]) -> AssignmentClassification:
+        """Classify an assignment (cached per id and ``updated_at``)"""
+        assignment_id = assignment_data.get("id")
+        cache_key = None
+        if assignment_id is not None:
+            cache_key = (assignment_id, assignment_data.get("updated_at"))
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return cached
+
+        self.cache_misses += 1
+        result = self._classify_uncached(assignment_data)
+
+        if cache_key is not None:
+            self._cache[cache_key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def _classify_uncached(
+        self, assignment_data: Dict[str, Any]
+    ) -> AssignmentClassification:
+        name = assignment_data.get("name") or ""
+        description = assignment_data.get("description") or ""
+
+        # Assignment type: name keywords, then submission type hints
+        type_rule = _best_rule(self._type_pattern, name)
+        if type_rule is not None:
+            assignment_type = self._type_rules[type_rule][0]
+        else:
+            assignment_type = self.default_type
+            for submission_type in assignment_data.get("submission_types") or []:
+                if submission_type in self.submission_type_hints:
+                    assignment_type = self.submission_type_hints[submission_type]
+                    break
+
+        # Skill category: name and description keywords
+        category_rule = _best_rule(self._category_pattern, f"{name}\n{description}")
+        skill_category = (
+            self._category_rules[category_rule][0]
+            if category_rule is not None
+            else self.default_skill_category
+        )
+
+        return AssignmentClassification(
+            assignment_type=assignment_type,
+            skill_category=skill_category,
+            xp_multiplier=self.xp_multipliers.get(assignment_type, 1.0),
+            xp_value=self._xp_value(
+                assignment_type, assignment_data.get("points_possible") or 0
+            ),
+        )
+
+    def _xp_value(self, assignment_type: str, points: float) -> int:
+        """Base XP for the assignment type, scaled by points possible"""
+        base_xp = self.xp_values.get(assignment_type, 25)
+
+        # Scale by points if significant
+        if points > 10:
+            scale_factor = min(points / 100, 2.0)  # Cap at 2x scaling
+            base_xp = int(base_xp * scale_factor)
+
+        return max(base_xp, 5)  # Minimum 5 XP
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for the integration status report"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "cached_assignments": len(self._cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": round(self.cache_hits / total, 3) if total else 0.0,
+        }
@@ -24,13 +24,12 @@ import json
 import logging
 import os
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import yaml
 import aiohttp
-import hashlib
 from urllib.parse import urljoin
 
 # Import our gamification engine
@@ -43,8 +42,20 @@ try:
         PrivacyRespectingAnalytics,
         AnalyticsLevel,
     )
+    from ..analytics.pseudonymization import (
+        STUDENT_NAMESPACE,
+        PseudonymizationService,
+        get_default_pseudonymizer,
+        legacy_pseudonyms,
+    )
     from ..security.oauth_manager import OAuthManager
     from ..security.privacy_protection import PrivacyProtectionSystem
+    from .live_events import LiveEventReceiver
+    from .scheduler import TaskScheduler, activity_aware_interval
+    from .assignment_classifier import (
+        AssignmentClassification,
+        AssignmentClassifier,
+    )
 except ImportError:
     # Fallback for standalone operation
     from src.gamification_engine.core.player_profile import (
@@ -55,8 +66,20 @@ except ImportError:
         PrivacyRespectingAnalytics,
         AnalyticsLevel,
     )
+    from src.analytics.pseudonymization import (
+        STUDENT_NAMESPACE,
+        PseudonymizationService,
+        get_default_pseudonymizer,
+        legacy_pseudonyms,
+    )
     from src.security.oauth_manager import OAuthManager
     from src.security.privacy_protection import PrivacyProtectionSystem
+    from src.canvas_integration.live_events import LiveEventReceiver
+    from src.canvas_integration.scheduler import TaskScheduler, activity_aware_interval
+    from src.canvas_integration.assignment_classifier import (
+        AssignmentClassification,
+        AssignmentClassifier,
+    )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -99,6 +122,7 @@ class CanvasAssignment:
     assignment_type: AssignmentType
     skill_category: str
     xp_multiplier: float = 1.0
+    xp_value: int = 0
     bonus_xp_available: int = 0
     mastery_threshold: float = 0.85  # 85% for mastery bonus
 
@@ -144,42 +168,123 @@ class XPTransaction:
     research_consent: bool = False
 
 
+class ApiRateLimiter:
+    """
+    Hourly Canvas API call budget
+
+    A single limiter can be shared by several connectors (see
+    ``MultiCourseConnector``) so they draw from one institutional budget.
+    """
+
+    def __init__(self, max_calls_per_hour: int = 3000):
+        self.max_calls_per_hour = max_calls_per_hour  # Conservative Canvas limit
+        self.calls_count = 0
+        self.reset_time = time.time() + 3600  # Reset hourly
+
+    def try_acquire(self) -> bool:
+        """Consume one call from the budget; False when the budget is spent"""
+        current_time = time.time()
+        if current_time > self.reset_time:
+            self.calls_count = 0
+            self.reset_time = current_time + 3600
+
+        if self.calls_count >= self.max_calls_per_hour:
+            return False
+
+        self.calls_count += 1
+        return True
+
+    @property
+    def usage(self) -> str:
+        return f"{self.calls_count}/{self.max_calls_per_hour}"
+
+
 class CanvasAPIConnector:
     """
     Live Canvas API connector with gamification integration
 
     Handles all Canvas API interactions with proper error handling,
     rate limiting, and FERPA compliance.
+
+    The HTTP session, rate limiter, player manager and analytics system can
+    be injected so that many course connectors share them (see
+    ``MultiCourseConnector``); injected sessions are not closed by ``close``.
+    Handlers registered with ``CanvasAPIClient.register_webhook_handler`` on
+    a ``webhook_client`` receive every live event.
     """
 
-    def __init__(self, config_path: str = "config/canvas_integration.yml"):
+    def __init__(
+        self,
+        config_path: str = "config/canvas_integration.yml",
+        course_id: Optional[Any] = None,
+        config: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[ApiRateLimiter] = None,
+        player_manager: Optional[PlayerProfileManager] = None,
+        analytics: Optional[PrivacyRespectingAnalytics] = None,
+        pseudonymizer: Optional[PseudonymizationService] = None,
+        webhook_client: Optional[Any] = None,
+    ):
         self.config_path = config_path
-        self.config = self._load_config()
+        self.config = config if config is not None else self._load_config()
 
         # API configuration
         self.base_url = self.config.get("canvas", {}).get("base_url", "")
         self.api_token = self.config.get("canvas", {}).get("api_token", "")
-        self.course_id = self.config.get("canvas", {}).get("course_id", "")
+        self.course_id = course_id or self.config.get("canvas", {}).get("course_id", "")
 
         # Integration components
-        self.player_manager = PlayerProfileManager()
-        self.analytics = PrivacyRespectingAnalytics(AnalyticsLevel.EDUCATIONAL)
+        self.pseudonymizer = pseudonymizer or get_default_pseudonymizer()
+        self.pseudonym_rotation = self.config.get("privacy", {}).get(
+            "pseudonym_rotation", "month"
+        )
+        self.player_manager = player_manager or PlayerProfileManager()
+        self.analytics = analytics or PrivacyRespectingAnalytics(
+            AnalyticsLevel.EDUCATIONAL,
+            pseudonymizer=self.pseudonymizer,
+            pseudonym_rotation=self.pseudonym_rotation,
+        )
         self.privacy_system = PrivacyProtectionSystem()
 
         # Session and state management
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.integration_status = IntegrationStatus.PENDING
         self.last_sync = None
+        self.live_events: Optional[LiveEventReceiver] = None
+        # CanvasAPIClient whose webhook handlers receive every live event
+        self.webhook_client = webhook_client
+        self.scheduler = TaskScheduler()
+        self.last_xp_poll: Optional[datetime] = None
 
         # Data caches
         self.assignments: Dict[int, CanvasAssignment] = {}
         self.students: Dict[int, CanvasStudent] = {}
         self.xp_transactions: List[XPTransaction] = []
+        # (course, assignment, submission, user) -> (score, XP) already awarded
+        self.awarded_submissions: Dict[
+            Tuple[str, int, Optional[int], int], Tuple[float, int]
+        ] = {}
 
         # Rate limiting
-        self.api_calls_count = 0
-        self.api_reset_time = time.time() + 3600  # Reset hourly
-        self.max_api_calls_per_hour = 3000  # Conservative Canvas limit
+        self.rate_limiter = rate_limiter or ApiRateLimiter()
+
+        # Compiled assignment classification rules. Custom types from the
+        # config keep their own XP settings but are reported as the default
+        # type (or homework) wherever an AssignmentType is needed.
+        self.classifier = AssignmentClassifier.from_config(self.config)
+        known_types = {assignment_type.value for assignment_type in AssignmentType}
+        self._fallback_assignment_type = (
+            AssignmentType(self.classifier.default_type)
+            if self.classifier.default_type in known_types
+            else AssignmentType.HOMEWORK
+        )
+        custom_types = self.classifier.assignment_types - known_types
+        if custom_types:
+            logger.warning(
+                f"⚠️ Custom assignment types {sorted(custom_types)} are reported "
+                f"as {self._fallback_assignment_type.value}"
+            )
 
         logger.info("🔗 Canvas API Connector initialized")
 
@@ -218,6 +323,16 @@ class CanvasAPIConnector:
                 "anonymize_data": True,
                 "research_consent_required": True,
                 "data_retention_days": 365,
+                "pseudonym_rotation": "month",
+            },
+            "live_events": {
+                "enabled": False,
+                "host": "127.0.0.1",
+                "port": 8765,
+                "path": "/canvas/live-events",
+                "shared_secret": "",
+                "max_queue_size": 1000,
+                "workers": 2,
             },
         }
 
@@ -230,8 +345,9 @@ class CanvasAPIConnector:
                 "User-Agent": "EagleAdventures2/1.0",
             }
 
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(headers=headers, timeout=timeout)
+            if self._owns_session:
+                timeout = aiohttp.ClientTimeout(total=30)
+                self.session = aiohttp.ClientSession(headers=headers, timeout=timeout)
 
             # Test connection
             test_response = await self._api_request("GET", "/api/v1/courses")
@@ -257,32 +373,54 @@ class CanvasAPIConnector:
         params: Optional[Dict] = None,
     ) -> Optional[Dict]:
         """Make rate-limited API request to Canvas"""
+        result = await self._api_page(
+            method, urljoin(self.base_url, endpoint), data, params
+        )
+        return result[0] if result else None
+
+    async def _api_request_all(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> Optional[List[Dict]]:
+        """Fetch every page of a paginated Canvas list (``Link: rel="next"``)"""
+        items: List[Dict] = []
+        url: Optional[str] = urljoin(self.base_url, endpoint)
+        while url:
+            result = await self._api_page("GET", url, params=params)
+            if result is None:
+                return None
+            page, url = result
+            items.extend(page)
+            params = None  # Next-page links carry the query string
+        return items
 
-        # Rate limiting check
-        current_time = time.time()
-        if current_time > self.api_reset_time:
-            self.api_calls_count = 0
-            self.api_reset_time = current_time + 3600
+    async def _api_page(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+    ) -> Optional[Tuple[Any, Optional[str]]]:
+        """Rate-limited request; returns the JSON body and the next page URL"""
 
-        if self.api_calls_count >= self.max_api_calls_per_hour:
+        # Rate limiting check
+        if not self.rate_limiter.try_acquire():
             logger.warning("⚠️ Canvas API rate limit approaching, throttling...")
             await asyncio.sleep(60)  # Wait 1 minute
             return None
 
         try:
-            url = urljoin(self.base_url, endpoint)
-            self.api_calls_count += 1
-
             async with self.session.request(
                 method, url, json=data, params=params
             ) as response:
                 if response.status == 200:
-                    return await response.json()
+                    next_link = response.links.get("next")
+                    next_url = str(next_link["url"]) if next_link else None
+                    return await response.json(), next_url
                 elif response.status == 429:  # Rate limited
                     retry_after = int(response.headers.get("Retry-After", 60))
                     logger.warning(f"⚠️ Rate limited, waiting {retry_after} seconds")
                     await asyncio.sleep(retry_after)
-                    return await self._api_request(method, endpoint, data, params)
+                    return await self._api_page(method, url, data, params)
                 else:
                     logger.error(
                         f"❌ API request failed: {response.status} {await response.text()}"
@@ -333,6 +471,7 @@ class CanvasAPIConnector:
 
             for assignment_data in assignments_data:
                 # Create Canvas assignment with gamification mapping
+                classification = self.classifier.classify(assignment_data)
                 assignment = CanvasAssignment(
                     canvas_id=assignment_data["id"],
                     name=assignment_data["name"],
@@ -340,9 +479,10 @@ class CanvasAPIConnector:
                     points_possible=assignment_data.get("points_possible", 100),
                     due_at=self._parse_canvas_datetime(assignment_data.get("due_at")),
                     course_id=self.course_id,
-                    assignment_type=self._classify_assignment(assignment_data),
-                    skill_category=self._extract_skill_category(assignment_data),
-                    xp_multiplier=self._calculate_xp_multiplier(assignment_data),
+                    assignment_type=self._assignment_type(classification),
+                    skill_category=classification.skill_category,
+                    xp_multiplier=classification.xp_multiplier,
+                    xp_value=classification.xp_value,
                 )
 
                 self.assignments[assignment.canvas_id] = assignment
@@ -378,7 +518,14 @@ class CanvasAPIConnector:
 
             students_processed = 0
 
-            for enrollment in enrollments_data:
+            # Hash the whole roster in one batch
+            pseudonyms = self.pseudonymizer.pseudonymize_many(
+                (e.get("user", {}).get("id") for e in enrollments_data),
+                namespace=STUDENT_NAMESPACE,
+                granularity=self.pseudonym_rotation,
+            )
+
+            for enrollment, pseudonym in zip(enrollments_data, pseudonyms):
                 user_data = enrollment.get("user", {})
 
                 # Create Canvas student record
@@ -390,7 +537,7 @@ class CanvasAPIConnector:
                     enrollment_date=self._parse_canvas_datetime(
                         enrollment.get("created_at")
                     ),
-                    pseudonymized_id=self._create_pseudonym(user_data["id"]),
+                    pseudonymized_id=pseudonym,
                 )
 
                 self.students[student.canvas_user_id] = student
@@ -419,12 +566,17 @@ class CanvasAPIConnector:
             # Determine specialization (could be enhanced with survey data)
             specialization = MathematicalSpecialization.INTERDISCIPLINARY  # Default
 
-            # Create player profile
-            profile = self.player_manager.create_player(
-                student_id=player_id,
-                display_name=f"Player_{player_id[:8]}",  # Privacy-preserving name
-                specialization=specialization,
-            )
+            # Reuse the profile of students already enrolled in another course
+            profile = self.player_manager.get_player(player_id)
+            if profile is None:
+                profile = self._adopt_legacy_profile(student)
+            if profile is None:
+                profile = self.player_manager.create_player(
+                    student_id=player_id,
+                    display_name=f"Player_{player_id[:8]}",  # Privacy-preserving name
+                    specialization=specialization,
+                )
+            specialization = profile.specialization
 
             # Update student record
             student.player_id = player_id
@@ -443,9 +595,20 @@ class CanvasAPIConnector:
             return False
 
     async def process_assignment_submission(
-        self, canvas_user_id: int, assignment_id: int, score: float
+        self,
+        canvas_user_id: int,
+        assignment_id: int,
+        score: float,
+        submission_id: Optional[int] = None,
     ) -> Optional[XPTransaction]:
-        """Process assignment submission and award XP"""
+        """
+        Process assignment submission and award XP
+
+        The same submission is reported several times (submission_created and
+        grade_change events, redeliveries, regrades, polling), so the XP paid
+        per submission is recorded and only the difference to the XP the
+        current score is worth is awarded. Lower regrades award nothing.
+        """
         try:
             # Get assignment and student data
             assignment = self.assignments.get(assignment_id)
@@ -471,12 +634,33 @@ class CanvasAPIConnector:
 
             # Award XP to student profile
             if student.player_id:
+                key = (
+                    str(self.course_id),
+                    assignment_id,
+                    submission_id,
+                    canvas_user_id,
+                )
+                paid_xp = self.awarded_submissions.get(key, (0.0, 0))[1]
+                if total_xp <= paid_xp:
+                    logger.debug(
+                        f"Submission {key} already awarded {paid_xp} XP for this score"
+                    )
+                    return None
                 result = self.player_manager.award_xp(
                     student.player_id,
                     assignment.skill_category,
-                    total_xp,
+                    total_xp - paid_xp,
                     f"canvas_assignment_{assignment_id}",
                 )
+                if not result or "error" in result:
+                    # Not recorded as paid, so the next event retries the award
+                    logger.warning(
+                        f"⚠️ XP award failed for submission {key}: "
+                        f"{(result or {}).get('error')}"
+                    )
+                    return None
+                self.awarded_submissions[key] = (score, total_xp)
+                total_xp -= paid_xp
 
                 # Record XP transaction
                 transaction = XPTransaction(
@@ -533,46 +717,112 @@ class CanvasAPIConnector:
             logger.error(f"❌ Grade sync failed: {e}")
             return 0
 
+    async def start_live_events(self) -> bool:
+        """Start the push-based Canvas Live Events receiver if configured"""
+        live_config = self.config.get("live_events", {})
+        if not live_config.get("enabled", False):
+            return False
+
+        if self.live_events and self.live_events.running:
+            return True
+
+        try:
+            self.live_events = LiveEventReceiver(
+                shared_secret=live_config.get("shared_secret", ""),
+                host=live_config.get("host", "127.0.0.1"),
+                port=live_config.get("port", 8765),
+                path=live_config.get("path", "/canvas/live-events"),
+                max_queue_size=live_config.get("max_queue_size", 1000),
+                workers=live_config.get("workers", 2),
+            )
+            self.live_events.register_handler(
+                "submission_created", self._on_submission_event
+            )
+            self.live_events.register_handler("grade_change", self._on_submission_event)
+            self.live_events.register_handler(
+                "enrollment_created", self._on_enrollment_created
+            )
+            if self.webhook_client is not None:
+                self.live_events.forward_to_client(self.webhook_client)
+            await self.live_events.start()
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Failed to start live events receiver: {e}")
+            self.live_events = None
+            return False
+
+    async def _on_submission_event(self, event: Dict[str, Any]):
+        """Award XP as soon as Canvas reports a scored submission"""
+        body = event.get("body", {})
+        score = body.get("score")
+        if score is None:
+            # Ungraded submissions are awarded once the grade_change event arrives
+            return
+
+        try:
+            user_id = int(body["user_id"])
+            assignment_id = int(body["assignment_id"])
+            # Live events carry submission_id, polled submissions their own id
+            submission_id = body.get("submission_id", body.get("id"))
+            if submission_id is not None:
+                submission_id = int(submission_id)
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"⚠️ Ignoring {event.get('event_type')} without ids")
+            return
+
+        await self.process_assignment_submission(
+            user_id, assignment_id, float(score), submission_id
+        )
+
+    async def _on_enrollment_created(self, event: Dict[str, Any]):
+        """Onboard students the moment they enroll"""
+        body = event.get("body", {})
+        if body.get("type", "StudentEnrollment") != "StudentEnrollment":
+            return
+
+        try:
+            user_id = int(body["user_id"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning("⚠️ Ignoring enrollment_created without user_id")
+            return
+
+        if user_id in self.students:
+            return
+
+        student = CanvasStudent(
+            canvas_user_id=user_id,
+            name=body.get("user_name", "Unknown"),
+            email="",
+            course_id=self.course_id,
+            enrollment_date=self._parse_canvas_datetime(body.get("created_at")),
+            pseudonymized_id=self._create_pseudonym(user_id),
+        )
+        self.students[user_id] = student
+
+        if self.config.get("gamification", {}).get("auto_student_onboarding", True):
+            await self._create_student_profile(student)
+
+    def _assignment_type(
+        self, classification: AssignmentClassification
+    ) -> AssignmentType:
+        """AssignmentType of a classification (custom types use the fallback)"""
+        try:
+            return AssignmentType(classification.assignment_type)
+        except ValueError:
+            return self._fallback_assignment_type
+
     def _classify_assignment(self, assignment_data: Dict) -> AssignmentType:
         """Classify Canvas assignment type for XP calculation"""
-        name = assignment_data.get("name", "").lower()
-
-        if "homework" in name or "hw" in name:
-            return AssignmentType.HOMEWORK
-        elif "quiz" in name:
-            return AssignmentType.QUIZ
-        elif "exam" in name or "test" in name:
-            return AssignmentType.EXAM
-        elif "project" in name:
-            return AssignmentType.PROJECT
-        elif "participation" in name or "discussion" in name:
-            return AssignmentType.PARTICIPATION
-        else:
-            return AssignmentType.SKILL_CHECK
+        return self._assignment_type(self.classifier.classify(assignment_data))
 
     def _extract_skill_category(self, assignment_data: Dict) -> str:
         """Extract skill category from assignment for XP mapping"""
-        name = assignment_data.get("name", "").lower()
-        description = assignment_data.get("description", "").lower()
-
-        # Simple keyword matching (could be enhanced with NLP)
-        if any(keyword in name + description for keyword in ["vector", "dot product"]):
-            return "vector_operations"
-        elif any(keyword in name + description for keyword in ["matrix", "matrices"]):
-            return "matrix_mastery"
-        elif any(keyword in name + description for keyword in ["linear", "equation"]):
-            return "linear_equations"
-        elif any(keyword in name + description for keyword in ["eigenvalue", "eigen"]):
-            return "eigenvalue_expertise"
-        else:
-            return "general_practice"
+        return self.classifier.classify(assignment_data).skill_category
 
     def _calculate_xp_multiplier(self, assignment_data: Dict) -> float:
         """Calculate XP multiplier based on assignment characteristics"""
-        assignment_type = self._classify_assignment(assignment_data)
-
-        multipliers = self.config.get("gamification", {}).get("xp_multipliers", {})
-        return multipliers.get(assignment_type.value, 1.0)
+        return self.classifier.classify(assignment_data).xp_multiplier
 
     def _parse_canvas_datetime(self, datetime_str: Optional[str]) -> Optional[datetime]:
         """Parse Canvas datetime string"""
@@ -583,12 +833,25 @@ class CanvasAPIConnector:
         except:
             return None
 
+    def _adopt_legacy_profile(self, student: CanvasStudent):
+        """Move a profile stored under the student's legacy player id"""
+        legacy_id = legacy_pseudonyms(student.canvas_user_id)[0]
+        profile = self.player_manager.profiles.pop(legacy_id, None)
+        if profile is not None:
+            profile.student_id = student.pseudonymized_id
+            self.player_manager.profiles[student.pseudonymized_id] = profile
+            logger.info(
+                f"🔁 Migrated legacy profile to {student.pseudonymized_id[:8]}..."
+            )
+        return profile
+
     def _create_pseudonym(self, canvas_user_id: int) -> str:
         """Create privacy-preserving pseudonym for student"""
-        # Use privacy system for consistent pseudonymization
-        return hashlib.sha256(
-            f"student_{canvas_user_id}_{datetime.now().strftime('%Y-%m')}".encode()
-        ).hexdigest()[:16]
+        return self.pseudonymizer.pseudonymize(
+            canvas_user_id,
+            namespace=STUDENT_NAMESPACE,
+            granularity=self.pseudonym_rotation,
+        )
 
     async def get_integration_status(self) -> Dict[str, Any]:
         """Get comprehensive integration status"""
@@ -600,14 +863,22 @@ class CanvasAPIConnector:
             "students_synced": len(self.students),
             "xp_transactions": len(self.xp_transactions),
             "last_sync": self.last_sync.isoformat() if self.last_sync else None,
-            "api_calls_used": f"{self.api_calls_count}/{self.max_api_calls_per_hour}",
+            "api_calls_used": self.rate_limiter.usage,
+            "live_events": self.live_events.get_stats() if self.live_events else None,
+            "background_jobs": self.scheduler.get_metrics(),
+            "assignment_classifier": self.classifier.get_cache_stats(),
+            "pseudonymization": self.pseudonymizer.get_stats(),
             "privacy_compliant": True,
             "ferpa_compliant": True,
         }
 
     async def close(self):
         """Clean up Canvas API session"""
-        if self.session:
+        await self.scheduler.stop()
+        if self.live_events:
+            await self.live_events.stop()
+            self.live_events = None
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
         logger.info("🔗 Canvas API connection closed")
@@ -682,6 +953,9 @@ class CanvasAPIConnector:
 
     async def _initialize_session(self):
         """Initialize aiohttp session with proper headers"""
+        if not self._owns_session:
+            return
+
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json",
@@ -754,22 +1028,21 @@ class CanvasAPIConnector:
                     assignments_data = await response.json()
 
                     for assignment_data in assignments_data:
+                        classification = self.classifier.classify(assignment_data)
                         assignment = CanvasAssignment(
                             canvas_id=assignment_data["id"],
                             name=assignment_data["name"],
                             description=assignment_data.get("description", ""),
                             points_possible=assignment_data.get("points_possible", 0),
-                            due_at=self._parse_canvas_date(
+                            due_at=self._parse_canvas_datetime(
                                 assignment_data.get("due_at")
                             ),
                             course_id=self.course_id,
-                            assignment_type=self._categorize_assignment(
-                                assignment_data
-                            ),
-                            skill_category=self._map_to_skill_category(assignment_data),
-                            xp_value=self._calculate_xp_value(assignment_data),
-                            prerequisites=[],
-                            gamification_enabled=True,
+                            assignment_type=self._assignment_type(classification),
+                            skill_category=classification.skill_category,
+                            xp_multiplier=classification.xp_multiplier,
+                            xp_value=classification.xp_value,
+                            gamified=True,
                         )
 
                         self.assignments[assignment.canvas_id] = assignment
@@ -781,64 +1054,15 @@ class CanvasAPIConnector:
 
     def _categorize_assignment(self, assignment_data: Dict) -> AssignmentType:
         """Categorize assignment based on Canvas data"""
-        name = assignment_data.get("name", "").lower()
-        submission_types = assignment_data.get("submission_types", [])
-
-        # Check name patterns
-        if any(keyword in name for keyword in ["quiz", "test", "midterm", "final"]):
-            if any(keyword in name for keyword in ["midterm", "final", "exam"]):
-                return AssignmentType.EXAM
-            return AssignmentType.QUIZ
-        elif any(keyword in name for keyword in ["project", "paper", "essay"]):
-            return AssignmentType.PROJECT
-        elif any(
-            keyword in name for keyword in ["participation", "discussion", "forum"]
-        ):
-            return AssignmentType.PARTICIPATION
-        elif "online_quiz" in submission_types:
-            return AssignmentType.QUIZ
-        else:
-            return AssignmentType.HOMEWORK
+        return self._classify_assignment(assignment_data)
 
     def _map_to_skill_category(self, assignment_data: Dict) -> str:
         """Map assignment to skill tree category"""
-        name = assignment_data.get("name", "").lower()
-
-        # Mathematics skill mapping
-        if any(keyword in name for keyword in ["vector", "linear combination"]):
-            return "vectors"
-        elif any(keyword in name for keyword in ["matrix", "determinant"]):
-            return "matrices"
-        elif any(keyword in name for keyword in ["eigenvalue", "eigenvector"]):
-            return "eigenvalues"
-        elif any(keyword in name for keyword in ["system", "equation", "solving"]):
-            return "linear_systems"
-        else:
-            return "general"
+        return self._extract_skill_category(assignment_data)
 
     def _calculate_xp_value(self, assignment_data: Dict) -> int:
         """Calculate XP value based on assignment type and points"""
-        points = assignment_data.get("points_possible", 0) or 0
-        assignment_type = self._categorize_assignment(assignment_data)
-
-        # Base XP calculation from config
-        xp_config = self.config.get("gamification", {}).get("xp_values", {})
-
-        base_xp = {
-            AssignmentType.HOMEWORK: xp_config.get("homework", 25),
-            AssignmentType.QUIZ: xp_config.get("quiz", 50),
-            AssignmentType.EXAM: xp_config.get("exam", 100),
-            AssignmentType.PROJECT: xp_config.get("project", 75),
-            AssignmentType.PARTICIPATION: xp_config.get("participation", 10),
-            AssignmentType.SKILL_CHECK: xp_config.get("skill_check", 15),
-        }.get(assignment_type, 25)
-
-        # Scale by points if significant
-        if points > 10:
-            scale_factor = min(points / 100, 2.0)  # Cap at 2x scaling
-            base_xp = int(base_xp * scale_factor)
-
-        return max(base_xp, 5)  # Minimum 5 XP
+        return self.classifier.classify(assignment_data).xp_value
 
     async def _load_students(self):
         """Load course students with privacy protection"""
@@ -881,7 +1105,9 @@ class CanvasAPIConnector:
         """Create privacy-safe email hash"""
         if not email:
             return ""
-        return hashlib.sha256(email.encode()).hexdigest()[:16]
+        return self.pseudonymizer.pseudonymize(
+            email, namespace="email", granularity="static"
+        )
 
     async def _setup_xp_tracking(self):
         """Setup XP tracking in Canvas gradebook"""
@@ -945,46 +1171,96 @@ class CanvasAPIConnector:
             logger.error(f"Failed to save config: {e}")
 
     async def _start_monitoring_tasks(self):
-        """Start background monitoring tasks"""
+        """Start supervised background monitoring jobs"""
         logger.info("🔄 Starting Canvas monitoring tasks...")
 
-        # Start grade sync task
-        asyncio.create_task(self._grade_sync_loop())
+        adaptive = activity_aware_interval(
+            lambda: (assignment.due_at for assignment in self.assignments.values())
+        )
 
-        # Start student activity monitoring
-        asyncio.create_task(self._activity_monitoring_loop())
+        # Grade passback every 5 minutes (faster near deadlines)
+        self.scheduler.add_job(
+            "grade_sync",
+            self.sync_grades_to_canvas,
+            interval=300,
+            retry_interval=60,
+            interval_fn=adaptive,
+        )
 
-        # Start XP calculation and awards
-        asyncio.create_task(self._xp_award_loop())
+        # Roster changes every 10 minutes
+        self.scheduler.add_job(
+            "activity_monitoring",
+            self._monitor_student_activity,
+            interval=600,
+            retry_interval=120,
+            interval_fn=adaptive,
+        )
 
+        # Prefer push-based XP awards; fall back to polling without live events
+        if not await self.start_live_events():
+            self.scheduler.add_job(
+                "xp_awards",
+                self._process_xp_awards,
+                interval=180,
+                retry_interval=60,
+                interval_fn=adaptive,
+            )
+
+        self.scheduler.start()
         logger.info("✅ Background monitoring tasks started")
 
-    async def _grade_sync_loop(self):
-        """Background task for syncing grades with Canvas"""
-        while self.integration_status == IntegrationStatus.ACTIVE:
-            try:
-                await self._sync_grades_to_canvas()
-                await asyncio.sleep(300)  # Sync every 5 minutes
-            except Exception as e:
-                logger.error(f"Grade sync error: {e}")
-                await asyncio.sleep(60)  # Wait before retry
-
-    async def _activity_monitoring_loop(self):
-        """Background task for monitoring student activity"""
-        while self.integration_status == IntegrationStatus.ACTIVE:
-            try:
-                await self._monitor_student_activity()
-                await asyncio.sleep(600)  # Check every 10 minutes
-            except Exception as e:
-                logger.error(f"Activity monitoring error: {e}")
-                await asyncio.sleep(120)  # Wait before retry
-
-    async def _xp_award_loop(self):
-        """Background task for processing XP awards"""
-        while self.integration_status == IntegrationStatus.ACTIVE:
-            try:
-                await self._process_xp_awards()
-                await asyncio.sleep(180)  # Process every 3 minutes
-            except Exception as e:
-                logger.error(f"XP award processing error: {e}")
-                await asyncio.sleep(60)  # Wait before retry
+    async def _monitor_student_activity(self):
+        """Pick up enrollments that arrived since the last roster sync"""
+        enrollments_data = await self._api_request(
+            "GET",
+            f"/api/v1/courses/{self.course_id}/enrollments",
+            params={"type": ["StudentEnrollment"], "per_page": 100},
+        )
+        if enrollments_data is None:
+            raise RuntimeError("Enrollment poll failed")
+
+        for enrollment in enrollments_data:
+            await self._on_enrollment_created(
+                {
+                    "body": {
+                        "user_id": enrollment.get("user_id"),
+                        "user_name": enrollment.get("user", {}).get("name", "Unknown"),
+                        "created_at": enrollment.get("created_at"),
+                        "type": enrollment.get("type", "StudentEnrollment"),
+                    }
+                }
+            )
+
+    async def _process_xp_awards(self):
+        """
+        Poll recently graded submissions and award XP
+
+        Successive windows overlap slightly (a grade given during a poll is
+        fetched again by the next one); the per-submission award ledger
+        keeps repeats from paying XP twice.
+        """
+        poll_started = datetime.now(timezone.utc)
+        if self.last_xp_poll is None:
+            # Only grades given after the integration started are polled. The
+            # award ledger lives in memory, so fetching the full grade history
+            # would pay every earlier grade again after each restart.
+            self.last_xp_poll = poll_started
+            return
+
+        params = {
+            "student_ids[]": "all",
+            "graded_since": self.last_xp_poll.isoformat(),
+            "per_page": 100,
+        }
+        # All pages are fetched before the window moves on; a failed page
+        # fails the poll and the whole window is fetched again next time
+        submissions = await self._api_request_all(
+            f"/api/v1/courses/{self.course_id}/students/submissions", params
+        )
+        if submissions is None:
+            raise RuntimeError("Submission poll failed")
+
+        for submission in submissions:
+            await self._on_submission_event({"body": submission})
+
+        self.last_xp_poll = poll_started
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Canvas Live Events Receiver
+===========================
+
+Push-based ingestion of Canvas Live Events (submission_created, grade_change,
+enrollment_created, ...) for the live connector. Instead of polling Canvas on
+multi-minute timers, Canvas delivers events to a small local HTTP endpoint
+which validates the request signature, enqueues the event into a bounded
+queue and dispatches it to registered handlers from a pool of workers.
+
+Features:
+- aiohttp-based asyncio HTTP receiver (no extra web framework)
+- HMAC-SHA256 shared-secret signature validation
+- Bounded queue with backpressure (HTTP 503 + Retry-After when full)
+- Sync or async handlers, per event type or wildcard ("*")
+- Delivery statistics for the integration status report
+
+Author: AI Agent Development Team
+License: MIT (Educational Use)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+# Canvas Live Events the gamification engine reacts to
+SUPPORTED_EVENTS = ("submission_created", "grade_change", "enrollment_created")
+
+
+class LiveEventReceiver:
+    """
+    Local HTTP receiver for Canvas Live Events.
+
+    Events are accepted as JSON documents in the Canvas Live Events envelope
+    (``{"metadata": {"event_name": ...}, "body": {...}}``). The request body
+    must be signed with the shared secret; the hex HMAC-SHA256 digest is
+    expected in the ``signature_header`` (``sha256=`` prefix optional).
+
+    Accepted events are acknowledged immediately with HTTP 202 and handled
+    asynchronously, so slow handlers never hold up Canvas deliveries. When
+    the queue is full the receiver answers HTTP 503 with ``Retry-After`` and
+    Canvas redelivers later.
+    """
+
+    def __init__(
+        self,
+        shared_secret: str,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        path: str = "/canvas/live-events",
+        max_queue_size: int = 1000,
+        workers: int = 2,
+        signature_header: str = "X-Canvas-Signature",
+        retry_after_seconds: int = 5,
+    ):
+        if not shared_secret:
+            raise ValueError("Live events receiver requires a shared secret")
+
+        self.shared_secret = shared_secret.encode()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.workers = max(1, workers)
+        self.signature_header = signature_header
+        self.retry_after_seconds = retry_after_seconds
+
+        self.queue: "asyncio.Queue[Tuple[str, Dict[str, Any], float]]" = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self.handlers: Dict[str, List[EventHandler]] = {}
+
+        self._runner: Optional[web.AppRunner] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+        self.stats = {
+            "received": 0,
+            "accepted": 0,
+            "rejected_signature": 0,
+            "rejected_malformed": 0,
+            "rejected_backpressure": 0,
+            "processed": 0,
+            "handler_errors": 0,
+            "unhandled": 0,
+            "last_event_at": None,
+            "max_queue_latency_ms": 0.0,
+        }
+
+    # Handler registration
+
+    def register_handler(self, event_type: str, handler: EventHandler):
+        """Register a handler for an event type ("*" receives every event)."""
+        self.handlers.setdefault(event_type, []).append(handler)
+        logger.info(f"📡 Registered live event handler for {event_type}")
+
+    def forward_to_client(self, client) -> None:
+        """
+        Forward every event to a ``CanvasAPIClient`` webhook registry.
+
+        This gives handlers registered through
+        ``CanvasAPIClient.register_webhook_handler`` a real transport.
+        """
+        self.register_handler(
+            "*", lambda event: client.handle_webhook(event["event_type"], event)
+        )
+
+    # Lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self) -> None:
+        """Start the HTTP listener and the dispatch workers."""
+        if self.running:
+            return
+
+        app = web.Application(client_max_size=1024 * 1024)
+        app.router.add_post(self.path, self._handle_request)
+        app.router.add_get(f"{self.path}/health", self._handle_health)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"live-events-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+        logger.info(
+            f"📡 Live events receiver listening on http://{self.host}:{self.port}{self.path}"
+        )
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Stop accepting events, drain the queue and cancel the workers."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+        if self._worker_tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"⚠️ Dropping {self.queue.qsize()} undelivered live events on shutdown"
+                )
+
+            for task in self._worker_tasks:
+                task.cancel()
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+            self._worker_tasks = []
+
+        logger.info("📡 Live events receiver stopped")
+
+    # Request handling
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """Constant-time check of the HMAC-SHA256 request signature."""
+        if not signature:
+            return False
+        if signature.startswith("sha256="):
+            signature = signature[len("sha256=") :]
+        expected = hmac.new(self.shared_secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature.strip().lower())
+
+    @staticmethod
+    def parse_event(document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Normalize a Live Events envelope into ``{event_type, metadata, body}``."""
+        if not isinstance(document, dict):
+            return None
+
+        metadata = document.get("metadata") or {}
+        event_type = metadata.get("event_name") or document.get("event_type")
+        if not event_type:
+            return None
+
+        return {
+            "event_type": event_type,
+            "metadata": metadata,
+            "body": document.get("body") or {},
+        }
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        self.stats["received"] += 1
+        body = await request.read()
+
+        if not self.verify_signature(body, request.headers.get(self.signature_header)):
+            self.stats["rejected_signature"] += 1
+            logger.warning("⚠️ Rejected live event with invalid signature")
+            return web.json_response({"error": "invalid signature"}, status=401)
+
+        try:
+            event = self.parse_event(json.loads(body))
+        except (ValueError, UnicodeDecodeError):
+            event = None
+
+        if event is None:
+            self.stats["rejected_malformed"] += 1
+            return web.json_response({"error": "malformed event"}, status=400)
+
+        try:
+            self.queue.put_nowait((event["event_type"], event, time.monotonic()))
+        except asyncio.QueueFull:
+            self.stats["rejected_backpressure"] += 1
+            logger.warning("⚠️ Live event queue full, asking Canvas to retry")
+            return web.json_response(
+                {"error": "queue full"},
+                status=503,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+
+        self.stats["accepted"] += 1
+        self.stats["last_event_at"] = time.time()
+        return web.json_response({"status": "accepted"}, status=202)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_stats())
+
+    # Dispatch
+
+    async def _worker(self):
+        while True:
+            event_type, event, enqueued_at = await self.queue.get()
+            try:
+                latency_ms = (time.monotonic() - enqueued_at) * 1000
+                self.stats["max_queue_latency_ms"] = max(
+                    self.stats["max_queue_latency_ms"], round(latency_ms, 1)
+                )
+                await self.dispatch(event_type, event)
+            finally:
+                self.queue.task_done()
+
+    async def dispatch(self, event_type: str, event: Dict[str, Any]) -> int:
+        """Run all handlers for an event; returns the number of handlers run."""
+        handlers = self.handlers.get(event_type, []) + self.handlers.get("*", [])
+        if not handlers:
+            self.stats["unhandled"] += 1
+            logger.debug(f"No live event handlers registered for {event_type}")
+            return 0
+
+        for handler in handlers:
+            try:
+                result = handler(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                logger.error(f"Live event handler error for {event_type}: {e}")
+
+        self.stats["processed"] += 1
+        return len(handlers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery statistics for monitoring."""
+        return {
+            **self.stats,
+            "running": self.running,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+        }
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Multi-Course Canvas Connector
+=============================
+
+Fan-out mode for the live connector: one worker process serves many
+Canvas courses (e.g. a whole department) instead of running one
+``CanvasAPIConnector`` process per course.
+
+All course connectors share:
+- one aiohttp session (one connection pool)
+- one Canvas API rate limiter (one institutional budget)
+- one ``PlayerProfileManager`` (one copy of the skill templates; students
+  enrolled in several courses keep a single gamification profile)
+- one analytics system and pseudonymization service
+
+Course syncs are scheduled fairly: every sync round visits the courses
+that have waited longest first, with a bounded number running concurrently,
+so a large course cannot starve the others.
+
+Author: AI Agent Development Team
+License: MIT (Educational Use)
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import yaml
+
+try:
+    from ..gamification_engine.core.player_profile import PlayerProfileManager
+    from ..analytics.privacy_respecting_analytics import (
+        PrivacyRespectingAnalytics,
+        AnalyticsLevel,
+    )
+    from ..analytics.pseudonymization import get_default_pseudonymizer
+    from .live_connector import ApiRateLimiter, CanvasAPIConnector
+    from .scheduler import TaskScheduler
+except ImportError:
+    # Fallback for standalone operation
+    from src.gamification_engine.core.player_profile import PlayerProfileManager
+    from src.analytics.privacy_respecting_analytics import (
+        PrivacyRespectingAnalytics,
+        AnalyticsLevel,
+    )
+    from src.analytics.pseudonymization import get_default_pseudonymizer
+    from src.canvas_integration.live_connector import (
+        ApiRateLimiter,
+        CanvasAPIConnector,
+    )
+    from src.canvas_integration.scheduler import TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class MultiCourseConnector:
+    """
+    Serve many Canvas courses from a single worker.
+
+    Course ids come from ``canvas.course_ids`` in the integration config (or
+    the ``course_ids`` argument); ``canvas.course_id`` is accepted as a
+    single-course fallback.
+    """
+
+    def __init__(
+        self,
+        config_path: str = "config/canvas_integration.yml",
+        course_ids: Optional[List[Any]] = None,
+        max_concurrent_syncs: int = 4,
+        sync_interval_seconds: int = 900,
+    ):
+        self.config_path = config_path
+        self.config = self._load_config()
+
+        canvas_config = self.config.get("canvas", {})
+        self.base_url = canvas_config.get("base_url", "")
+        self.api_token = canvas_config.get("api_token", "")
+
+        # Shared components
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.rate_limiter = ApiRateLimiter(
+            canvas_config.get("max_api_calls_per_hour", 3000)
+        )
+        self.pseudonymizer = get_default_pseudonymizer()
+        self.player_manager = PlayerProfileManager()
+        self.analytics = PrivacyRespectingAnalytics(
+            AnalyticsLevel.EDUCATIONAL,
+            pseudonymizer=self.pseudonymizer,
+            pseudonym_rotation=self.config.get("privacy", {}).get(
+                "pseudonym_rotation", "month"
+            ),
+        )
+        self.scheduler = TaskScheduler()
+
+        # Fair scheduling state
+        self.max_concurrent_syncs = max(1, max_concurrent_syncs)
+        self.sync_interval_seconds = sync_interval_seconds
+        self._sync_semaphore = asyncio.Semaphore(self.max_concurrent_syncs)
+        self.last_course_sync: Dict[Any, Optional[datetime]] = {}
+        self.course_sync_failures: Dict[Any, int] = {}
+
+        self.connectors: Dict[Any, CanvasAPIConnector] = {}
+        if course_ids is None:
+            course_ids = canvas_config.get("course_ids") or [
+                canvas_config.get("course_id")
+            ]
+        for course_id in course_ids:
+            if course_id:
+                self.add_course(course_id)
+
+        logger.info(
+            f"🔗 Multi-course connector initialized for {len(self.connectors)} courses"
+        )
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Load Canvas integration configuration"""
+        try:
+            with open(self.config_path, "r") as f:
+                return yaml.safe_load(f) or {}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load Canvas config: {e}")
+            return {}
+
+    def add_course(self, course_id: Any) -> CanvasAPIConnector:
+        """Add a course served by the shared session, limiter and player manager"""
+        if course_id in self.connectors:
+            return self.connectors[course_id]
+
+        connector = CanvasAPIConnector(
+            config_path=self.config_path,
+            course_id=course_id,
+            config=self.config,
+            session=self.session,
+            rate_limiter=self.rate_limiter,
+            player_manager=self.player_manager,
+            analytics=self.analytics,
+            pseudonymizer=self.pseudonymizer,
+        )
+        # The shared session may not exist yet; it is never the course's to close
+        connector._owns_session = False
+        self.connectors[course_id] = connector
+        self.last_course_sync[course_id] = None
+        self.course_sync_failures[course_id] = 0
+        return connector
+
+    async def remove_course(self, course_id: Any) -> None:
+        """Stop serving a course (its students keep their shared profiles)"""
+        connector = self.connectors.pop(course_id, None)
+        self.last_course_sync.pop(course_id, None)
+        self.course_sync_failures.pop(course_id, None)
+        if connector is not None:
+            await connector.close()
+
+    async def initialize_session(self) -> None:
+        """Create the single HTTP session shared by all course connectors"""
+        if self.session is None:
+            headers = {
+                "Authorization": f"Bearer {self.api_token}",
+                "Content-Type": "application/json",
+                "User-Agent": "Eagle Adventures 2 - Canvas Integration v1.0",
+            }
+            self.session = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(limit=10 * self.max_concurrent_syncs),
+            )
+
+        for connector in self.connectors.values():
+            connector.session = self.session
+
+        logger.info("🔌 Shared Canvas API session initialized")
+
+    def _sync_order(self) -> List[Any]:
+        """Courses ordered by how long they have waited (never-synced first)"""
+        return sorted(
+            self.connectors,
+            key=lambda course_id: (
+                self.last_course_sync[course_id] is not None,
+                self.last_course_sync[course_id] or datetime.min,
+            ),
+        )
+
+    async def _sync_course(self, course_id: Any) -> bool:
+        async with self._sync_semaphore:
+            connector = self.connectors.get(course_id)
+            if connector is None:
+                return False
+
+            succeeded = await connector.sync_course_data()
+            self.last_course_sync[course_id] = datetime.now()
+            if succeeded:
+                self.course_sync_failures[course_id] = 0
+            else:
+                self.course_sync_failures[course_id] += 1
+            return succeeded
+
+    async def sync_all_courses(self) -> Dict[Any, bool]:
+        """Run one fair sync round over every course"""
+        if self.session is None:
+            await self.initialize_session()
+
+        order = self._sync_order()
+        results = await asyncio.gather(
+            *(self._sync_course(course_id) for course_id in order),
+            return_exceptions=True,
+        )
+
+        summary = {
+            course_id: result is True for course_id, result in zip(order, results)
+        }
+        logger.info(
+            f"🔄 Synced {sum(summary.values())}/{len(summary)} courses "
+            f"(API usage {self.rate_limiter.usage})"
+        )
+        return summary
+
+    async def start(self) -> None:
+        """Start periodic fair sync rounds for all courses"""
+        await self.initialize_session()
+        self.scheduler.add_job(
+            "course_sync_rounds",
+            self.sync_all_courses,
+            interval=self.sync_interval_seconds,
+            retry_interval=60,
+        )
+        self.scheduler.start()
+
+    async def process_assignment_submission(
+        self, course_id: Any, canvas_user_id: int, assignment_id: int, score: float
+    ):
+        """Route a submission to the connector of its course"""
+        connector = self.connectors.get(course_id)
+        if connector is None:
+            logger.warning(f"⚠️ Submission for unknown course {course_id}")
+            return None
+        return await connector.process_assignment_submission(
+            canvas_user_id, assignment_id, score
+        )
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get department-wide integration status"""
+        return {
+            "courses": len(self.connectors),
+            "api_calls_used": self.rate_limiter.usage,
+            "players": len(self.player_manager.profiles),
+            "max_concurrent_syncs": self.max_concurrent_syncs,
+            "course_status": {
+                str(course_id): {
+                    "assignments_synced": len(connector.assignments),
+                    "students_synced": len(connector.students),
+                    "last_sync": (
+                        self.last_course_sync[course_id].isoformat()
+                        if self.last_course_sync[course_id]
+                        else None
+                    ),
+                    "consecutive_failures": self.course_sync_failures[course_id],
+                }
+                for course_id, connector in self.connectors.items()
+            },
+            "background_jobs": self.scheduler.get_metrics(),
+        }
+
+    async def close(self) -> None:
+        """Stop background work and close the shared session"""
+        await self.scheduler.stop()
+        for connector in self.connectors.values():
+            await connector.close()
+        if self.session:
+            await self.session.close()
+            self.session = None
+        logger.info("🔗 Multi-course Canvas connection closed")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Supervised Background Scheduler for the Canvas Live Connector
+=============================================================
+
+Small asyncio scheduler for the connector's periodic jobs (grade sync,
+activity monitoring, XP award polling). Every job runs in a supervised task
+whose handle is kept, so failures are logged and counted instead of being
+swallowed, jobs never overlap with themselves, and everything is cancelled
+cleanly when the connector closes.
+
+Features:
+- Named periodic jobs with randomized jitter
+- No-overlap guarantee per job (including manual ``run_now`` triggers)
+- Cancellation on shutdown
+- Per-job run-time metrics
+- Adaptive intervals (faster around deadlines, slower overnight)
+
+Author: AI Agent Development Team
+License: MIT (Educational Use)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobMetrics:
+    """Run-time metrics for a scheduled job"""
+
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    skipped_overlaps: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    last_duration: Optional[float] = None
+    last_started: Optional[datetime] = None
+    last_error: Optional[str] = None
+    next_interval: Optional[float] = None
+
+    @property
+    def average_duration(self) -> float:
+        return self.total_duration / self.runs if self.runs else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "skipped_overlaps": self.skipped_overlaps,
+            "average_duration_ms": round(self.average_duration * 1000, 1),
+            "max_duration_ms": round(self.max_duration * 1000, 1),
+            "last_duration_ms": (
+                round(self.last_duration * 1000, 1)
+                if self.last_duration is not None
+                else None
+            ),
+            "last_started": (
+                self.last_started.isoformat() if self.last_started else None
+            ),
+            "last_error": self.last_error,
+            "next_interval_seconds": self.next_interval,
+        }
+
+
+@dataclass
+class PeriodicJob:
+    """A named coroutine function executed on a (possibly adaptive) interval"""
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: float
+    jitter: float = 0.1  # Fraction of the interval, +/-
+    retry_interval: Optional[float] = None  # Delay after a failed run
+    interval_fn: Optional[Callable[[float], float]] = None  # Adaptive interval
+    run_immediately: bool = True
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+    _lock: Optional[asyncio.Lock] = field(default=None, init=False, repr=False)
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Per-job lock, created inside the running event loop on first use"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def next_delay(self, failed: bool) -> float:
+        """Compute the delay before the next run"""
+        if failed and self.retry_interval is not None:
+            base = self.retry_interval
+        elif self.interval_fn is not None:
+            base = self.interval_fn(self.interval)
+        else:
+            base = self.interval
+
+        if self.jitter:
+            base *= 1 + random.uniform(-self.jitter, self.jitter)
+
+        self.metrics.next_interval = round(base, 1)
+        return max(base, 0.0)
+
+
+class TaskScheduler:
+    """
+    Supervised scheduler for the connector's periodic background jobs.
+
+    Each job loops in its own task: run, record metrics, sleep. Because the
+    next sleep only starts after the previous run completes, a job cannot
+    overlap with itself; manual ``run_now`` calls share the job's lock and
+    are skipped while a run is in progress.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        jitter: float = 0.1,
+        retry_interval: Optional[float] = None,
+        interval_fn: Optional[Callable[[float], float]] = None,
+        run_immediately: bool = True,
+    ) -> PeriodicJob:
+        """Register a periodic job (started by ``start`` or immediately if running)"""
+        if name in self.jobs:
+            raise ValueError(f"Job '{name}' is already scheduled")
+
+        job = PeriodicJob(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            retry_interval=retry_interval,
+            interval_fn=interval_fn,
+            run_immediately=run_immediately,
+        )
+        self.jobs[name] = job
+
+        if self._tasks:
+            self._start_job(job)
+
+        return job
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    def start(self) -> None:
+        """Start supervised tasks for all registered jobs"""
+        for job in self.jobs.values():
+            if job.name not in self._tasks or self._tasks[job.name].done():
+                self._start_job(job)
+        logger.info(f"⏱️ Scheduler started {len(self._tasks)} background jobs")
+
+    def _start_job(self, job: PeriodicJob) -> None:
+        self._tasks[job.name] = asyncio.create_task(
+            self._run_loop(job), name=f"scheduler-{job.name}"
+        )
+
+    async def stop(self) -> None:
+        """
+        Cancel all jobs and wait for them to finish.
+
+        The jobs are unregistered too, so the owner can register them again
+        (with ``add_job``) when it is restarted.
+        """
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self.jobs.clear()
+        logger.info("⏱️ Scheduler stopped")
+
+    async def run_now(self, name: str) -> bool:
+        """Run a job immediately unless it is already running"""
+        job = self.jobs[name]
+        if job.lock.locked():
+            job.metrics.skipped_overlaps += 1
+            return False
+        return await self._run_once(job)
+
+    async def _run_loop(self, job: PeriodicJob):
+        if not job.run_immediately:
+            await asyncio.sleep(job.next_delay(failed=False))
+
+        while True:
+            if job.lock.locked():
+                job.metrics.skipped_overlaps += 1
+                succeeded = True
+            else:
+                succeeded = await self._run_once(job)
+            await asyncio.sleep(job.next_delay(failed=not succeeded))
+
+    async def _run_once(self, job: PeriodicJob) -> bool:
+        async with job.lock:
+            metrics = job.metrics
+            metrics.last_started = datetime.now()
+            started = time.perf_counter()
+            try:
+                await job.func()
+                metrics.consecutive_failures = 0
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.failures += 1
+                metrics.consecutive_failures += 1
+                metrics.last_error = str(e)
+                logger.error(f"❌ Background job '{job.name}' failed: {e}")
+                return False
+            finally:
+                duration = time.perf_counter() - started
+                metrics.runs += 1
+                metrics.total_duration += duration
+                metrics.last_duration = duration
+                metrics.max_duration = max(metrics.max_duration, duration)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-job metrics for the integration status report"""
+        return {
+            name: {
+                **job.metrics.to_dict(),
+                "running": name in self._tasks and not self._tasks[name].done(),
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+def activity_aware_interval(
+    due_dates_fn: Callable[[], Iterable[Optional[datetime]]],
+    deadline_window: timedelta = timedelta(hours=24),
+    deadline_factor: float = 0.25,
+    quiet_hours: Tuple[int, int] = (0, 6),
+    quiet_factor: float = 4.0,
+    now_fn: Callable[[], datetime] = datetime.now,
+) -> Callable[[float], float]:
+    """
+    Build an adaptive interval function for ``PeriodicJob.interval_fn``.
+
+    Polls ``deadline_factor`` times the base interval while any due date is
+    within ``deadline_window`` of now (either side), and ``quiet_factor``
+    times the base interval during quiet hours when no deadline is near.
+    """
+
+    def interval_fn(base_interval: float) -> float:
+        now = now_fn()
+
+        for due_at in due_dates_fn():
+            if due_at is None:
+                continue
+            if due_at.tzinfo is not None and now.tzinfo is None:
+                due_at = due_at.astimezone().replace(tzinfo=None)
+            if abs(due_at - now) <= deadline_window:
+                return base_interval * deadline_factor
+
+        start_hour, end_hour = quiet_hours
+        if start_hour <= now.hour < end_hour:
+            return base_interval * quiet_factor
+
+        return base_interval
+
+    return interval_fn
@@ -55,7 +55,7 @@ License: Educational Use
 import logging
 import json
 import datetime
-from typing import Dict, List, Optional, Any, Tuple, Set, Union, Callable
+from typing import Dict, List, Optional, Any, Tuple, Set, Union, Callable, Iterable
 from dataclasses import dataclass, field, asdict
 from enum import Enum, IntEnum
 from pathlib import Path
@@ -146,6 +146,11 @@ class ProgressStatus(Enum):
     MASTERED = "mastered"
 
 
+# Legends of the compact per-student visualization arrays
+VISUAL_STATUS_LEGEND = ("locked", "available", "unlocked")
+PROGRESS_STATUS_LEGEND = tuple(status.value for status in ProgressStatus)
+
+
 @dataclass
 class LearningObjective:
     """
@@ -425,44 +430,13 @@ class SkillNode:
     def _check_requirement(
         self, req_type: str, req_value: Any, progress: Dict[str, Any]
     ) -> bool:
-        """Check a specific unlock requirement with enhanced logic."""
-        if req_type == "quiz_score":
-            quiz_id, min_score = req_value
-            quiz_score = progress.get("quiz_scores", {}).get(quiz_id, 0)
-            return quiz_score >= min_score
-
-        elif req_type == "assignment_completion":
-            assignment_ids = req_value if isinstance(req_value, list) else [req_value]
-            for assignment_id in assignment_ids:
-                assignment_data = progress.get("assignments", {}).get(assignment_id, {})
-                if not assignment_data.get("completed", False):
-                    return False
-                # Check quality of completion
-                if assignment_data.get("score", 0) < self.mastery_threshold:
-                    return False
-            return True
-
-        elif req_type == "badge_earned":
-            badge_ids = req_value if isinstance(req_value, list) else [req_value]
-            earned_badges = progress.get("badges", [])
-            return all(badge_id in earned_badges for badge_id in badge_ids)
-
-        elif req_type == "time_spent":
-            # Minimum time spent in previous activities
-            total_time = progress.get("total_time_spent", 0)
-            return total_time >= req_value
-
-        elif req_type == "peer_interactions":
-            # Social learning requirements
-            peer_score = progress.get("peer_interaction_score", 0)
-            return peer_score >= req_value
-
-        elif req_type == "mastery_level":
-            # Overall mastery requirement
-            mastery_level = progress.get("overall_mastery", 0)
-            return mastery_level >= req_value
+        """
+        Check a specific unlock requirement.
 
-        return True
+        Requirement types are compiled to predicates by the registry in
+        ``requirements``; unknown types pass.
+        """
+        return requirement_registry.compile(self, req_type, req_value)(progress)
 
     def _check_time_availability(self, student_progress: Dict[str, Any]) -> bool:
         """Check if node is available based on course schedule."""
@@ -475,29 +449,22 @@ class SkillNode:
         Calculate mastery score for this skill node based on multiple assessments.
 
         Uses weighted average of different assessment types with recency bias.
+        Records maintained with ``record_assessment_score`` carry the running
+        average, which is read directly instead of re-weighting the history.
         """
         skill_progress = student_progress.get("skills", {}).get(self.id, {})
-        scores = skill_progress.get("assessment_scores", [])
-
-        if not scores:
-            return 0.0
+        mastery = stored_mastery(skill_progress)
+        if mastery is not None:
+            return mastery
 
         # Apply recency weighting (more recent attempts count more)
-        weighted_sum = 0
-        weight_sum = 0
-
-        for i, score in enumerate(scores):
-            weight = 0.7 ** (len(scores) - i - 1)  # Recent scores weighted higher
-            weighted_sum += score * weight
-            weight_sum += weight
-
-        return weighted_sum / weight_sum if weight_sum > 0 else 0.0
+        return weighted_mastery(skill_progress.get("assessment_scores", []))
 
     def get_recommended_resources(
         self, student_progress: Dict[str, Any]
     ) -> List[Dict[str, str]]:
         """Get personalized resource recommendations based on student needs."""
-        all_resources = self.resources.copy()
+        all_resources = list(self.resources)
 
         # Add adaptive resources based on performance
         avg_performance = student_progress.get("average_performance", 0.75)
@@ -669,6 +636,10 @@ class SkillTree:
         self.created_date = datetime.datetime.now().isoformat()
         self.version = "2.0"
 
+        # Derived structures, rebuilt when the tree structure changes
+        self._compiled: Optional["CompiledSkillTree"] = None
+        self._digest: Optional["TreeDigest"] = None  # None: rebuilt on demand
+
     def add_node(self, node: SkillNode) -> None:
         """Add a skill node to the tree with enhanced organization."""
         self.nodes[node.id] = node
@@ -685,11 +656,99 @@ class SkillTree:
                 self.categories[tag] = []
             self.categories[tag].append(node.id)
 
+        self._content_changed("node", node.id, node)
         logger.info(f"Added skill node '{node.name}' (ID: {node.id}) to skill tree")
 
+    def compact(self) -> "SkillTree":
+        """
+        Copy of the tree built from ``CompactSkillNode`` and ``CompactBadge``.
+
+        The copy is much smaller for large trees and behaves the same, but its
+        nodes and badges are read-only.
+        """
+        tree = SkillTree(self.name, self.description, dict(self.metadata))
+        tree.created_date = self.created_date
+        tree.version = self.version
+        for node in self.nodes.values():
+            tree.add_node(CompactSkillNode.from_node(node))
+        for badge in self.badges.values():
+            tree.add_badge(CompactBadge.from_badge(badge))
+        for name, pathway in self.pathways.items():
+            tree.pathways[name] = {**pathway, "nodes": list(pathway["nodes"])}
+        tree.invalidate_caches()
+        return tree
+
+    def save(self, path: str, detached_details: bool = False) -> int:
+        """
+        Save the tree in the versioned binary format; returns bytes written.
+
+        Nodes, badges, pathways and the level/category indexes round-trip
+        through ``SkillTree.load``. ``detached_details`` stores node details
+        per node, for trees opened with ``SkillTree.open_lazy``.
+        """
+        return save_tree(self, path, detached_details=detached_details)
+
+    @classmethod
+    def load(
+        cls, path: str, use_mmap: bool = False, compact: bool = False
+    ) -> "SkillTree":
+        """
+        Load a tree written by ``save``.
+
+        Args:
+            path: Saved tree file
+            use_mmap: Memory-map the file instead of reading it into memory
+            compact: Use ``CompactSkillNode``/``CompactBadge`` (read-only)
+        """
+        return load_tree(path, use_mmap=use_mmap, compact=compact)
+
+    @staticmethod
+    def open_lazy(
+        path: str, use_mmap: bool = True, compact: bool = False
+    ) -> "LazySkillTree":
+        """
+        Open a saved tree without decoding its nodes.
+
+        Nodes are decoded on access; ``LazySkillTree.subtree`` builds a regular
+        tree for the part of the catalog a course needs.
+        """
+        return LazySkillTree(path, use_mmap=use_mmap, compact=compact)
+
+    def record_assessment(
+        self, student_progress: Dict[str, Any], skill_id: str, score: float
+    ) -> float:
+        """
+        Record an assessment score for a skill and return the new mastery.
+
+        The skill's running mastery state is updated in O(1), so later
+        mastery lookups do not re-weight the assessment history.
+        """
+        if skill_id not in self.nodes:
+            raise ValueError(f"Unknown skill '{skill_id}'")
+        skill_progress = student_progress.setdefault("skills", {}).setdefault(
+            skill_id, {}
+        )
+        return record_assessment_score(skill_progress, score)
+
+    def check_unlock_requirements(
+        self, skill_id: str, student_records: Iterable[Dict[str, Any]]
+    ) -> List[bool]:
+        """
+        Whether a skill's custom unlock requirements pass, for many students.
+
+        Uses the predicates compiled with the tree, so the requirements are
+        interpreted once rather than once per student.
+        """
+        compiled = self.compile()
+        i = compiled.index.get(skill_id)
+        if i is None:
+            raise ValueError(f"Unknown skill '{skill_id}'")
+        return compiled.requirements_met(i, student_records)
+
     def add_badge(self, badge: Badge) -> None:
         """Add a badge to the system with validation."""
         self.badges[badge.id] = badge
+        self._content_changed("badge", badge.id, badge)
         logger.info(f"Added badge '{badge.name}' (ID: {badge.id}) to skill tree")
 
     def create_pathway(
@@ -715,19 +774,107 @@ class SkillTree:
             "created_date": datetime.datetime.now().isoformat(),
         }
 
+        self._content_changed("pathway", pathway_name, self.pathways[pathway_name])
         logger.info(f"Created pathway '{pathway_name}' with {len(node_ids)} nodes")
         return True
 
+    def invalidate_caches(self) -> None:
+        """
+        Discard derived structures (compiled index, cached layouts).
+
+        Call it after mutating nodes, badges or pathways in place or removing
+        them; the content version is then recomputed on next use.
+        """
+        self._digest = None
+        self._compiled = None
+
+    def _content_changed(self, kind: str, key: str, value: Any) -> None:
+        """Update the content digest for one added element; drop derived data."""
+        if self._digest is not None:
+            self._digest.set(kind, key, value)
+        self._compiled = None
+
+    def content_digest(self) -> "TreeDigest":
+        """Element digests of the current content (maintained incrementally)."""
+        if self._digest is None:
+            self._digest = TreeDigest.of_tree(self)
+        return self._digest
+
+    @property
+    def content_version(self) -> str:
+        """
+        Version identifying the tree content (nodes, edges, badges, pathways).
+
+        Equal for trees built from the same definition, so derived data can
+        be cached under it across trees and processes.
+        """
+        return self.content_digest().version
+
+    def snapshot(self) -> "TreeManifest":
+        """Record of the current version to diff later versions against."""
+        return TreeManifest.of_tree(self)
+
+    def diff(self, previous: Union["SkillTree", "TreeManifest"]) -> "TreeDiff":
+        """Structural changes from ``previous`` (a tree or snapshot) to this tree."""
+        if isinstance(previous, SkillTree):
+            previous = previous.snapshot()
+        return diff_manifests(previous, self.snapshot())
+
+    def compile(self) -> "CompiledSkillTree":
+        """Get the index-backed evaluation engine for the current tree structure."""
+        compiled = self._compiled
+        if compiled is None or compiled.size != len(self.nodes):
+            compiled = CompiledSkillTree(self)
+            self._compiled = compiled
+        return compiled
+
     def get_unlocked_nodes(self, student_progress: Dict[str, Any]) -> List[SkillNode]:
         """Get all nodes unlocked for a student with enhanced filtering."""
-        unlocked = []
-        for node in self.nodes.values():
-            if node.is_unlocked(student_progress):
-                unlocked.append(node)
+        # Sorted by level and then by XP requirement
+        return self.evaluate(student_progress).unlocked_nodes()
 
-        # Sort by level and then by XP requirement
-        unlocked.sort(key=lambda n: (n.level.value, n.xp_required))
-        return unlocked
+    def evaluate(self, student_progress: Dict[str, Any]) -> "EvaluationContext":
+        """
+        Evaluate the tree for a student once, for reuse across report sections.
+
+        The context holds the unlocked and available node sets and computes
+        personalized next nodes and progress statistics on first use.
+        """
+        return EvaluationContext.evaluate(self, student_progress)
+
+    def create_pathway_tracker(
+        self, student_progress: Dict[str, Any]
+    ) -> "PathwayTracker":
+        """
+        Create per-pathway progress counters for a student.
+
+        Each reported skill completion updates only the pathways containing
+        the skill.
+        """
+        return PathwayTracker(self, student_progress)
+
+    def pathway_heatmap(
+        self,
+        cohort: Iterable[Dict[str, Any]],
+        pathways: Optional[Iterable[str]] = None,
+    ) -> "PathwayHeatmap":
+        """Progress of every student in every (or the given) pathway."""
+        return PathwayIndex.for_tree(self.compile()).heatmap(cohort, pathways)
+
+    def badge_engine(self) -> "BadgeEngine":
+        """Badge eligibility index of the current badges (cached)."""
+        return BadgeEngine.for_tree(self)
+
+    def create_unlock_frontier(
+        self, student_progress: Dict[str, Any]
+    ) -> "UnlockFrontier":
+        """
+        Create an incrementally maintained unlocked/available set for a student.
+
+        Progress events recorded through the frontier (skill completions, XP
+        awards) only re-evaluate the nodes they can affect.
+        """
+        return UnlockFrontier(self, student_progress)
 
     def get_next_available_nodes(
         self, student_progress: Dict[str, Any], limit: int = 5
@@ -737,22 +884,10 @@ class SkillTree:
 
         Enhanced with personalized recommendations and adaptive difficulty.
         """
-        unlocked_ids = {node.id for node in self.get_unlocked_nodes(student_progress)}
-        next_nodes = []
-
-        for node in self.nodes.values():
-            if node.id in unlocked_ids:
-                continue
-
-            # Check if all prerequisites are unlocked
-            if all(prereq in unlocked_ids for prereq in node.prerequisites):
-                next_nodes.append(node)
-
-        # Personalize recommendations based on student performance and preferences
-        next_nodes = self._personalize_recommendations(next_nodes, student_progress)
-
-        # Sort by recommendation score and limit results
-        return next_nodes[:limit]
+        # Locked nodes whose prerequisites are all unlocked, personalized based
+        # on student performance and preferences and sorted by recommendation
+        # score
+        return self.evaluate(student_progress).next_available_nodes(limit)
 
     def _personalize_recommendations(
         self, nodes: List[SkillNode], student_progress: Dict[str, Any]
@@ -803,194 +938,124 @@ class SkillTree:
 
     def calculate_progress(self, student_progress: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate comprehensive progress statistics with enhanced analytics."""
-        unlocked_nodes = self.get_unlocked_nodes(student_progress)
-        total_nodes = len(self.nodes)
-        unlocked_count = len(unlocked_nodes)
+        return self._calculate_progress(student_progress)
 
-        # Calculate level-wise progress
-        level_progress = {}
-        for level_num, node_ids in self.levels.items():
-            level_unlocked = sum(
-                1 for node_id in node_ids if node_id in {n.id for n in unlocked_nodes}
-            )
-            level_progress[level_num] = {
-                "unlocked": level_unlocked,
-                "total": len(node_ids),
-                "percentage": (level_unlocked / len(node_ids)) * 100 if node_ids else 0,
-                "level_name": (
-                    SkillLevel(level_num).name
-                    if level_num <= 5
-                    else f"Level {level_num}"
+    def _calculate_progress(
+        self, student_progress: Dict[str, Any], unlocked: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """``calculate_progress`` reusing an already computed unlocked bitset."""
+        # Level, category and pathway aggregates are bitset operations on the
+        # compiled tree
+        progress = self.compile().progress_aggregates(student_progress, unlocked)
+
+        progress.update(
+            {
+                "current_xp": student_progress.get("total_xp", 0),
+                "earned_badges": len(student_progress.get("badges", [])),
+                "total_badges": len(self.badges),
+                "estimated_completion_time": self._estimate_completion_time(
+                    student_progress
                 ),
-            }
-
-        # Calculate mastery distribution
-        mastery_distribution = {
-            "mastered": 0,
-            "completed": 0,
-            "in_progress": 0,
-            "available": 0,
-        }
-        for node in self.nodes.values():
-            mastery_score = node.calculate_mastery_score(student_progress)
-            status = node._get_completion_status(mastery_score)
-            mastery_distribution[status.value] += 1
-
-        # Calculate pathway progress
-        pathway_progress = {}
-        for pathway_name, pathway_data in self.pathways.items():
-            pathway_nodes = pathway_data["nodes"]
-            completed_nodes = sum(
-                1
-                for node_id in pathway_nodes
-                if student_progress.get("skills", {})
-                .get(node_id, {})
-                .get("completed", False)
-            )
-            pathway_progress[pathway_name] = {
-                "completed": completed_nodes,
-                "total": len(pathway_nodes),
-                "percentage": (
-                    (completed_nodes / len(pathway_nodes)) * 100 if pathway_nodes else 0
+                "learning_velocity": self._calculate_learning_velocity(
+                    student_progress
                 ),
             }
+        )
+        return progress
 
-        # Calculate category progress
-        category_progress = {}
-        for category, node_ids in self.categories.items():
-            category_unlocked = sum(
-                1 for node_id in node_ids if node_id in {n.id for n in unlocked_nodes}
-            )
-            category_progress[category] = {
-                "unlocked": category_unlocked,
-                "total": len(node_ids),
-                "percentage": (
-                    (category_unlocked / len(node_ids)) * 100 if node_ids else 0
-                ),
-            }
+    def evaluate_cohort(self, cohort: Union[List[Dict[str, Any]], Any]) -> Any:
+        """
+        Evaluate unlocks and progress for a whole class at once.
 
-        return {
-            "total_progress": (
-                (unlocked_count / total_nodes) * 100 if total_nodes else 0
-            ),
-            "unlocked_nodes": unlocked_count,
-            "total_nodes": total_nodes,
-            "level_progress": level_progress,
-            "mastery_distribution": mastery_distribution,
-            "pathway_progress": pathway_progress,
-            "category_progress": category_progress,
-            "current_xp": student_progress.get("total_xp", 0),
-            "earned_badges": len(student_progress.get("badges", [])),
-            "total_badges": len(self.badges),
-            "estimated_completion_time": self._estimate_completion_time(
-                student_progress
-            ),
-            "learning_velocity": self._calculate_learning_velocity(student_progress),
-        }
+        Args:
+            cohort: Per-student progress dictionaries, or a prebuilt
+                ``CohortProgress`` (students x nodes NumPy matrices)
+
+        Returns:
+            ``CohortEvaluation`` with unlock masks, mastery status, level,
+            category and pathway progress for every student
+        """
+        # NumPy is only needed for cohort evaluation
+        from .cohort import CohortProgress, evaluate_cohort
+
+        compiled = self.compile()
+        if not isinstance(cohort, CohortProgress):
+            cohort = CohortProgress.from_records(compiled, cohort)
+        return evaluate_cohort(compiled, cohort)
+
+    def simulate(self, config: Optional[Any] = None, **parameters: Any) -> Any:
+        """
+        Run a Monte Carlo pacing simulation of synthetic students.
+
+        Args:
+            config: ``SimulationConfig`` (defaults are used when omitted)
+            **parameters: Overrides of individual ``SimulationConfig`` fields
+
+        Returns:
+            ``SimulationResult`` with per-node time-to-unlock distributions
+            and bottleneck nodes
+        """
+        # NumPy is only needed for simulations
+        from dataclasses import replace
+
+        from .simulation import SimulationConfig, simulate
+
+        config = replace(config or SimulationConfig(), **parameters)
+        return simulate(self.compile(), config)
 
     def _estimate_completion_time(
         self, student_progress: Dict[str, Any]
     ) -> Dict[str, int]:
         """Estimate time to complete remaining skills based on student pace."""
-        remaining_nodes = [
-            node
-            for node in self.nodes.values()
-            if not student_progress.get("skills", {})
-            .get(node.id, {})
-            .get("completed", False)
-        ]
+        compiled = self.compile()
+        completed = compiled.completed_mask(student_progress, nested_only=True)
 
-        # Calculate average time per node based on student history
-        completed_skills = student_progress.get("skills", {})
-        if completed_skills:
-            total_time = sum(
-                skill.get("time_spent", 0) for skill in completed_skills.values()
-            )
-            completed_count = sum(
-                1
-                for skill in completed_skills.values()
-                if skill.get("completed", False)
-            )
-            avg_time_per_node = total_time / max(completed_count, 1)
-        else:
-            # Use estimated times from nodes
-            avg_time_per_node = sum(
-                node.estimated_time_minutes for node in self.nodes.values()
-            ) / len(self.nodes)
-
-        total_estimated_time = sum(
-            max(node.estimated_time_minutes, avg_time_per_node)
-            for node in remaining_nodes
-        )
+        # Average time per node from the student's history (running statistics
+        # when available), else the nodes' own estimates
+        avg_time_per_node = average_time_per_skill(student_progress)
+        if avg_time_per_node is None:
+            avg_time_per_node = compiled.average_estimated_time
 
+        total_estimated_time = compiled.estimated_remaining_time(
+            completed, avg_time_per_node
+        )
         return {
             "total_minutes": int(total_estimated_time),
             "total_hours": round(total_estimated_time / 60, 1),
-            "remaining_nodes": len(remaining_nodes),
+            "remaining_nodes": compiled.size - popcount(completed),
         }
 
     def _calculate_learning_velocity(
         self, student_progress: Dict[str, Any]
     ) -> Dict[str, float]:
-        """Calculate student's learning velocity and trends."""
-        completed_skills = student_progress.get("skills", {})
-
-        if len(completed_skills) < 2:
-            return {"nodes_per_week": 0.0, "trend": "insufficient_data"}
-
-        # Analyze completion dates to calculate velocity
-        completion_dates = []
-        for skill_data in completed_skills.values():
-            if skill_data.get("completed", False) and "completion_date" in skill_data:
-                try:
-                    completion_dates.append(
-                        datetime.datetime.fromisoformat(skill_data["completion_date"])
-                    )
-                except ValueError:
-                    continue
-
-        if len(completion_dates) < 2:
-            return {"nodes_per_week": 0.0, "trend": "insufficient_data"}
-
-        completion_dates.sort()
-        time_span = (completion_dates[-1] - completion_dates[0]).total_seconds() / (
-            7 * 24 * 3600
-        )  # weeks
-        nodes_per_week = len(completion_dates) / max(time_span, 1)
-
-        # Calculate trend (acceleration/deceleration)
-        if len(completion_dates) >= 4:
-            # Compare first half vs second half velocity
-            mid_point = len(completion_dates) // 2
-            first_half_span = (
-                completion_dates[mid_point] - completion_dates[0]
-            ).total_seconds() / (7 * 24 * 3600)
-            second_half_span = (
-                completion_dates[-1] - completion_dates[mid_point]
-            ).total_seconds() / (7 * 24 * 3600)
-
-            first_half_velocity = mid_point / max(first_half_span, 1)
-            second_half_velocity = (len(completion_dates) - mid_point) / max(
-                second_half_span, 1
-            )
+        """
+        Calculate student's learning velocity and trends.
 
-            if second_half_velocity > first_half_velocity * 1.2:
-                trend = "accelerating"
-            elif second_half_velocity < first_half_velocity * 0.8:
-                trend = "decelerating"
-            else:
-                trend = "stable"
-        else:
-            trend = "stable"
+        Uses the sorted completion times of the student's learning statistics
+        (see ``record_skill_progress``) and re-parses completion dates only
+        when those are missing or stale.
+        """
+        return learning_velocity(student_progress)
 
-        return {
-            "nodes_per_week": round(nodes_per_week, 2),
-            "trend": trend,
-            "total_completed": len(completion_dates),
-        }
+    def record_skill_progress(
+        self, student_progress: Dict[str, Any], skill_id: str, **skill_data: Any
+    ) -> Dict[str, Any]:
+        """
+        Update a skill record (completion, completion_date, time_spent, ...).
+
+        The student's learning statistics are updated with it, so velocity and
+        completion-time estimates do not rescan the skill history.
+        """
+        if skill_id not in self.nodes:
+            raise ValueError(f"Unknown skill '{skill_id}'")
+        return record_skill_progress(student_progress, skill_id, **skill_data)
 
     def generate_learning_path_recommendation(
-        self, student_progress: Dict[str, Any], goal: str = "comprehensive"
+        self,
+        student_progress: Dict[str, Any],
+        goal: str = "comprehensive",
+        target: Optional[str] = None,
+        context: Optional["EvaluationContext"] = None,
     ) -> Dict[str, Any]:
         """
         Generate personalized learning path recommendations.
@@ -998,15 +1063,21 @@ class SkillTree:
         Args:
             student_progress: Current student progress data
             goal: Learning goal ("comprehensive", "fast_track", "remediation", "advanced")
+            target: Node id or pathway name for "fast_track" (defaults to the
+                quickest unfinished leaf skill)
+            context: Existing evaluation of ``student_progress`` to reuse
         """
-        unlocked_nodes = {node.id for node in self.get_unlocked_nodes(student_progress)}
-        next_nodes = self.get_next_available_nodes(student_progress, limit=10)
+        study_plan = None
+        if context is None and goal != "fast_track":
+            context = self.evaluate(student_progress)
 
         if goal == "fast_track":
-            # Recommend shortest path to completion
-            recommended_path = self._find_shortest_path(unlocked_nodes, next_nodes)
+            # Recommend shortest path to the target
+            study_plan = self.plan_learning_path(student_progress, target)
+            recommended_path = self._find_shortest_path(study_plan)
         elif goal == "remediation":
             # Focus on foundational skills and lower difficulty
+            next_nodes = context.next_available_nodes(limit=10)
             recommended_path = [
                 n
                 for n in next_nodes
@@ -1015,6 +1086,7 @@ class SkillTree:
             ][:5]
         elif goal == "advanced":
             # Challenge with advanced and expert-level content
+            next_nodes = context.next_available_nodes(limit=10)
             recommended_path = [
                 n
                 for n in next_nodes
@@ -1022,9 +1094,10 @@ class SkillTree:
             ][:5]
         else:  # comprehensive
             # Balanced approach covering all areas
+            next_nodes = context.next_available_nodes(limit=10)
             recommended_path = self._balance_recommendations(next_nodes)
 
-        return {
+        recommendation = {
             "goal": goal,
             "recommended_nodes": [node.to_dict() for node in recommended_path],
             "estimated_time": sum(
@@ -1037,14 +1110,34 @@ class SkillTree:
                 goal, recommended_path, student_progress
             ),
         }
+        if study_plan is not None:
+            recommendation["study_plan"] = study_plan.to_dict()
+        return recommendation
 
-    def _find_shortest_path(
-        self, unlocked_nodes: Set[str], available_nodes: List[SkillNode]
-    ) -> List[SkillNode]:
-        """Find shortest path through available nodes."""
-        # Simple greedy approach - prioritize nodes with fewest prerequisites
-        available_nodes.sort(key=lambda n: len(n.prerequisites))
-        return available_nodes[:5]
+    def plan_learning_path(
+        self, student_progress: Dict[str, Any], target: Optional[str] = None
+    ) -> Optional["StudyPlan"]:
+        """
+        Compute the minimum-time study plan toward a node or pathway.
+
+        The plan is the target's prerequisite closure minus skills the student
+        has already completed with sufficient mastery, in a valid study order
+        and weighted by ``estimated_time_minutes``. Without a target, the
+        unfinished leaf skill that is quickest to reach is planned.
+        """
+        planner = LearningPathPlanner.for_tree(self.compile())
+
+        if target is None:
+            return planner.cheapest_target(student_progress)
+        if target in self.pathways:
+            return planner.plan(student_progress, self.pathways[target]["nodes"])
+        return planner.plan(student_progress, [target])
+
+    def _find_shortest_path(self, study_plan: Optional["StudyPlan"]) -> List[SkillNode]:
+        """First steps of a study plan (at most five)."""
+        if study_plan is None:
+            return []
+        return [self.nodes[node_id] for node_id in study_plan.steps[:5]]
 
     def _balance_recommendations(self, nodes: List[SkillNode]) -> List[SkillNode]:
         """Create balanced recommendations across different categories."""
@@ -1092,65 +1185,127 @@ class SkillTree:
         else:
             return f"This balanced path covers diverse skill areas aligned with your learning patterns and {avg_performance:.1%} performance level."
 
-    def to_visualization_data(self, student_progress: Dict[str, Any]) -> Dict[str, Any]:
+    def to_visualization_data(
+        self,
+        student_progress: Dict[str, Any],
+        context: Optional["EvaluationContext"] = None,
+    ) -> Dict[str, Any]:
         """
         Generate comprehensive data for skill tree visualization.
 
         Enhanced with accessibility features, interactive elements,
         and comprehensive metadata for rich user interfaces.
+
+        Merges the cached static payload (``get_static_visualization``) with
+        the student's state (``get_student_visualization_delta``); clients
+        that can merge themselves should fetch the two parts separately.
         """
-        unlocked_ids = {node.id for node in self.get_unlocked_nodes(student_progress)}
-        next_available_ids = {
-            node.id for node in self.get_next_available_nodes(student_progress)
+        static = self.get_static_visualization()
+        delta = self.get_student_visualization_delta(student_progress, context)
+        progress_stats = delta["progress"]
+
+        nodes_data = []
+        for node_data, status, progress_status, mastery_score in zip(
+            static["nodes"],
+            delta["status"],
+            delta["progress_status"],
+            delta["mastery"],
+        ):
+            visual_status = VISUAL_STATUS_LEGEND[status]
+            accessibility = dict(node_data["accessibility"])
+            if not self.nodes[node_data["id"]].accessibility.screen_reader_description:
+                description = accessibility["screen_reader_description"]
+                accessibility[
+                    "screen_reader_description"
+                ] = f"{description}. Status: {visual_status}"
+
+            nodes_data.append(
+                {
+                    **node_data,
+                    "status": visual_status,
+                    "progress_status": PROGRESS_STATUS_LEGEND[progress_status],
+                    "mastery_score": mastery_score,
+                    "accessibility": accessibility,
+                }
+            )
+
+        return {
+            "nodes": nodes_data,
+            "edges": static["edges"],
+            "clusters": static["clusters"],
+            "progress": progress_stats,
+            "pathways": {
+                name: {
+                    **pathway_data,
+                    "progress": progress_stats["pathway_progress"][name],
+                }
+                for name, pathway_data in static["pathways"].items()
+            },
+            "metadata": static["metadata"],
+            "accessibility": static["accessibility"],
         }
 
+    def get_static_visualization(self) -> Dict[str, Any]:
+        """
+        Get the student-independent visualization payload.
+
+        Nodes, edges, clusters, pathways and layout coordinates are built once
+        per tree structure and cached; treat the result as read-only.
+        """
+        compiled = self.compile()
+        static = compiled.derived.get("visualization")
+        if static is None:
+            static = self._build_static_visualization(compiled)
+            compiled.derived["visualization"] = static
+        return static
+
+    def get_static_visualization_json(self) -> str:
+        """Serialized static visualization payload (cached with the payload)."""
+        compiled = self.compile()
+        payload = compiled.derived.get("visualization_json")
+        if payload is None:
+            payload = json.dumps(self.get_static_visualization(), separators=(",", ":"))
+            compiled.derived["visualization_json"] = payload
+        return payload
+
+    def _build_static_visualization(
+        self, compiled: "CompiledSkillTree"
+    ) -> Dict[str, Any]:
+        """Build the student-independent part of the visualization data."""
+        layout = self.get_layout()
         nodes_data = []
         edges_data = []
         clusters_data = []
 
-        # Process nodes with enhanced metadata
-        for node in self.nodes.values():
-            mastery_score = node.calculate_mastery_score(student_progress)
-            status = node._get_completion_status(mastery_score)
-
-            # Determine visual status
-            if node.id in unlocked_ids:
-                visual_status = "unlocked"
-            elif node.id in next_available_ids:
-                visual_status = "available"
-            else:
-                visual_status = "locked"
-
-            node_data = {
-                "id": node.id,
-                "name": node.name,
-                "description": node.description,
-                "level": {
-                    "value": node.level.value,
-                    "name": node.level.name,
-                    "color": node.level.color_code,
-                    "description": node.level.description,
-                },
-                "status": visual_status,
-                "progress_status": status.value,
-                "mastery_score": mastery_score,
-                "xp_required": node.xp_required,
-                "estimated_time": node.estimated_time_minutes,
-                "difficulty": node.difficulty.value,
-                "badges": node.badges,
-                "tags": node.tags,
-                "accessibility": {
-                    "alt_text": node.accessibility.alt_text
-                    or f"Skill node: {node.name}",
-                    "screen_reader_description": node.accessibility.screen_reader_description
-                    or f"{node.name} - {node.level.description}. Status: {visual_status}",
-                    "keyboard_shortcut": node.accessibility.keyboard_shortcut,
-                },
-                "social_features": node.social_features.to_dict(),
-                "coordinates": self._calculate_node_position(node, nodes_data),
-            }
-
-            nodes_data.append(node_data)
+        # Nodes in compiled index order; per-student arrays follow this order
+        for node in compiled.nodes:
+            nodes_data.append(
+                {
+                    "id": node.id,
+                    "name": node.name,
+                    "description": node.description,
+                    "level": {
+                        "value": node.level.value,
+                        "name": node.level.name,
+                        "color": node.level.color_code,
+                        "description": node.level.description,
+                    },
+                    "xp_required": node.xp_required,
+                    "estimated_time": node.estimated_time_minutes,
+                    "difficulty": node.difficulty.value,
+                    "badges": node.badges,
+                    "tags": node.tags,
+                    "accessibility": {
+                        "alt_text": node.accessibility.alt_text
+                        or f"Skill node: {node.name}",
+                        "screen_reader_description": node.accessibility.screen_reader_description
+                        or f"{node.name} - {node.level.description}",
+                        "keyboard_shortcut": node.accessibility.keyboard_shortcut,
+                    },
+                    "social_features": node.social_features.to_dict(),
+                    "coordinates": dict(layout.coordinates[node.id]),
+                }
+            )
 
             # Add edges for prerequisites with enhanced metadata
             for prereq in node.prerequisites:
@@ -1176,23 +1331,14 @@ class SkillTree:
             }
             clusters_data.append(cluster_data)
 
-        # Calculate overall statistics
-        progress_stats = self.calculate_progress(student_progress)
-
         return {
+            "tree_version": self.content_version,
             "nodes": nodes_data,
             "edges": edges_data,
             "clusters": clusters_data,
-            "progress": progress_stats,
-            "pathways": {
-                name: {
-                    **pathway_data,
-                    "progress": self._calculate_pathway_progress(
-                        pathway_data["nodes"], student_progress
-                    ),
-                }
-                for name, pathway_data in self.pathways.items()
-            },
+            "pathways": dict(self.pathways),
+            "status_legend": list(VISUAL_STATUS_LEGEND),
+            "progress_status_legend": list(PROGRESS_STATUS_LEGEND),
             "metadata": {
                 "name": self.name,
                 "description": self.description,
@@ -1210,18 +1356,67 @@ class SkillTree:
             },
         }
 
-    def _calculate_node_position(
-        self, node: SkillNode, existing_nodes: List[Dict]
-    ) -> Dict[str, float]:
-        """Calculate optimal position for node in visualization."""
-        # Simple layout algorithm - in production would use force-directed or hierarchical layout
-        level_y = node.level.value * 100
-        level_nodes = [
-            n for n in existing_nodes if n["level"]["value"] == node.level.value
-        ]
-        level_x = len(level_nodes) * 150
+    def get_student_visualization_delta(
+        self,
+        student_progress: Dict[str, Any],
+        context: Optional["EvaluationContext"] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get the compact per-student part of the visualization data.
 
-        return {"x": level_x, "y": level_y}
+        ``status``, ``progress_status`` and ``mastery`` are arrays aligned
+        with the nodes of ``get_static_visualization``; the status arrays hold
+        indices into its ``status_legend`` and ``progress_status_legend``.
+        """
+        if context is None:
+            context = self.evaluate(student_progress)
+        compiled = context.compiled
+        unlocked = context.unlocked
+
+        # "available" marks the personalized top picks of the frontier
+        next_nodes = context.next_available_nodes()
+        # Codes index VISUAL_STATUS_LEGEND: locked, available, unlocked
+        status = [2 if unlocked >> i & 1 else 0 for i in range(compiled.size)]
+        for node in next_nodes:
+            status[compiled.index[node.id]] = 1
+
+        # Only nodes with a progress record can have a non-zero mastery score
+        defaults = compiled.derived.get("visualization_defaults")
+        if defaults is None:
+            defaults = [
+                PROGRESS_STATUS_LEGEND.index(node._get_completion_status(0.0).value)
+                for node in compiled.nodes
+            ]
+            compiled.derived["visualization_defaults"] = defaults
+        mastery = [0.0] * compiled.size
+        progress_status = list(defaults)
+        for skill_id in student_progress.get("skills", {}):
+            i = compiled.index.get(skill_id)
+            if i is None:
+                continue
+            node = compiled.nodes[i]
+            mastery[i] = node.calculate_mastery_score(student_progress)
+            progress_status[i] = PROGRESS_STATUS_LEGEND.index(
+                node._get_completion_status(mastery[i]).value
+            )
+
+        return {
+            "tree_version": self.content_version,
+            "status": status,
+            "progress_status": progress_status,
+            "mastery": mastery,
+            "progress": context.progress,
+        }
+
+    def get_layout(self) -> "SkillTreeLayout":
+        """
+        Get the hierarchical layout of the tree.
+
+        Computed once per tree structure (layered layout with crossing
+        minimization, see ``src.gamification.layout``) and cached; trees with
+        the same content version share it.
+        """
+        return cached_layout(self.compile(), self.content_version)
 
     def _get_category_color(self, category: str) -> str:
         """Get consistent color for category visualization."""
@@ -1260,52 +1455,13 @@ class SkillTree:
     def export_progress_report(
         self, student_progress: Dict[str, Any], format: str = "json"
     ) -> Union[str, Dict[str, Any]]:
-        """Export comprehensive progress report in various formats."""
-        progress_data = self.calculate_progress(student_progress)
-        visualization_data = self.to_visualization_data(student_progress)
-
-        report = {
-            "student_id": student_progress.get("student_id", "unknown"),
-            "generated_date": datetime.datetime.now().isoformat(),
-            "skill_tree": {
-                "name": self.name,
-                "description": self.description,
-                "version": self.version,
-            },
-            "progress_summary": progress_data,
-            "detailed_progress": {
-                "unlocked_skills": [
-                    self.nodes[node_id].to_dict()
-                    for node_id in {
-                        n["id"]
-                        for n in visualization_data["nodes"]
-                        if n["status"] == "unlocked"
-                    }
-                ],
-                "available_skills": [
-                    self.nodes[node_id].to_dict()
-                    for node_id in {
-                        n["id"]
-                        for n in visualization_data["nodes"]
-                        if n["status"] == "available"
-                    }
-                ],
-                "earned_badges": [
-                    self.badges[badge_id].to_canvas_format()
-                    for badge_id in student_progress.get("badges", [])
-                    if badge_id in self.badges
-                ],
-            },
-            "recommendations": self.generate_learning_path_recommendation(
-                student_progress
-            ),
-            "accessibility_notes": [
-                "Progress tracking includes screen reader descriptions",
-                "Visual elements use high contrast colors",
-                "Keyboard navigation supported throughout",
-                "Alternative text provided for all visual elements",
-            ],
-        }
+        """
+        Export comprehensive progress report in various formats.
+
+        Every section is built from one shared evaluation of the student; see
+        ``export_class_reports`` for whole-class exports.
+        """
+        report = build_progress_report(self.evaluate(student_progress))
 
         if format == "json":
             return report
@@ -1314,6 +1470,27 @@ class SkillTree:
         else:
             return json.dumps(report, indent=2)
 
+    def export_class_reports(
+        self,
+        cohort: Iterable[Dict[str, Any]],
+        output_path: str,
+        format: str = "jsonl",
+        max_workers: Optional[int] = None,
+        chunk_size: int = 32,
+    ) -> Dict[str, Any]:
+        """
+        Stream progress reports for a whole class to a JSONL file (one report
+        per line) or a directory of HTML files, rendered by a process pool.
+        """
+        return export_class_reports(
+            self,
+            cohort,
+            output_path,
+            format=format,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+        )
+
     def _generate_html_report(self, report_data: Dict[str, Any]) -> str:
         """Generate HTML progress report with accessibility features."""
         # This would generate a comprehensive HTML report
@@ -1360,51 +1537,51 @@ class SkillTree:
         node_ids = self.levels.get(level.value, [])
         return [self.nodes[node_id] for node_id in node_ids if node_id in self.nodes]
 
-    def validate_tree_integrity(self) -> Dict[str, List[str]]:
-        """Validate the integrity of the skill tree structure."""
-        issues = {"errors": [], "warnings": []}
+    def validate_tree_integrity(self) -> Dict[str, Any]:
+        """
+        Validate the integrity of the skill tree structure.
 
-        # Check for orphaned prerequisites
-        all_node_ids = set(self.nodes.keys())
-        for node in self.nodes.values():
-            for prereq in node.prerequisites:
-                if prereq not in all_node_ids:
-                    issues["errors"].append(
-                        f"Node '{node.id}' has unknown prerequisite '{prereq}'"
-                    )
+        Runs in a single O(nodes + prerequisites) pass (see
+        ``src.gamification.validation``) and reports every circular dependency,
+        unknown prerequisite and node unreachable from the root nodes, plus
+        prerequisite depth statistics.
+        """
+        issues: Dict[str, Any] = {"errors": [], "warnings": []}
+        report = analyze_structure(self.compile())
 
-        # Check for circular dependencies
-        for node_id in self.nodes:
-            if self._has_circular_dependency(node_id, set()):
+        # Check for orphaned prerequisites
+        for node_id, missing in report.dangling_prerequisites.items():
+            for prereq in missing:
                 issues["errors"].append(
-                    f"Circular dependency detected involving node '{node_id}'"
+                    f"Node '{node_id}' has unknown prerequisite '{prereq}'"
                 )
 
+        # Check for circular dependencies
+        for cycle in report.cycles:
+            members = ", ".join(f"'{node_id}'" for node_id in cycle)
+            issues["errors"].append(
+                f"Circular dependency detected involving nodes {members}"
+            )
+
         # Check for unreachable nodes
-        root_nodes = [node for node in self.nodes.values() if not node.prerequisites]
-        if not root_nodes:
+        if not report.roots:
             issues["warnings"].append(
                 "No root nodes found (nodes without prerequisites)"
             )
+        for node_id in report.unreachable:
+            issues["warnings"].append(
+                f"Node '{node_id}' is unreachable from root nodes"
+            )
 
+        issues["statistics"] = {
+            "total_nodes": len(self.nodes),
+            "root_nodes": len(report.roots),
+            "circular_dependencies": len(report.cycles),
+            "unreachable_nodes": len(report.unreachable),
+            **report.depth_statistics(),
+        }
         return issues
 
-    def _has_circular_dependency(self, node_id: str, visited: Set[str]) -> bool:
-        """Check for circular dependencies in prerequisites."""
-        if node_id in visited:
-            return True
-
-        visited.add(node_id)
-        node = self.nodes.get(node_id)
-        if not node:
-            return False
-
-        for prereq in node.prerequisites:
-            if self._has_circular_dependency(prereq, visited.copy()):
-                return True
-
-        return False
-
     def get_available_nodes(self, student_progress: Dict[str, Any]) -> List[SkillNode]:
         """
         Get all nodes that are currently available (unlocked) to the student.
@@ -1477,12 +1654,69 @@ class GamificationEngine:
         self.xp_system = xp_system or XPSystem()
 
 
+# Compiled evaluation engine (imports the classes defined above)
+from .requirements import (
+    RequirementRegistry,
+    register_requirement,
+    requirement_registry,
+)
+from .compiled import CompiledSkillTree, popcount
+from .frontier import FrontierUpdate, UnlockFrontier
+from .validation import TreeStructureReport, analyze_structure
+from .planner import LearningPathPlanner, StudyPlan
+from .layout import SkillTreeLayout, cached_layout, compute_layout
+from .reports import EvaluationContext, build_progress_report, export_class_reports
+from .compact import CompactBadge, CompactSkillNode
+from .serialization import SkillTreeFile, load_tree, save_tree
+from .lazy import LazySkillTree
+from .badges import BadgeEngine, ProgressChange
+from .pathways import PathwayHeatmap, PathwayIndex, PathwayTracker
+from .velocity import (
+    average_time_per_skill,
+    backfill_learning_stats,
+    learning_velocity,
+    record_skill_progress,
+)
+from .versioning import TreeDiff, TreeDigest, TreeManifest, diff_manifests
+from .mastery import (
+    backfill_mastery_states,
+    record_assessment_score,
+    stored_mastery,
+    weighted_mastery,
+)
+
 # Export all public classes and functions
 __all__ = [
     # Core classes
     "SkillLevel",
     "SkillNode",
     "SkillTree",
+    "CompiledSkillTree",
+    "UnlockFrontier",
+    "FrontierUpdate",
+    "TreeStructureReport",
+    "LearningPathPlanner",
+    "StudyPlan",
+    "SkillTreeLayout",
+    "compute_layout",
+    "EvaluationContext",
+    "CompactSkillNode",
+    "CompactBadge",
+    "LazySkillTree",
+    "TreeDiff",
+    "TreeManifest",
+    "record_assessment_score",
+    "backfill_mastery_states",
+    "RequirementRegistry",
+    "BadgeEngine",
+    "ProgressChange",
+    "PathwayIndex",
+    "PathwayTracker",
+    "PathwayHeatmap",
+    "record_skill_progress",
+    "backfill_learning_stats",
+    "register_requirement",
+    "requirement_registry",
     "Badge",
     "XPSystem",
     "GamificationEngine",
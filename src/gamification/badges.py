@@ -0,0 +1,240 @@
+"""
+Badge Eligibility Engine
+
+A badge can be earned when ``Badge.is_available_to_user`` holds (prerequisite
+badges earned, not expired) and every entry of its ``unlock_requirements`` is
+met. An entry names:
+
+- a badge of the tree, which must be earned
+- ``"xp:<amount>"``, a minimum total XP
+- otherwise a skill, which must be completed
+
+Badges are indexed by the skills, badges and XP thresholds their criteria
+mention. A full evaluation counts a student's satisfied criteria through the
+index, so it only touches badges that mention something the student has; a
+progress event re-checks only the badges that mention what changed (badges
+without any criteria are only found by full evaluations).
+"""
+
+import datetime
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .compiled import skills_view
+
+logger = logging.getLogger(__name__)
+
+XP_REQUIREMENT_PREFIX = "xp:"
+
+
+@dataclass(frozen=True)
+class BadgeCriteria:
+    """Resolved criteria of one badge."""
+
+    badge_id: str
+    skills: Tuple[str, ...]
+    badges: Tuple[str, ...]  # Prerequisite badges and badge requirements
+    min_xp: int
+    expiry: Optional[datetime.datetime]
+
+    @property
+    def size(self) -> int:
+        """Number of criteria counted by the index."""
+        return len(self.skills) + len(self.badges) + (1 if self.min_xp > 0 else 0)
+
+    def is_met(self, student_progress: Dict[str, Any], earned: Set[str]) -> bool:
+        if self.expiry is not None and datetime.datetime.now() > self.expiry:
+            return False
+        if student_progress.get("total_xp", 0) < self.min_xp:
+            return False
+        if not all(badge_id in earned for badge_id in self.badges):
+            return False
+        skills = skills_view(student_progress)
+        return all(
+            skills.get(skill_id, {}).get("completed", False) for skill_id in self.skills
+        )
+
+
+@dataclass
+class ProgressChange:
+    """What a progress event changed for one student (already recorded)."""
+
+    student_progress: Dict[str, Any]
+    skills: Iterable[str] = ()  # Skills completed by the event
+    badges: Iterable[str] = ()  # Badges earned by the event
+    previous_xp: Optional[int] = None  # Total XP before the event
+
+
+def _criteria_of(badge: Any, badge_ids: Set[str]) -> BadgeCriteria:
+    skills: Dict[str, None] = {}
+    badges: Dict[str, None] = dict.fromkeys(badge.prerequisite_badges)
+    min_xp = 0
+    for requirement in badge.unlock_requirements:
+        if requirement in badge_ids:
+            badges[requirement] = None
+        elif (
+            requirement.startswith(XP_REQUIREMENT_PREFIX)
+            and requirement[len(XP_REQUIREMENT_PREFIX) :].isdigit()
+        ):
+            min_xp = max(min_xp, int(requirement[len(XP_REQUIREMENT_PREFIX) :]))
+        else:
+            skills[requirement] = None
+
+    expiry = None
+    if badge.expiry_date:
+        try:
+            expiry = datetime.datetime.fromisoformat(badge.expiry_date)
+        except ValueError:
+            logger.warning(f"Invalid expiry date format for badge {badge.id}")
+
+    return BadgeCriteria(badge.id, tuple(skills), tuple(badges), min_xp, expiry)
+
+
+class BadgeEngine:
+    """Inverted index from badge criteria to badges of a skill tree."""
+
+    def __init__(self, badges: Iterable[Any]):
+        badges = list(badges)
+        badge_ids = {badge.id for badge in badges}
+        self.badge_ids: List[str] = [badge.id for badge in badges]
+        self.criteria: List[BadgeCriteria] = [
+            _criteria_of(badge, badge_ids) for badge in badges
+        ]
+        self.index: Dict[str, int] = {
+            badge_id: i for i, badge_id in enumerate(self.badge_ids)
+        }
+
+        self.by_skill: Dict[str, List[int]] = {}
+        self.by_badge: Dict[str, List[int]] = {}
+        self.unconditional: List[int] = []
+        xp_badges = []
+        for i, criteria in enumerate(self.criteria):
+            for skill_id in criteria.skills:
+                self.by_skill.setdefault(skill_id, []).append(i)
+            for badge_id in criteria.badges:
+                self.by_badge.setdefault(badge_id, []).append(i)
+            if criteria.min_xp > 0:
+                xp_badges.append(i)
+            if criteria.size == 0:
+                self.unconditional.append(i)
+
+        # XP-gated badges sorted by threshold, for bisection
+        xp_badges.sort(key=lambda i: self.criteria[i].min_xp)
+        self.xp_order: List[int] = xp_badges
+        self.xp_thresholds: List[int] = [self.criteria[i].min_xp for i in xp_badges]
+
+    @classmethod
+    def for_tree(cls, tree: Any) -> "BadgeEngine":
+        """Engine of a tree's badges, cached with its compiled snapshot."""
+        compiled = tree.compile()
+        engine = compiled.derived.get("badge_engine")
+        if engine is None:
+            engine = cls(tree.badges.values())
+            compiled.derived["badge_engine"] = engine
+        return engine
+
+    def is_eligible(self, badge_id: str, student_progress: Dict[str, Any]) -> bool:
+        """Whether the student meets every criterion of a badge."""
+        earned = set(student_progress.get("badges", []))
+        return self.criteria[self.index[badge_id]].is_met(student_progress, earned)
+
+    def eligible_badges(
+        self, student_progress: Dict[str, Any], include_earned: bool = False
+    ) -> List[str]:
+        """All badges the student can earn (not yet earned, unless requested)."""
+        earned = set(student_progress.get("badges", []))
+        counts: Dict[int, int] = dict.fromkeys(self.unconditional, 0)
+        for skill_id, skill_data in skills_view(student_progress).items():
+            badges = self.by_skill.get(skill_id)
+            if badges and isinstance(skill_data, dict):
+                if skill_data.get("completed", False):
+                    for i in badges:
+                        counts[i] = counts.get(i, 0) + 1
+        for badge_id in earned:
+            for i in self.by_badge.get(badge_id, ()):
+                counts[i] = counts.get(i, 0) + 1
+        reached = bisect_right(self.xp_thresholds, student_progress.get("total_xp", 0))
+        for i in self.xp_order[:reached]:
+            counts[i] = counts.get(i, 0) + 1
+
+        now = datetime.datetime.now()
+        eligible = []
+        for i in sorted(counts):
+            criteria = self.criteria[i]
+            if counts[i] != criteria.size:
+                continue
+            if criteria.expiry is not None and now > criteria.expiry:
+                continue
+            if include_earned or criteria.badge_id not in earned:
+                eligible.append(criteria.badge_id)
+        return eligible
+
+    def affected_badges(self, change: ProgressChange) -> List[int]:
+        """Indices of the badges whose criteria mention what changed."""
+        affected: Set[int] = set()
+        for skill_id in change.skills:
+            affected.update(self.by_skill.get(skill_id, ()))
+        for badge_id in change.badges:
+            affected.update(self.by_badge.get(badge_id, ()))
+        if change.previous_xp is not None:
+            thresholds = self.xp_thresholds
+            low = bisect_right(thresholds, change.previous_xp)
+            high = bisect_right(thresholds, change.student_progress.get("total_xp", 0))
+            affected.update(self.xp_order[low:high])
+        return sorted(affected)
+
+    def newly_eligible(self, change: ProgressChange) -> List[str]:
+        """Unearned badges that the event may have made available."""
+        progress = change.student_progress
+        earned = set(progress.get("badges", []))
+        return [
+            self.badge_ids[i]
+            for i in self.affected_badges(change)
+            if self.badge_ids[i] not in earned
+            and self.criteria[i].is_met(progress, earned)
+        ]
+
+    def award(self, change: ProgressChange) -> List[str]:
+        """
+        Record the badges an event makes available in the student's progress.
+
+        Newly earned badges are themselves events, so badges depending on
+        them are awarded in the same call. Returns the awarded badge ids.
+        """
+        progress = change.student_progress
+        awarded: List[str] = []
+        newly = self.newly_eligible(change)
+        while newly:
+            progress.setdefault("badges", []).extend(newly)
+            awarded.extend(newly)
+            newly = self.newly_eligible(ProgressChange(progress, badges=newly))
+        return awarded
+
+    def award_eligible(self, student_progress: Dict[str, Any]) -> List[str]:
+        """Award every badge the student can earn (full evaluation)."""
+        awarded: List[str] = []
+        newly = self.eligible_badges(student_progress)
+        while newly:
+            student_progress.setdefault("badges", []).extend(newly)
+            awarded.extend(newly)
+            newly = self.newly_eligible(ProgressChange(student_progress, badges=newly))
+        return awarded
+
+    def award_cohort(self, changes: Iterable[ProgressChange]) -> Dict[str, List[str]]:
+        """
+        Award badges for the progress changes of many students.
+
+        Only badges that mention a changed skill, badge or crossed XP
+        threshold are checked, so the cost follows the size of the change.
+        Returns the awarded badges per student id (students with none are
+        omitted).
+        """
+        awarded = {}
+        for change in changes:
+            badges = self.award(change)
+            if badges:
+                student_id = change.student_progress.get("student_id", "unknown")
+                awarded.setdefault(str(student_id), []).extend(badges)
+        return awarded
@@ -0,0 +1,434 @@
+"""
+Vectorized Cohort Evaluation
+
+Unlock and progress evaluation for a whole class at once. Student progress is
+held as students x nodes NumPy matrices and every per-student rule of
+``SkillTree.calculate_progress`` becomes an array operation:
+
+- prerequisite checks: an OR-reduction over the prerequisite edge list,
+  grouped per mastery threshold
+- adaptive XP requirements: a gather from the per-band requirement table
+- level, category and pathway progress: a matrix product with the
+  membership matrix
+- mastery distribution: threshold comparisons on the mastery matrix
+
+Nodes with custom unlock requirements (or overridden unlock logic) are
+finished per student with the node's own methods, which needs the original
+progress records.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import ProgressStatus, SkillLevel
+from .compiled import (
+    CompiledSkillTree,
+    HIGH_PERFORMANCE_BAND,
+    LOW_PERFORMANCE_BAND,
+    DEFAULT_PERFORMANCE_BAND,
+    skills_view,
+)
+
+# Integer codes of the mastery status matrix, in distribution order
+MASTERY_STATUS_CODES = {
+    ProgressStatus.AVAILABLE.value: 0,
+    ProgressStatus.IN_PROGRESS.value: 1,
+    ProgressStatus.COMPLETED.value: 2,
+    ProgressStatus.MASTERED.value: 3,
+}
+
+_BANDS = (HIGH_PERFORMANCE_BAND, LOW_PERFORMANCE_BAND, DEFAULT_PERFORMANCE_BAND)
+
+
+class CohortIndex:
+    """NumPy view of a compiled tree, built once per tree structure."""
+
+    def __init__(self, compiled: CompiledSkillTree):
+        self.compiled = compiled
+        n = compiled.size
+
+        self.xp_requirements = np.array(
+            [compiled.xp_requirements[band] for band in _BANDS], dtype=np.int64
+        ).reshape(len(_BANDS), n)
+        self.mastery_thresholds = np.array(
+            [node.mastery_threshold for node in compiled.nodes], dtype=np.float64
+        )
+
+        # Prerequisite edges grouped by the target's threshold slot, then target
+        self.threshold_edges = []
+        for slot, threshold in enumerate(compiled.thresholds):
+            targets, starts, sources = [], [], []
+            for i in range(n):
+                if compiled.node_threshold_slot[i] != slot:
+                    continue
+                refs = [
+                    compiled.ref_index[prereq]
+                    for prereq in compiled.nodes[i].prerequisites
+                ]
+                if refs:
+                    targets.append(i)
+                    starts.append(len(sources))
+                    sources.extend(refs)
+            if targets:
+                self.threshold_edges.append(
+                    (
+                        threshold,
+                        np.array(targets, dtype=np.intp),
+                        np.array(starts, dtype=np.intp),
+                        np.array(sources, dtype=np.intp),
+                    )
+                )
+
+        # Prerequisite edges inside the tree, for the next-available frontier
+        known_targets, known_starts, known_sources = [], [], []
+        for i, prereqs in enumerate(compiled.prereq_indices):
+            if len(prereqs) != len(compiled.nodes[i].prerequisites):
+                continue  # unknown prerequisites are never unlocked
+            if prereqs:
+                known_targets.append(i)
+                known_starts.append(len(known_sources))
+                known_sources.extend(prereqs)
+        self.frontier_blocked = np.array(
+            [
+                len(prereqs) != len(node.prerequisites)
+                for prereqs, node in zip(compiled.prereq_indices, compiled.nodes)
+            ],
+            dtype=bool,
+        )
+        self.known_edges = (
+            np.array(known_targets, dtype=np.intp),
+            np.array(known_starts, dtype=np.intp),
+            np.array(known_sources, dtype=np.intp),
+        )
+
+        self.level_keys = [level for level, _, _ in compiled.level_groups]
+        self.category_keys = [name for name, _, _ in compiled.category_groups]
+        self.pathway_keys = [name for name, _, _ in compiled.pathway_groups]
+        self.level_membership = self._membership(compiled.level_groups)
+        self.category_membership = self._membership(compiled.category_groups)
+        self.pathway_membership = self._membership(compiled.pathway_groups)
+        self.level_totals = np.array([t for _, _, t in compiled.level_groups])
+        self.category_totals = np.array([t for _, _, t in compiled.category_groups])
+        self.pathway_totals = np.array([t for _, _, t in compiled.pathway_groups])
+
+    def _membership(self, groups) -> np.ndarray:
+        """Nodes x groups 0/1 matrix from (key, bitset, total) groups."""
+        membership = np.zeros((self.compiled.size, len(groups)), dtype=np.float32)
+        for g, (_, mask, _) in enumerate(groups):
+            bits = bin(mask)[:1:-1]
+            members = [i for i, bit in enumerate(bits) if bit == "1"]
+            membership[members, g] = 1.0
+        return membership
+
+    @classmethod
+    def for_tree(cls, compiled: CompiledSkillTree) -> "CohortIndex":
+        """Cached index for a compiled tree."""
+        index = compiled.derived.get("cohort_index")
+        if index is None:
+            index = cls(compiled)
+            compiled.derived["cohort_index"] = index
+        return index
+
+
+@dataclass
+class CohortProgress:
+    """
+    Progress of a class as students x reference-ids matrices.
+
+    Columns follow ``CompiledSkillTree.ref_ids``: tree nodes first, then
+    prerequisite ids outside the tree.
+
+    Attributes:
+        completed: Skill marked completed
+        prerequisite_mastery: ``mastery_score`` of the skill record (1.0 when
+            absent), used by prerequisite checks
+        assessment_mastery: Recency-weighted assessment mastery
+            (``SkillNode.calculate_mastery_score``) of the tree nodes
+        nested: Whether the student's record uses the nested ``skills`` format
+            (pathway completion only reads nested records)
+    """
+
+    student_ids: List[str]
+    completed: np.ndarray
+    prerequisite_mastery: np.ndarray
+    assessment_mastery: np.ndarray
+    total_xp: np.ndarray
+    average_performance: np.ndarray
+    nested: np.ndarray
+    records: Optional[Sequence[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_records(
+        cls,
+        compiled: CompiledSkillTree,
+        records: Sequence[Dict[str, Any]],
+        student_ids: Optional[List[str]] = None,
+    ) -> "CohortProgress":
+        """Build the matrices from per-student progress dictionaries."""
+        num_students, num_refs = len(records), len(compiled.ref_ids)
+        completed = np.zeros((num_students, num_refs), dtype=bool)
+        prerequisite_mastery = np.ones((num_students, num_refs), dtype=np.float64)
+        assessment_mastery = np.zeros((num_students, compiled.size), dtype=np.float64)
+        total_xp = np.zeros(num_students, dtype=np.int64)
+        average_performance = np.full(num_students, 0.75, dtype=np.float64)
+        nested = np.zeros(num_students, dtype=bool)
+
+        ref_index = compiled.ref_index
+        for s, record in enumerate(records):
+            total_xp[s] = record.get("total_xp", 0)
+            average_performance[s] = record.get("average_performance", 0.75)
+            nested[s] = "skills" in record
+
+            for skill_id, skill_data in skills_view(record).items():
+                ref = ref_index.get(skill_id)
+                if ref is None or not isinstance(skill_data, dict):
+                    continue
+                completed[s, ref] = skill_data.get("completed", False)
+                prerequisite_mastery[s, ref] = skill_data.get("mastery_score", 1.0)
+
+            for skill_id in record.get("skills", {}):
+                i = compiled.index.get(skill_id)
+                if i is not None:
+                    assessment_mastery[s, i] = compiled.nodes[
+                        i
+                    ].calculate_mastery_score(record)
+
+        if student_ids is None:
+            student_ids = [
+                str(record.get("student_id", s)) for s, record in enumerate(records)
+            ]
+
+        return cls(
+            student_ids=student_ids,
+            completed=completed,
+            prerequisite_mastery=prerequisite_mastery,
+            assessment_mastery=assessment_mastery,
+            total_xp=total_xp,
+            average_performance=average_performance,
+            nested=nested,
+            records=records,
+        )
+
+
+@dataclass
+class CohortEvaluation:
+    """Vectorized unlock and progress results (rows are students)."""
+
+    student_ids: List[str]
+    node_ids: List[str]
+    unlocked: np.ndarray
+    next_available: np.ndarray
+    mastery_status: np.ndarray
+    level_keys: List[int]
+    level_unlocked: np.ndarray
+    level_totals: np.ndarray
+    category_keys: List[str]
+    category_unlocked: np.ndarray
+    category_totals: np.ndarray
+    pathway_keys: List[str]
+    pathway_completed: np.ndarray
+    pathway_totals: np.ndarray
+    completion_percentage: np.ndarray
+
+    @property
+    def unlocked_counts(self) -> np.ndarray:
+        return self.unlocked.sum(axis=1)
+
+    @property
+    def total_progress(self) -> np.ndarray:
+        """Unlocked percentage per student (``calculate_progress`` semantics)."""
+        if not self.node_ids:
+            return np.zeros(len(self.student_ids))
+        return self.unlocked_counts / len(self.node_ids) * 100
+
+    def mastery_distribution(self) -> Dict[str, np.ndarray]:
+        """Per-student node counts for each completion status."""
+        return {
+            status: (self.mastery_status == code).sum(axis=1)
+            for status, code in MASTERY_STATUS_CODES.items()
+        }
+
+    def student_progress(self, s: int) -> Dict[str, Any]:
+        """Progress aggregates of one student, shaped like ``calculate_progress``."""
+        distribution = self.mastery_distribution()
+        unlocked_count = int(self.unlocked_counts[s])
+        total_nodes = len(self.node_ids)
+
+        return {
+            "total_progress": (
+                (unlocked_count / total_nodes) * 100 if total_nodes else 0
+            ),
+            "unlocked_nodes": unlocked_count,
+            "total_nodes": total_nodes,
+            "level_progress": {
+                level: {
+                    "unlocked": int(self.level_unlocked[s, g]),
+                    "total": int(self.level_totals[g]),
+                    "percentage": _percentage(
+                        self.level_unlocked[s, g], self.level_totals[g]
+                    ),
+                    "level_name": (
+                        SkillLevel(level).name if level <= 5 else f"Level {level}"
+                    ),
+                }
+                for g, level in enumerate(self.level_keys)
+            },
+            "mastery_distribution": {
+                ProgressStatus.MASTERED.value: int(
+                    distribution[ProgressStatus.MASTERED.value][s]
+                ),
+                ProgressStatus.COMPLETED.value: int(
+                    distribution[ProgressStatus.COMPLETED.value][s]
+                ),
+                ProgressStatus.IN_PROGRESS.value: int(
+                    distribution[ProgressStatus.IN_PROGRESS.value][s]
+                ),
+                ProgressStatus.AVAILABLE.value: int(
+                    distribution[ProgressStatus.AVAILABLE.value][s]
+                ),
+            },
+            "pathway_progress": {
+                name: {
+                    "completed": int(self.pathway_completed[s, g]),
+                    "total": int(self.pathway_totals[g]),
+                    "percentage": _percentage(
+                        self.pathway_completed[s, g], self.pathway_totals[g]
+                    ),
+                }
+                for g, name in enumerate(self.pathway_keys)
+            },
+            "category_progress": {
+                name: {
+                    "unlocked": int(self.category_unlocked[s, g]),
+                    "total": int(self.category_totals[g]),
+                    "percentage": _percentage(
+                        self.category_unlocked[s, g], self.category_totals[g]
+                    ),
+                }
+                for g, name in enumerate(self.category_keys)
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Class-level aggregates for instructor dashboards."""
+        num_students = len(self.student_ids)
+        if num_students == 0:
+            return {"students": 0}
+
+        distribution = self.mastery_distribution()
+        return {
+            "students": num_students,
+            "average_progress": float(self.total_progress.mean()),
+            "average_completion": float(self.completion_percentage.mean()),
+            "node_unlock_rates": dict(
+                zip(self.node_ids, self.unlocked.mean(axis=0).tolist())
+            ),
+            "mastery_distribution": {
+                status: float(counts.mean()) for status, counts in distribution.items()
+            },
+            "level_progress": {
+                level: float(
+                    np.mean(self.level_unlocked[:, g]) / self.level_totals[g] * 100
+                )
+                for g, level in enumerate(self.level_keys)
+                if self.level_totals[g]
+            },
+            "pathway_progress": {
+                name: float(
+                    np.mean(self.pathway_completed[:, g]) / self.pathway_totals[g] * 100
+                )
+                for g, name in enumerate(self.pathway_keys)
+                if self.pathway_totals[g]
+            },
+        }
+
+
+def _percentage(count, total) -> float:
+    return (float(count) / float(total)) * 100 if total else 0
+
+
+def _any_unmet(
+    unmet: np.ndarray, starts: np.ndarray, sources: np.ndarray
+) -> np.ndarray:
+    """Per target, whether any of its prerequisite edges is unmet."""
+    return np.logical_or.reduceat(unmet[:, sources], starts, axis=1)
+
+
+def evaluate_cohort(
+    compiled: CompiledSkillTree, cohort: CohortProgress
+) -> CohortEvaluation:
+    """Evaluate unlocks and progress aggregates for every student at once."""
+    index = CohortIndex.for_tree(compiled)
+    num_students, n = len(cohort.student_ids), compiled.size
+
+    # Adaptive XP requirement per student, gathered from the band table
+    bands = np.where(
+        cohort.average_performance > 0.9,
+        0,
+        np.where(cohort.average_performance < 0.6, 1, 2),
+    )
+    unlocked = cohort.total_xp[:, None] >= index.xp_requirements[bands]
+
+    # Prerequisites completed with sufficient mastery
+    for threshold, targets, starts, sources in index.threshold_edges:
+        unmet = ~(cohort.completed & (cohort.prerequisite_mastery >= threshold))
+        unlocked[:, targets] &= ~_any_unmet(unmet, starts, sources)
+
+    # Custom unlock requirements and overridden unlock logic, per student
+    if compiled.requirement_nodes or compiled.override_nodes:
+        if cohort.records is None:
+            raise ValueError(
+                "Tree has nodes with custom unlock requirements; "
+                "build the cohort with CohortProgress.from_records"
+            )
+        for i in compiled.requirement_nodes:
+            students = np.flatnonzero(unlocked[:, i])
+            unlocked[students, i] = compiled.requirements_met(
+                i, [cohort.records[s] for s in students]
+            )
+        for i in compiled.override_nodes:
+            node = compiled.nodes[i]
+            for s in range(num_students):
+                unlocked[s, i] = node.is_unlocked(cohort.records[s])
+
+    # Locked nodes whose prerequisites are all unlocked
+    next_available = ~unlocked & ~index.frontier_blocked
+    targets, starts, sources = index.known_edges
+    if len(targets):
+        next_available[:, targets] &= ~_any_unmet(~unlocked, starts, sources)
+
+    # Completion status from assessment mastery
+    mastery = cohort.assessment_mastery
+    mastery_status = np.select(
+        [mastery >= 0.95, mastery >= index.mastery_thresholds, mastery > 0],
+        [3, 2, 1],
+        default=0,
+    ).astype(np.int8)
+
+    completed_nodes = cohort.completed[:, :n]
+    pathway_completed = (completed_nodes & cohort.nested[:, None]).astype(np.float32)
+    unlocked_f = unlocked.astype(np.float32)
+
+    return CohortEvaluation(
+        student_ids=list(cohort.student_ids),
+        node_ids=list(compiled.node_ids),
+        unlocked=unlocked,
+        next_available=next_available,
+        mastery_status=mastery_status,
+        level_keys=index.level_keys,
+        level_unlocked=(unlocked_f @ index.level_membership).astype(np.int64),
+        level_totals=index.level_totals,
+        category_keys=index.category_keys,
+        category_unlocked=(unlocked_f @ index.category_membership).astype(np.int64),
+        category_totals=index.category_totals,
+        pathway_keys=index.pathway_keys,
+        pathway_completed=(pathway_completed @ index.pathway_membership).astype(
+            np.int64
+        ),
+        pathway_totals=index.pathway_totals,
+        completion_percentage=(
+            completed_nodes.sum(axis=1) / n if n else np.zeros(num_students)
+        ),
+    )
@@ -0,0 +1,256 @@
+"""
+Compact Skill Tree Representation
+
+Read-only, slotted counterparts of ``SkillNode`` and ``Badge`` for large
+generated trees and the per-course copies of a tree:
+
+- ``__slots__`` instead of a per-instance ``__dict__``
+- list fields stored as tuples (empty ones share the empty tuple) and
+  requirement dictionaries as read-only mappings
+- ids, tags, prerequisites, badge ids and timestamps are interned
+- equal ``AdaptiveParameters``, ``SocialFeatures`` and
+  ``AccessibilityFeatures`` values (typically the defaults) are one shared,
+  read-only copy, so changing the source node's objects later does not
+  affect compact nodes
+- default timestamps have second resolution, so nodes created together share
+  one string
+
+Behaviour is borrowed from the dataclasses: ``is_unlocked``,
+``calculate_mastery_score`` and the other methods are the ``SkillNode`` and
+``Badge`` functions themselves, so the compiled engine treats compact nodes
+exactly like plain ones, and ``to_dict`` returns the same structure.
+"""
+
+import copy
+import datetime
+import sys
+from dataclasses import MISSING, astuple, fields
+from types import MappingProxyType
+from typing import Any, Dict, Tuple
+
+from . import (
+    AccessibilityFeatures,
+    AdaptiveParameters,
+    Badge,
+    SkillNode,
+    SocialFeatures,
+)
+
+_EMPTY_MAPPING = MappingProxyType({})
+
+
+class _FrozenValue:
+    """Read-only copy of a feature/parameter dataclass value."""
+
+    _base: type
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self._base.__name__} of a compact record is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{self._base.__name__} of a compact record is read-only")
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, self._base):
+            return NotImplemented
+        return astuple(self) == astuple(other)
+
+    def __hash__(self) -> int:
+        return hash(astuple(self))
+
+    @classmethod
+    def of(cls, value: Any) -> Any:
+        frozen = object.__new__(cls)
+        for f in fields(value):
+            object.__setattr__(frozen, f.name, getattr(value, f.name))
+        return frozen
+
+
+class _FrozenAdaptiveParameters(_FrozenValue, AdaptiveParameters):
+    _base = AdaptiveParameters
+
+
+class _FrozenSocialFeatures(_FrozenValue, SocialFeatures):
+    _base = SocialFeatures
+
+
+class _FrozenAccessibilityFeatures(_FrozenValue, AccessibilityFeatures):
+    _base = AccessibilityFeatures
+
+
+_FROZEN_TYPES = {
+    frozen._base: frozen
+    for frozen in (
+        _FrozenAdaptiveParameters,
+        _FrozenSocialFeatures,
+        _FrozenAccessibilityFeatures,
+    )
+}
+
+# Shared read-only value objects, keyed by type and field values
+_shared_values: Dict[Tuple[Any, ...], Any] = {}
+
+
+def _shared(value: Any) -> Any:
+    """One shared read-only copy per distinct feature/parameter value."""
+    if isinstance(value, _FrozenValue):
+        base = value._base
+    elif type(value) in _FROZEN_TYPES:
+        base = type(value)
+    elif isinstance(value, tuple(_FROZEN_TYPES)):
+        # Subclasses keep their type: private, unshared copy
+        return copy.copy(value)
+    else:
+        return value
+    key = (base,) + astuple(value)
+    shared = _shared_values.get(key)
+    if shared is None:
+        shared = _shared_values[key] = _FROZEN_TYPES[base].of(value)
+    return shared
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _timestamp() -> str:
+    return sys.intern(datetime.datetime.now().isoformat(timespec="seconds"))
+
+
+class _CompactRecord:
+    """
+    Slotted, read-only mirror of a dataclass (``_source``).
+
+    Accepts the same constructor arguments as the dataclass and stores them
+    in compact form according to the field groups declared by subclasses.
+    """
+
+    __slots__ = ()
+    _source: type
+    _interned: frozenset = frozenset()  # Interned string fields
+    _string_tuples: frozenset = frozenset()  # Lists of interned strings
+    _tuples: frozenset = frozenset()  # Other lists
+    _mappings: frozenset = frozenset()  # Dictionaries
+    _timestamp_field = ""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        cls_name = type(self).__name__
+        source_fields = fields(self._source)
+        names = [f.name for f in source_fields]
+        if len(args) > len(names):
+            raise TypeError(
+                f"{cls_name}() takes at most {len(names)} positional arguments"
+            )
+        values = dict(zip(names, args))
+        for name, value in kwargs.items():
+            if name not in names:
+                raise TypeError(
+                    f"{cls_name}() got an unexpected keyword argument '{name}'"
+                )
+            if name in values:
+                raise TypeError(
+                    f"{cls_name}() got multiple values for argument '{name}'"
+                )
+            values[name] = value
+
+        for f in source_fields:
+            if f.name in values:
+                value = values[f.name]
+            elif f.default is not MISSING:
+                value = f.default
+            elif f.default_factory is not MISSING:
+                value = f.default_factory()
+            else:
+                raise TypeError(f"{cls_name}() missing required argument '{f.name}'")
+            object.__setattr__(self, f.name, self._compact(f.name, value))
+
+    def _compact(self, name: str, value: Any) -> Any:
+        if name == self._timestamp_field and value is None:
+            return _timestamp()
+        if name in self._interned:
+            return _intern(value)
+        if name in self._string_tuples:
+            return tuple(_intern(item) for item in value) if value else ()
+        if name in self._tuples:
+            return tuple(value) if value else ()
+        if name in self._mappings:
+            return MappingProxyType(dict(value)) if value else _EMPTY_MAPPING
+        return _shared(value)
+
+    @classmethod
+    def from_instance(cls, instance: Any) -> Any:
+        """Compact copy of a dataclass instance (or of another compact record)."""
+        return cls(**{f.name: getattr(instance, f.name) for f in fields(cls._source)})
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self):
+        values = tuple(
+            dict(getattr(self, f.name))
+            if f.name in self._mappings
+            else getattr(self, f.name)
+            for f in fields(self._source)
+        )
+        return (type(self), values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+
+class CompactSkillNode(_CompactRecord):
+    """Read-only, memory-compact ``SkillNode`` with the same API."""
+
+    _source = SkillNode
+    __slots__ = tuple(f.name for f in fields(SkillNode))
+    _interned = frozenset({"id", "created_by", "last_updated"})
+    _string_tuples = frozenset({"prerequisites", "badges", "assessments", "tags"})
+    _tuples = frozenset({"learning_objectives", "resources"})
+    _mappings = frozenset({"unlock_requirements"})
+    _timestamp_field = "last_updated"
+
+    @classmethod
+    def from_node(cls, node: SkillNode) -> "CompactSkillNode":
+        """Compact copy of a ``SkillNode``."""
+        return cls.from_instance(node)
+
+    is_unlocked = SkillNode.is_unlocked
+    _calculate_adaptive_xp_requirement = SkillNode._calculate_adaptive_xp_requirement
+    _check_requirement = SkillNode._check_requirement
+    _check_time_availability = SkillNode._check_time_availability
+    calculate_mastery_score = SkillNode.calculate_mastery_score
+    get_recommended_resources = SkillNode.get_recommended_resources
+    generate_progress_insights = SkillNode.generate_progress_insights
+    _get_completion_status = SkillNode._get_completion_status
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same structure as ``SkillNode.to_dict`` (with plain lists and dicts)."""
+        data = SkillNode.to_dict(self)
+        for name in ("prerequisites", "badges", "resources", "assessments", "tags"):
+            data[name] = list(data[name])
+        data["unlock_requirements"] = dict(data["unlock_requirements"])
+        return data
+
+
+class CompactBadge(_CompactRecord):
+    """Read-only, memory-compact ``Badge`` with the same API."""
+
+    _source = Badge
+    __slots__ = tuple(f.name for f in fields(Badge))
+    _interned = frozenset({"id", "rarity", "issuer", "created_date"})
+    _string_tuples = frozenset({"unlock_requirements", "prerequisite_badges"})
+    _tuples = frozenset({"learning_objectives"})
+    _timestamp_field = "created_date"
+
+    @classmethod
+    def from_badge(cls, badge: Badge) -> "CompactBadge":
+        """Compact copy of a ``Badge``."""
+        return cls.from_instance(badge)
+
+    rarity_multiplier = Badge.rarity_multiplier
+    is_available_to_user = Badge.is_available_to_user
+    to_canvas_format = Badge.to_canvas_format
+    to_open_badge_format = Badge.to_open_badge_format
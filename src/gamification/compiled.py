@@ -0,0 +1,437 @@
+"""
+Compiled Skill Tree Evaluation
+
+Index-backed representation of a SkillTree used for per-student evaluation.
+Compiling resolves every node to an integer index once and precomputes
+prerequisite adjacency, XP requirements for each adaptive performance band,
+and level/category/pathway membership as integer bitsets. Evaluating a
+student is then a single pass over the nodes followed by bit operations for
+all progress aggregates.
+
+Unlock semantics are exactly those of ``SkillNode.is_unlocked``: a node is
+unlocked when its prerequisites are completed with sufficient mastery in the
+student's progress, the adaptive XP requirement is met, and any custom
+unlock requirements pass. Custom requirements are compiled once into
+predicates (see ``requirements``); nodes whose class overrides the unlock
+logic are finished with the node's own methods.
+
+A compiled tree is a snapshot; ``SkillTree.compile`` rebuilds it whenever
+nodes, badges or pathways are added through the tree's API.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import SkillLevel, SkillNode, ProgressStatus
+from .requirements import Predicate, requirement_registry
+
+# (average_performance predicate, XP factor) bands of
+# SkillNode._calculate_adaptive_xp_requirement
+HIGH_PERFORMANCE_BAND = "high"
+LOW_PERFORMANCE_BAND = "low"
+DEFAULT_PERFORMANCE_BAND = "default"
+_BAND_FACTORS = {
+    HIGH_PERFORMANCE_BAND: 1.2,
+    LOW_PERFORMANCE_BAND: 0.8,
+    DEFAULT_PERFORMANCE_BAND: 1.0,
+}
+
+_UNLOCK_METHODS = (
+    "is_unlocked",
+    "_calculate_adaptive_xp_requirement",
+    "_check_time_availability",
+)
+
+
+def popcount(mask: int) -> int:
+    """Number of set bits in a bitset."""
+    return bin(mask).count("1")
+
+
+def mask_from_flags(flags: Iterable[bool]) -> int:
+    """Build a bitset whose bit ``i`` is set when ``flags[i]`` is true."""
+    bits = "".join("1" if flag else "0" for flag in flags)
+    return int(bits[::-1], 2) if bits else 0
+
+
+def mask_to_indices(mask: int) -> List[int]:
+    """Indices of the set bits of a bitset, ascending."""
+    bits = bin(mask)[:1:-1]
+    return [i for i, bit in enumerate(bits) if bit == "1"]
+
+
+def performance_band(student_progress: Dict[str, Any]) -> str:
+    """Adaptive XP band for a student's average performance."""
+    avg_performance = student_progress.get("average_performance", 0.75)
+    if avg_performance > 0.9:
+        return HIGH_PERFORMANCE_BAND
+    if avg_performance < 0.6:
+        return LOW_PERFORMANCE_BAND
+    return DEFAULT_PERFORMANCE_BAND
+
+
+def skills_view(student_progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-skill progress in either the nested or the flat progress format."""
+    if "skills" in student_progress:
+        return student_progress.get("skills", {})
+    return student_progress
+
+
+class CompiledSkillTree:
+    """
+    Immutable, index-backed snapshot of a SkillTree.
+
+    Node ``i`` is ``node_ids[i]``. Prerequisites are resolved into a
+    "reference" index space: node indices first, followed by prerequisite ids
+    that name no node in the tree (those can still be satisfied by a student's
+    progress record, exactly as with ``SkillNode.is_unlocked``).
+    """
+
+    def __init__(self, tree: Any):
+        self.nodes: List[SkillNode] = list(tree.nodes.values())
+        self.node_ids: List[str] = [node.id for node in self.nodes]
+        self.index: Dict[str, int] = {
+            node_id: i for i, node_id in enumerate(self.node_ids)
+        }
+        self.size = len(self.nodes)
+        self.full_mask = (1 << self.size) - 1
+
+        # Prerequisite adjacency in reference space
+        self.ref_ids: List[str] = list(self.node_ids)
+        self.ref_index: Dict[str, int] = dict(self.index)
+        self.prereq_masks: List[int] = []
+        self.prereq_indices: List[Tuple[int, ...]] = []
+        self.dangling_prerequisites: Dict[str, List[str]] = {}
+        for node in self.nodes:
+            mask = 0
+            known = []
+            for prereq in node.prerequisites:
+                ref = self.ref_index.get(prereq)
+                if ref is None:
+                    ref = len(self.ref_ids)
+                    self.ref_ids.append(prereq)
+                    self.ref_index[prereq] = ref
+                if ref < self.size:
+                    known.append(ref)
+                else:
+                    self.dangling_prerequisites.setdefault(node.id, []).append(prereq)
+                mask |= 1 << ref
+            self.prereq_masks.append(mask)
+            self.prereq_indices.append(tuple(known))
+
+        # Prerequisite mastery thresholds (usually only one distinct value)
+        self.thresholds: List[float] = sorted(
+            {node.mastery_threshold for node in self.nodes}
+        )
+        threshold_slot = {t: i for i, t in enumerate(self.thresholds)}
+        self.node_threshold_slot: List[int] = [
+            threshold_slot[node.mastery_threshold] for node in self.nodes
+        ]
+
+        # Adaptive XP requirement of every node for every performance band
+        self.xp_requirements: Dict[str, List[int]] = {
+            band: [
+                max(int(node.xp_required * factor), node.xp_required // 2)
+                for node in self.nodes
+            ]
+            for band, factor in _BAND_FACTORS.items()
+        }
+
+        # Nodes that need their own methods after the indexed checks
+        self.requirement_nodes: List[int] = [
+            i for i, node in enumerate(self.nodes) if node.unlock_requirements
+        ]
+        self.override_nodes: List[int] = [
+            i
+            for i, node in enumerate(self.nodes)
+            if any(
+                getattr(type(node), name) is not getattr(SkillNode, name)
+                for name in _UNLOCK_METHODS
+            )
+        ]
+        self._override_set = frozenset(self.override_nodes)
+
+        # Membership bitsets, in the tree's own ordering
+        self.level_groups: List[Tuple[int, int, int]] = [
+            (level_num, self.mask_of(node_ids), len(node_ids))
+            for level_num, node_ids in tree.levels.items()
+        ]
+        self.category_groups: List[Tuple[str, int, int]] = [
+            (category, self.mask_of(node_ids), len(node_ids))
+            for category, node_ids in tree.categories.items()
+        ]
+        self.pathway_groups: List[Tuple[str, int, int]] = [
+            (name, self.mask_of(data["nodes"]), len(data["nodes"]))
+            for name, data in tree.pathways.items()
+        ]
+        # Pathway node indices in pathway order
+        self.pathway_positions: List[Tuple[int, ...]] = [
+            tuple(self.index[n] for n in data["nodes"] if n in self.index)
+            for data in tree.pathways.values()
+        ]
+
+        # Nodes grouped by estimated time (usually only a few distinct values)
+        time_groups: Dict[int, int] = {}
+        for i, node in enumerate(self.nodes):
+            minutes = node.estimated_time_minutes
+            time_groups[minutes] = time_groups.get(minutes, 0) | 1 << i
+        self.estimated_time_groups: List[Tuple[int, int]] = sorted(time_groups.items())
+        self.average_estimated_time: float = (
+            sum(node.estimated_time_minutes for node in self.nodes) / self.size
+            if self.size
+            else 0.0
+        )
+
+        # Display order of get_unlocked_nodes
+        self.sort_order: List[int] = sorted(
+            range(self.size),
+            key=lambda i: (self.nodes[i].level.value, self.nodes[i].xp_required),
+        )
+
+        # Other structures derived from this snapshot (cohort matrices, ...)
+        self.derived: Dict[str, Any] = {}
+
+    def requirement_predicates(self) -> Dict[int, Tuple[Predicate, ...]]:
+        """
+        Compiled unlock requirements of every node in ``requirement_nodes``.
+
+        Recompiled when requirement types are registered after compilation.
+        """
+        cached = self.derived.get("requirements")
+        if cached is None or cached[0] != requirement_registry.version:
+            predicates = {
+                i: requirement_registry.compile_node(self.nodes[i])
+                for i in self.requirement_nodes
+            }
+            cached = (requirement_registry.version, predicates)
+            self.derived["requirements"] = cached
+        return cached[1]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Predicates are closures from the registry of this process; the
+        # receiving process compiles them against its own registry
+        state = dict(self.__dict__)
+        state["derived"] = {
+            key: value for key, value in self.derived.items() if key != "requirements"
+        }
+        return state
+
+    def requirements_met(
+        self, i: int, student_records: Iterable[Dict[str, Any]]
+    ) -> List[bool]:
+        """Whether node ``i``'s custom requirements pass, for many students."""
+        predicates = self.requirement_predicates().get(i, ())
+        node = self.nodes[i]
+        return [
+            all(predicate(record) for predicate in predicates)
+            and node._check_time_availability(record)
+            for record in student_records
+        ]
+
+    def mask_of(self, node_ids: Iterable[str]) -> int:
+        """Bitset of the given node ids (unknown ids are ignored)."""
+        mask = 0
+        for node_id in node_ids:
+            i = self.index.get(node_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def nodes_in(self, mask: int, ordered: bool = False) -> List[SkillNode]:
+        """Nodes of a bitset, in index order or ``get_unlocked_nodes`` order."""
+        if not ordered:
+            return [self.nodes[i] for i in mask_to_indices(mask)]
+        bits = bin(mask)[:1:-1]
+        return [
+            self.nodes[i] for i in self.sort_order if i < len(bits) and bits[i] == "1"
+        ]
+
+    def completed_mask(
+        self, student_progress: Dict[str, Any], nested_only: bool = False
+    ) -> int:
+        """Bitset of tree nodes marked completed in the student's progress."""
+        if nested_only:
+            skills = student_progress.get("skills", {})
+        else:
+            skills = skills_view(student_progress)
+
+        mask = 0
+        for skill_id, skill_data in skills.items():
+            i = self.index.get(skill_id)
+            if i is not None and skill_data.get("completed", False):
+                mask |= 1 << i
+        return mask
+
+    def _satisfied_prerequisites(self, student_progress: Dict[str, Any]) -> List[int]:
+        """Per threshold slot, the reference bitset of satisfied prerequisites."""
+        satisfied = [0] * len(self.thresholds)
+        for skill_id, skill_data in skills_view(student_progress).items():
+            ref = self.ref_index.get(skill_id)
+            if ref is None or not isinstance(skill_data, dict):
+                continue
+            if not skill_data.get("completed", False):
+                continue
+
+            mastery_score = skill_data.get("mastery_score", 1.0)
+            bit = 1 << ref
+            for slot, threshold in enumerate(self.thresholds):
+                if mastery_score < threshold:
+                    break
+                satisfied[slot] |= bit
+        return satisfied
+
+    def is_node_unlocked(self, i: int, student_progress: Dict[str, Any]) -> bool:
+        """Unlock status of the single node ``i`` (same rules as ``unlocked_mask``)."""
+        node = self.nodes[i]
+        if i in self._override_set:
+            return node.is_unlocked(student_progress)
+
+        band = performance_band(student_progress)
+        if self.xp_requirements[band][i] > student_progress.get("total_xp", 0):
+            return False
+
+        skills = skills_view(student_progress)
+        for prereq in node.prerequisites:
+            prereq_progress = skills.get(prereq, {})
+            if not prereq_progress.get("completed", False):
+                return False
+            if prereq_progress.get("mastery_score", 1.0) < node.mastery_threshold:
+                return False
+
+        if node.unlock_requirements:
+            return all(
+                predicate(student_progress)
+                for predicate in self.requirement_predicates()[i]
+            ) and node._check_time_availability(student_progress)
+        return True
+
+    def unlocked_mask(self, student_progress: Dict[str, Any]) -> int:
+        """
+        Bitset of the nodes unlocked for a student.
+
+        Unlock status depends only on the student's progress record, never on
+        whether prerequisites are themselves unlocked, so one pass suffices.
+        """
+        satisfied = self._satisfied_prerequisites(student_progress)
+        student_xp = student_progress.get("total_xp", 0)
+        requirements = self.xp_requirements[performance_band(student_progress)]
+        prereq_masks = self.prereq_masks
+        slots = self.node_threshold_slot
+
+        flags = [
+            requirements[i] <= student_xp
+            and prereq_masks[i] & satisfied[slots[i]] == prereq_masks[i]
+            for i in range(self.size)
+        ]
+
+        for i, predicates in self.requirement_predicates().items():
+            if flags[i]:
+                flags[i] = all(
+                    predicate(student_progress) for predicate in predicates
+                ) and self.nodes[i]._check_time_availability(student_progress)
+
+        for i in self.override_nodes:
+            flags[i] = self.nodes[i].is_unlocked(student_progress)
+
+        return mask_from_flags(flags)
+
+    def estimated_remaining_time(
+        self, completed: int, minutes_per_node: float
+    ) -> float:
+        """
+        Minutes to finish the nodes outside ``completed``.
+
+        Each remaining node takes its own estimate or ``minutes_per_node``,
+        whichever is larger.
+        """
+        total = 0.0
+        remaining = self.full_mask & ~completed
+        for minutes, mask in self.estimated_time_groups:
+            count = popcount(remaining & mask)
+            if count:
+                total += count * max(minutes, minutes_per_node)
+        return total
+
+    def next_available_mask(self, unlocked: int) -> int:
+        """Locked nodes whose prerequisites are all unlocked."""
+        prereq_masks = self.prereq_masks
+        flags = [
+            not unlocked >> i & 1 and prereq_masks[i] & unlocked == prereq_masks[i]
+            for i in range(self.size)
+        ]
+        return mask_from_flags(flags)
+
+    def mastery_distribution(self, student_progress: Dict[str, Any]) -> Dict[str, int]:
+        """Count of nodes per completion status (only touched nodes are scored)."""
+        distribution = {
+            ProgressStatus.MASTERED.value: 0,
+            ProgressStatus.COMPLETED.value: 0,
+            ProgressStatus.IN_PROGRESS.value: 0,
+            ProgressStatus.AVAILABLE.value: 0,
+        }
+
+        scored = 0
+        for skill_id in student_progress.get("skills", {}):
+            i = self.index.get(skill_id)
+            if i is None:
+                continue
+            node = self.nodes[i]
+            status = node._get_completion_status(
+                node.calculate_mastery_score(student_progress)
+            )
+            distribution[status.value] += 1
+            scored += 1
+
+        # Nodes without a progress record score 0.0, i.e. "available"
+        distribution[ProgressStatus.AVAILABLE.value] += self.size - scored
+        return distribution
+
+    def progress_aggregates(
+        self, student_progress: Dict[str, Any], unlocked: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Level, category, pathway and mastery aggregates for one student."""
+        if unlocked is None:
+            unlocked = self.unlocked_mask(student_progress)
+        completed = self.completed_mask(student_progress, nested_only=True)
+
+        level_progress = {}
+        for level_num, mask, total in self.level_groups:
+            level_unlocked = popcount(unlocked & mask)
+            level_progress[level_num] = {
+                "unlocked": level_unlocked,
+                "total": total,
+                "percentage": (level_unlocked / total) * 100 if total else 0,
+                "level_name": (
+                    SkillLevel(level_num).name
+                    if level_num <= 5
+                    else f"Level {level_num}"
+                ),
+            }
+
+        pathway_progress = {}
+        for name, mask, total in self.pathway_groups:
+            pathway_completed = popcount(completed & mask)
+            pathway_progress[name] = {
+                "completed": pathway_completed,
+                "total": total,
+                "percentage": (pathway_completed / total) * 100 if total else 0,
+            }
+
+        category_progress = {}
+        for category, mask, total in self.category_groups:
+            category_unlocked = popcount(unlocked & mask)
+            category_progress[category] = {
+                "unlocked": category_unlocked,
+                "total": total,
+                "percentage": (category_unlocked / total) * 100 if total else 0,
+            }
+
+        unlocked_count = popcount(unlocked)
+        return {
+            "total_progress": ((unlocked_count / self.size) * 100 if self.size else 0),
+            "unlocked_nodes": unlocked_count,
+            "total_nodes": self.size,
+            "level_progress": level_progress,
+            "mastery_distribution": self.mastery_distribution(student_progress),
+            "pathway_progress": pathway_progress,
+            "category_progress": category_progress,
+        }
@@ -0,0 +1,246 @@
+"""
+Incremental Unlock Frontier
+
+Per-student unlocked/available node sets maintained in place as progress
+events arrive. A reverse-prerequisite index limits the work of an event to
+the nodes it can affect:
+
+- completing a skill re-evaluates only that skill's dependents
+- an XP change re-evaluates only nodes whose adaptive XP requirement lies
+  between the old and the new total (found by bisection)
+- a node whose unlock status changed re-checks availability of itself and
+  its dependents
+
+"Available" has the meaning of ``SkillTree.get_next_available_nodes``: the
+node is locked but every prerequisite is an unlocked tree node.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import SkillNode
+from .compiled import CompiledSkillTree, mask_to_indices, performance_band
+from .velocity import LEARNING_STATS_KEY, record_skill_progress
+
+
+@dataclass
+class FrontierUpdate:
+    """Changes produced by a single progress event."""
+
+    newly_unlocked: List[str] = field(default_factory=list)
+    newly_locked: List[str] = field(default_factory=list)
+    newly_available: List[str] = field(default_factory=list)
+    no_longer_available: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.newly_unlocked
+            or self.newly_locked
+            or self.newly_available
+            or self.no_longer_available
+        )
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "newly_unlocked": self.newly_unlocked,
+            "newly_locked": self.newly_locked,
+            "newly_available": self.newly_available,
+            "no_longer_available": self.no_longer_available,
+        }
+
+
+def _dependents(compiled: CompiledSkillTree) -> List[List[int]]:
+    """Reverse prerequisite index (reference id -> dependent node indices)."""
+    dependents = compiled.derived.get("dependents")
+    if dependents is None:
+        dependents = [[] for _ in compiled.ref_ids]
+        for i, node in enumerate(compiled.nodes):
+            for prereq in node.prerequisites:
+                dependents[compiled.ref_index[prereq]].append(i)
+        compiled.derived["dependents"] = dependents
+    return dependents
+
+
+def _xp_order(compiled: CompiledSkillTree, band: str) -> Tuple[List[int], List[int]]:
+    """Sorted XP requirements of a performance band and their node indices."""
+    orders = compiled.derived.setdefault("xp_order", {})
+    if band not in orders:
+        requirements = compiled.xp_requirements[band]
+        order = sorted(range(compiled.size), key=requirements.__getitem__)
+        orders[band] = ([requirements[i] for i in order], order)
+    return orders[band]
+
+
+class UnlockFrontier:
+    """
+    Unlocked and available node sets of one student, updated incrementally.
+
+    The frontier keeps a reference to the student's progress dictionary and
+    records events into it (in the dictionary's own nested or flat format).
+    Changes made to the dictionary by other code require ``refresh``.
+    """
+
+    def __init__(self, tree: Any, student_progress: Dict[str, Any]):
+        self.tree = tree
+        self.compiled: CompiledSkillTree = tree.compile()
+        self.student_progress = student_progress
+        self._dependents = _dependents(self.compiled)
+        self.unlocked: Set[int] = set()
+        self.available: Set[int] = set()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Recompute both sets from scratch (after arbitrary progress edits)."""
+        compiled = self.compiled
+        if compiled is not self.tree.compile():
+            # Tree structure changed since the frontier was built
+            self.compiled = compiled = self.tree.compile()
+            self._dependents = _dependents(compiled)
+
+        unlocked = compiled.unlocked_mask(self.student_progress)
+        available = compiled.next_available_mask(unlocked)
+        self.unlocked = set(mask_to_indices(unlocked))
+        self.available = set(mask_to_indices(available))
+        self._band = performance_band(self.student_progress)
+        self._xp = self.student_progress.get("total_xp", 0)
+
+    @property
+    def unlocked_ids(self) -> Set[str]:
+        return {self.compiled.node_ids[i] for i in self.unlocked}
+
+    @property
+    def available_ids(self) -> Set[str]:
+        return {self.compiled.node_ids[i] for i in self.available}
+
+    def get_unlocked_nodes(self) -> List[SkillNode]:
+        """Unlocked nodes in ``SkillTree.get_unlocked_nodes`` order."""
+        nodes = self.compiled.nodes
+        return [nodes[i] for i in self.compiled.sort_order if i in self.unlocked]
+
+    def get_next_available_nodes(self, limit: int = 5) -> List[SkillNode]:
+        """Personalized next nodes, as ``SkillTree.get_next_available_nodes``."""
+        nodes = [self.compiled.nodes[i] for i in sorted(self.available)]
+        nodes = self.tree._personalize_recommendations(nodes, self.student_progress)
+        return nodes[:limit]
+
+    def _skills(self) -> Dict[str, Any]:
+        """
+        Per-skill records, created in the nested ``"skills"`` format unless
+        the progress already keeps flat records (skill ids at the top level).
+        """
+        progress = self.student_progress
+        if "skills" not in progress and any(
+            isinstance(value, dict) and key in self.compiled.ref_index
+            for key, value in progress.items()
+        ):
+            return progress
+        return progress.setdefault("skills", {})
+
+    def complete_skill(
+        self,
+        skill_id: str,
+        mastery_score: Optional[float] = None,
+        completed: bool = True,
+        **skill_data: Any,
+    ) -> FrontierUpdate:
+        """Record a skill completion (or un-completion) and update dependents."""
+        skill_data["completed"] = completed
+        if mastery_score is not None:
+            skill_data["mastery_score"] = mastery_score
+        if LEARNING_STATS_KEY in self.student_progress:
+            # Keep the student's learning statistics in step with the record
+            record_skill_progress(self.student_progress, skill_id, **skill_data)
+        else:
+            self._skills().setdefault(skill_id, {}).update(skill_data)
+
+        ref = self.compiled.ref_index.get(skill_id)
+        if ref is None:
+            return self._reevaluate(self.compiled.override_nodes)
+        return self._reevaluate(self._dependents[ref] + self.compiled.override_nodes)
+
+    def set_total_xp(self, total_xp: int) -> FrontierUpdate:
+        """Record a new XP total and update nodes whose requirement was crossed."""
+        self.student_progress["total_xp"] = total_xp
+        band = performance_band(self.student_progress)
+        if band != self._band:
+            return self._full_update()
+
+        old_xp, self._xp = self._xp, total_xp
+        low, high = sorted((old_xp, total_xp))
+        requirements, order = _xp_order(self.compiled, band)
+        start = bisect_right(requirements, low)
+        end = bisect_right(requirements, high)
+        return self._reevaluate(order[start:end] + self.compiled.override_nodes)
+
+    def add_xp(self, amount: int) -> FrontierUpdate:
+        """Record an XP award."""
+        return self.set_total_xp(self.student_progress.get("total_xp", 0) + amount)
+
+    def set_average_performance(self, average_performance: float) -> FrontierUpdate:
+        """Record a new performance average (may move every XP requirement)."""
+        self.student_progress["average_performance"] = average_performance
+        if performance_band(self.student_progress) == self._band:
+            return FrontierUpdate()
+        return self._full_update()
+
+    def requirements_changed(self) -> FrontierUpdate:
+        """Re-check nodes with custom unlock requirements (badges, quizzes, ...)."""
+        return self._reevaluate(
+            self.compiled.requirement_nodes + self.compiled.override_nodes
+        )
+
+    def _full_update(self) -> FrontierUpdate:
+        before_unlocked, before_available = self.unlocked_ids, self.available_ids
+        self.refresh()
+        unlocked, available = self.unlocked_ids, self.available_ids
+        return FrontierUpdate(
+            newly_unlocked=sorted(unlocked - before_unlocked),
+            newly_locked=sorted(before_unlocked - unlocked),
+            newly_available=sorted(available - before_available),
+            no_longer_available=sorted(before_available - available),
+        )
+
+    def _reevaluate(self, candidates: Iterable[int]) -> FrontierUpdate:
+        compiled = self.compiled
+        ids = compiled.node_ids
+        update = FrontierUpdate()
+
+        flipped = []
+        for i in candidates:
+            now_unlocked = compiled.is_node_unlocked(i, self.student_progress)
+            if now_unlocked == (i in self.unlocked):
+                continue
+            if now_unlocked:
+                self.unlocked.add(i)
+                update.newly_unlocked.append(ids[i])
+            else:
+                self.unlocked.discard(i)
+                update.newly_locked.append(ids[i])
+            flipped.append(i)
+
+        # Availability depends on the unlock status of a node's prerequisites
+        affected = set(flipped)
+        for i in flipped:
+            affected.update(self._dependents[i])
+        for i in sorted(affected):
+            now_available = self._is_available(i)
+            if now_available == (i in self.available):
+                continue
+            if now_available:
+                self.available.add(i)
+                update.newly_available.append(ids[i])
+            else:
+                self.available.discard(i)
+                update.no_longer_available.append(ids[i])
+
+        return update
+
+    def _is_available(self, i: int) -> bool:
+        if i in self.unlocked:
+            return False
+        compiled = self.compiled
+        if compiled.node_ids[i] in compiled.dangling_prerequisites:
+            return False  # unknown prerequisites are never unlocked
+        return all(p in self.unlocked for p in compiled.prereq_indices[i])
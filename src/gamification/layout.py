@@ -0,0 +1,185 @@
+"""
+Layered Skill Tree Layout
+
+Sugiyama-style hierarchical layout for skill tree visualizations:
+
+1. Layering: longest-path layering, so every prerequisite sits above the
+   skills it enables (edges on a circular chain are ignored)
+2. Long edges are split by virtual nodes, one per intermediate layer.
+   Edges leaving the same prerequisite share one chain of virtual nodes
+   (the edges are bundled), so a prerequisite of many later skills adds
+   one virtual node per layer it spans rather than one per edge and layer
+3. Crossing reduction: alternating downward/upward barycenter sweeps
+4. Coordinates: layer index gives ``y``; order within the layer gives ``x``,
+   with every layer centered on the widest one
+
+The layout only depends on the tree structure, so it is computed once per
+compiled tree (or content version) and cached; per-student visualizations
+merge their status onto the precomputed coordinates.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .compiled import CompiledSkillTree
+
+# Layouts kept by content version, shared between trees of the same content
+SHARED_LAYOUTS = 32
+_shared_layouts: "OrderedDict[str, SkillTreeLayout]" = OrderedDict()
+
+
+@dataclass
+class SkillTreeLayout:
+    """Node coordinates and layer assignment of a skill tree."""
+
+    coordinates: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    layers: List[List[str]] = field(default_factory=list)
+    width: float = 0.0
+    height: float = 0.0
+    virtual_nodes: int = 0  # Routing points of the bundled long edges
+
+
+def compute_layout(
+    compiled: CompiledSkillTree,
+    horizontal_spacing: float = 150.0,
+    vertical_spacing: float = 100.0,
+    sweeps: int = 4,
+) -> SkillTreeLayout:
+    """
+    Compute a layered layout.
+
+    Takes roughly O(sweeps * (V + B + E) log V) time, where B is the number
+    of virtual nodes: per prerequisite, the number of layers spanned by its
+    longest edge (at most V times the number of layers, and usually far
+    fewer).
+    """
+    n = compiled.size
+    prereqs = compiled.prereq_indices
+    if n == 0:
+        return SkillTreeLayout()
+
+    # 1. Longest-path layering (Kahn); nodes left on cycles are placed below
+    # their already placed prerequisites
+    dependents: List[List[int]] = [[] for _ in range(n)]
+    remaining = [len(p) for p in prereqs]
+    for i, node_prereqs in enumerate(prereqs):
+        for p in node_prereqs:
+            dependents[p].append(i)
+
+    layer = [0] * n
+    placed = [False] * n
+    queue = [i for i in range(n) if remaining[i] == 0]
+    head = 0
+    while head < len(queue):
+        i = queue[head]
+        head += 1
+        placed[i] = True
+        for d in dependents[i]:
+            layer[d] = max(layer[d], layer[i] + 1)
+            remaining[d] -= 1
+            if remaining[d] == 0:
+                queue.append(d)
+    for i in range(n):
+        if not placed[i]:
+            layer[i] = max(
+                [layer[p] + 1 for p in prereqs[i] if placed[p]] or [layer[i]]
+            )
+            placed[i] = True
+
+    # 2. Virtual nodes for edges spanning several layers, one chain per
+    # prerequisite shared by all of its long edges
+    num_layers = max(layer) + 1
+    vertex_layer = list(layer)
+    up: List[List[int]] = [[] for _ in range(n)]
+    down: List[List[int]] = [[] for _ in range(n)]
+    chains: Dict[int, List[int]] = {}  # Prerequisite -> virtual node per layer
+    for i in range(n):
+        for p in prereqs[i]:
+            span = layer[i] - layer[p]
+            if span <= 0:
+                continue  # edge on a circular chain
+            previous = p
+            if span > 1:
+                chain = chains.setdefault(p, [])
+                while len(chain) < span - 1:
+                    virtual = len(vertex_layer)
+                    vertex_layer.append(layer[p] + len(chain) + 1)
+                    tail = chain[-1] if chain else p
+                    up.append([tail])
+                    down.append([])
+                    down[tail].append(virtual)
+                    chain.append(virtual)
+                previous = chain[span - 2]
+            up[i].append(previous)
+            down[previous].append(i)
+
+    layers: List[List[int]] = [[] for _ in range(num_layers)]
+    for v, v_layer in enumerate(vertex_layer):
+        layers[v_layer].append(v)
+    position = [0.0] * len(vertex_layer)
+    for members in layers:
+        for pos, v in enumerate(members):
+            position[v] = pos
+
+    # 3. Barycenter crossing reduction
+    def reorder(members: List[int], neighbors: List[List[int]]) -> None:
+        def barycenter(v: int) -> float:
+            adjacent = neighbors[v]
+            if not adjacent:
+                return position[v]
+            return sum(position[u] for u in adjacent) / len(adjacent)
+
+        members.sort(key=barycenter)
+        for pos, v in enumerate(members):
+            position[v] = pos
+
+    for _ in range(sweeps):
+        for k in range(1, num_layers):
+            reorder(layers[k], up)
+        for k in range(num_layers - 2, -1, -1):
+            reorder(layers[k], down)
+
+    # 4. Coordinates of the real nodes, layers centered on the widest one
+    real_layers = [[v for v in members if v < n] for members in layers]
+    widest = max(len(members) for members in real_layers)
+    result = SkillTreeLayout(
+        width=(widest - 1) * horizontal_spacing,
+        height=(num_layers - 1) * vertical_spacing,
+        virtual_nodes=len(vertex_layer) - n,
+    )
+    for k, members in enumerate(real_layers):
+        offset = (widest - len(members)) * horizontal_spacing / 2
+        result.layers.append([compiled.node_ids[v] for v in members])
+        for pos, v in enumerate(members):
+            result.coordinates[compiled.node_ids[v]] = {
+                "x": offset + pos * horizontal_spacing,
+                "y": (k + 1) * vertical_spacing,
+            }
+    return result
+
+
+def cached_layout(
+    compiled: CompiledSkillTree, version: Optional[str] = None
+) -> SkillTreeLayout:
+    """
+    Default layout of a compiled tree, computed once.
+
+    With the tree's content version, layouts are also shared between trees
+    of the same content (the most recent ``SHARED_LAYOUTS`` versions).
+    """
+    layout = compiled.derived.get("layout")
+    if layout is not None:
+        return layout
+
+    layout = _shared_layouts.get(version) if version is not None else None
+    if layout is None:
+        layout = compute_layout(compiled)
+        if version is not None:
+            _shared_layouts[version] = layout
+            while len(_shared_layouts) > SHARED_LAYOUTS:
+                _shared_layouts.popitem(last=False)
+    else:
+        _shared_layouts.move_to_end(version)
+    compiled.derived["layout"] = layout
+    return layout
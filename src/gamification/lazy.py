@@ -0,0 +1,262 @@
+"""
+Lazily Materialized Skill Trees
+
+A ``LazySkillTree`` reads a file written by ``save_tree`` (best with
+``detached_details=True``) and keeps only the graph skeleton in memory: node
+ids, the level column and the prerequisite adjacency, all read from the
+(memory-mapped) file. ``SkillNode`` and ``Badge`` objects, with their
+descriptions, resources and objectives, are decoded on first access and
+cached.
+
+Course-scoped work goes through ``subtree``, which materializes the selected
+nodes and their prerequisite closure into a regular ``SkillTree``, so the
+rest of the catalog is never decoded.
+"""
+
+import logging
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from . import Badge, SkillLevel, SkillNode, SkillTree
+from .serialization import SkillTreeFile, _decode_badge
+
+logger = logging.getLogger(__name__)
+
+
+class _LazyMapping(Mapping):
+    """Read-only id -> object mapping decoding values on first access."""
+
+    def __init__(self, keys: List[str], load: Callable[[int], Any]):
+        self._keys = keys
+        self._slot = {key: i for i, key in enumerate(keys)}
+        self._load = load
+        self._cache: Dict[int, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._slot[key]
+        value = self._cache.get(i)
+        if value is None:
+            value = self._cache[i] = self._load(i)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slot
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def loaded(self) -> int:
+        """Number of values decoded so far."""
+        return len(self._cache)
+
+    def clear(self) -> None:
+        """Drop the decoded values."""
+        self._cache.clear()
+
+
+class LazySkillTree:
+    """
+    Skill tree decoding nodes and badges from a saved file on access.
+
+    ``nodes`` and ``badges`` are read-only mappings; ``levels``,
+    ``categories`` and ``pathways`` are the stored indexes. Graph queries
+    (``prerequisites``, ``dependents``, ``prerequisite_closure``) use the
+    skeleton and do not decode nodes.
+    """
+
+    def __init__(self, path: str, use_mmap: bool = True, compact: bool = False):
+        if compact:
+            from .compact import CompactBadge, CompactSkillNode
+
+            self.node_class: type = CompactSkillNode
+            self.badge_class: type = CompactBadge
+        else:
+            self.node_class, self.badge_class = SkillNode, Badge
+
+        self.file = SkillTreeFile(path, use_mmap=use_mmap)
+        header = self.file.header
+        info = header["tree"]
+        self.name: str = info["name"]
+        self.description: str = info["description"]
+        self.metadata: Dict[str, Any] = info["metadata"]
+        self.version: str = info["version"]
+        self.levels: Dict[int, List[str]] = {
+            int(level): ids for level, ids in header["levels"].items()
+        }
+        self.categories: Dict[str, List[str]] = header["categories"]
+        self.pathways: Dict[str, Dict[str, Any]] = header["pathways"]
+
+        # Skeleton
+        self.node_ids: List[str] = self.file.node_ids
+        self.size = self.file.size
+        self.index: Dict[str, int] = {
+            node_id: i for i, node_id in enumerate(self.node_ids)
+        }
+        self._offsets = self.file.column("prereq_offsets")
+        self._refs = self.file.column("prereq_refs")
+        self._dependents: Optional[Any] = None
+
+        self._badge_data = header["badges"]
+        self.nodes = _LazyMapping(
+            self.node_ids, lambda i: self.file.node(i, self.node_class)
+        )
+        self.badges = _LazyMapping(
+            [data["id"] for data in self._badge_data],
+            lambda i: _decode_badge(self._badge_data[i], self.badge_class),
+        )
+
+    def __enter__(self) -> "LazySkillTree":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the backing file; nodes decoded so far stay usable."""
+        self._offsets = self._refs = None
+        self.file.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self.index
+
+    def _position(self, node_id: str) -> int:
+        i = self.index.get(node_id)
+        if i is None:
+            raise KeyError(f"Unknown skill '{node_id}'")
+        return i
+
+    def _prerequisite_refs(self, i: int) -> Any:
+        return self._refs[self._offsets[i] : self._offsets[i + 1]]
+
+    def level_of(self, node_id: str) -> SkillLevel:
+        """Level of a node, read from the level column."""
+        return SkillLevel(self.file.column("level")[self._position(node_id)])
+
+    def prerequisites(self, node_id: str) -> List[str]:
+        """Prerequisite ids of a node (including ids outside the tree)."""
+        ref_ids = self.file.ref_ids
+        return [ref_ids[r] for r in self._prerequisite_refs(self._position(node_id))]
+
+    def dependents(self, node_id: str) -> List[str]:
+        """Ids of the nodes listing ``node_id`` as a prerequisite."""
+        if self._dependents is None:
+            self._dependents = self._build_dependents()
+        offsets, refs = self._dependents
+        i = self._position(node_id)
+        return [self.node_ids[j] for j in refs[offsets[i] : offsets[i + 1]]]
+
+    def _build_dependents(self) -> Any:
+        """Reverse adjacency in CSR form (counting sort over the prerequisites)."""
+        size, offsets, refs = self.size, self._offsets, self._refs
+        counts = array("q", [0]) * (size + 1)
+        for r in refs:
+            if r < size:
+                counts[r + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+        fill = array("q", counts)
+        dependents = array("q", [0]) * counts[size]
+        for j in range(size):
+            for r in refs[offsets[j] : offsets[j + 1]]:
+                if r < size:
+                    dependents[fill[r]] = j
+                    fill[r] += 1
+        return counts, dependents
+
+    def prerequisite_closure(self, node_ids: Iterable[str]) -> List[str]:
+        """``node_ids`` plus everything they transitively require, in tree order."""
+        size = self.size
+        seen: Set[int] = set()
+        stack = [self._position(node_id) for node_id in node_ids]
+        while stack:
+            i = stack.pop()
+            if i in seen:
+                continue
+            seen.add(i)
+            stack.extend(r for r in self._prerequisite_refs(i) if r < size)
+        return [self.node_ids[i] for i in sorted(seen)]
+
+    @property
+    def materialized(self) -> int:
+        """Number of nodes decoded so far."""
+        return self.nodes.loaded
+
+    def release(self) -> None:
+        """Drop decoded nodes and badges (they are decoded again on access)."""
+        self.nodes.clear()
+        self.badges.clear()
+
+    def subtree(
+        self,
+        node_ids: Iterable[str] = (),
+        pathways: Iterable[str] = (),
+        categories: Iterable[str] = (),
+        include_prerequisites: bool = True,
+    ) -> SkillTree:
+        """
+        Regular ``SkillTree`` holding only part of the catalog.
+
+        The scope is the given nodes, pathways and categories, plus their
+        prerequisite closure unless ``include_prerequisites`` is False.
+        Pathways and badges are kept when every node they mention is in scope.
+        Node and badge objects are shared with this tree's caches.
+        """
+        selected: Dict[str, None] = dict.fromkeys(node_ids)
+        for name in pathways:
+            selected.update(dict.fromkeys(self.pathways[name]["nodes"]))
+        for category in categories:
+            selected.update(dict.fromkeys(self.categories.get(category, [])))
+        if include_prerequisites:
+            scope = self.prerequisite_closure(selected)
+        else:
+            scope = sorted(selected, key=self._position)
+        in_scope = set(scope)
+
+        tree = SkillTree(self.name, self.description, dict(self.metadata))
+        info = self.file.header["tree"]
+        tree.created_date = info["created_date"]
+        tree.version = self.version
+        tree.learning_analytics = dict(info["learning_analytics"])
+        for node_id in scope:
+            tree.nodes[node_id] = self.nodes[node_id]
+        for level, ids in self.levels.items():
+            kept = [node_id for node_id in ids if node_id in in_scope]
+            if kept:
+                tree.levels[level] = kept
+        for category, ids in self.categories.items():
+            kept = [node_id for node_id in ids if node_id in in_scope]
+            if kept:
+                tree.categories[category] = kept
+        for name, pathway in self.pathways.items():
+            if in_scope.issuperset(pathway["nodes"]):
+                tree.pathways[name] = {**pathway, "nodes": list(pathway["nodes"])}
+
+        badge_ids = set(self.badges)
+        for data in self._badge_data:
+            requirements = data["unlock_requirements"]
+            if all(
+                requirement in in_scope
+                or requirement in badge_ids
+                or requirement not in self.index
+                for requirement in requirements
+            ):
+                tree.badges[data["id"]] = self.badges[data["id"]]
+
+        tree.invalidate_caches()
+        logger.info(
+            f"Materialized {len(scope)} of {self.size} nodes of skill tree "
+            f"'{self.name}'"
+        )
+        return tree
+
+    def materialize(self) -> SkillTree:
+        """The whole catalog as a regular ``SkillTree``."""
+        return self.subtree(self.node_ids, include_prerequisites=False)
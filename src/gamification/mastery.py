@@ -0,0 +1,160 @@
+"""
+Streaming Mastery Scores
+
+``SkillNode.calculate_mastery_score`` is a recency-weighted average of a
+skill's assessment history: the k-th most recent score has weight
+``0.7 ** k``. The average is kept as a running state in the skill's
+progress record::
+
+    numerator   = 0.7 * numerator + score
+    denominator = 0.7 * denominator + 1
+
+so recording a score is O(1) and reading mastery is ``numerator /
+denominator``. The state stores the length and the last score of the history
+it covers; records whose history was appended to or whose latest score was
+replaced (a regrade) without updating the state fall back to the full
+computation until they are backfilled. Other edits (changing an earlier
+score) are not detected and need ``backfill_mastery_states(..., force=True)``.
+Backfills recompute states for many records at once, vectorized with numpy
+when it is available.
+"""
+
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+RECENCY_DECAY = 0.7
+MASTERY_STATE_KEY = "mastery_state"
+
+
+def _is_current(state: Optional[Dict[str, Any]], scores: List[float]) -> bool:
+    """Whether a state covers the history's length and last score."""
+    if state is None or state["count"] != len(scores):
+        return False
+    return state.get("last") == (scores[-1] if scores else None)
+
+
+def stored_mastery(skill_progress: Dict[str, Any]) -> Optional[float]:
+    """Mastery from the running state, or None if missing or stale."""
+    state = skill_progress.get(MASTERY_STATE_KEY)
+    if not _is_current(state, skill_progress.get("assessment_scores", [])):
+        return None
+    if state["count"] == 0:
+        return 0.0
+    return state["numerator"] / state["denominator"]
+
+
+def weighted_mastery(scores: List[float]) -> float:
+    """Recency-weighted average of a full assessment history."""
+    if not scores:
+        return 0.0
+
+    weighted_sum = 0
+    weight_sum = 0
+    for i, score in enumerate(scores):
+        weight = RECENCY_DECAY ** (len(scores) - i - 1)
+        weighted_sum += score * weight
+        weight_sum += weight
+
+    return weighted_sum / weight_sum if weight_sum > 0 else 0.0
+
+
+def record_assessment_score(skill_progress: Dict[str, Any], score: float) -> float:
+    """
+    Append an assessment score and update the running state in O(1).
+
+    Returns the new mastery score. A missing or stale state is rebuilt from
+    the history first.
+    """
+    scores = skill_progress.setdefault("assessment_scores", [])
+    state = skill_progress.get(MASTERY_STATE_KEY)
+    if not _is_current(state, scores):
+        state = rebuild_mastery_state(skill_progress)
+
+    scores.append(score)
+    state["numerator"] = RECENCY_DECAY * state["numerator"] + score
+    state["denominator"] = RECENCY_DECAY * state["denominator"] + 1
+    state["count"] += 1
+    state["last"] = score
+    return state["numerator"] / state["denominator"]
+
+
+def rebuild_mastery_state(skill_progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute the running state of one record from its history."""
+    numerator = 0.0
+    denominator = 0.0
+    scores = skill_progress.get("assessment_scores", [])
+    for score in scores:
+        numerator = RECENCY_DECAY * numerator + score
+        denominator = RECENCY_DECAY * denominator + 1
+    state = {
+        "numerator": numerator,
+        "denominator": denominator,
+        "count": len(scores),
+        "last": scores[-1] if scores else None,
+    }
+    skill_progress[MASTERY_STATE_KEY] = state
+    return state
+
+
+def backfill_mastery_states(
+    student_records: Iterable[Dict[str, Any]], force: bool = False
+) -> int:
+    """
+    Add running mastery states to every skill record of many students.
+
+    All histories are concatenated and weighted in one pass, then summed per
+    record. Records with a current state are skipped unless ``force`` is set
+    (needed after earlier scores were edited in place). Returns the number
+    of skill records updated.
+    """
+    pending = []
+    for student_progress in student_records:
+        for skill_progress in student_progress.get("skills", {}).values():
+            if not isinstance(skill_progress, dict):
+                continue
+            if force or stored_mastery(skill_progress) is None:
+                pending.append(skill_progress)
+
+    if not NUMPY_AVAILABLE or not pending:
+        for skill_progress in pending:
+            rebuild_mastery_state(skill_progress)
+        return len(pending)
+
+    histories = [record.get("assessment_scores", []) for record in pending]
+    lengths = np.array([len(history) for history in histories], dtype=np.int64)
+    scores = np.fromiter(
+        chain.from_iterable(histories), dtype=np.float64, count=int(lengths.sum())
+    )
+
+    # Each score's weight depends on its distance from the end of its history
+    ends = np.cumsum(lengths)
+    distance = np.repeat(ends, lengths) - 1 - np.arange(len(scores))
+    weights = (RECENCY_DECAY ** np.arange(int(lengths.max()), dtype=np.float64))[
+        distance
+    ]
+
+    numerators = np.zeros(len(pending), dtype=np.float64)
+    denominators = np.zeros(len(pending), dtype=np.float64)
+    scored = lengths > 0
+    if scored.any():
+        starts = (ends - lengths)[scored]
+        numerators[scored] = np.add.reduceat(scores * weights, starts)
+        denominators[scored] = np.add.reduceat(weights, starts)
+
+    for skill_progress, history, numerator, denominator in zip(
+        pending, histories, numerators.tolist(), denominators.tolist()
+    ):
+        skill_progress[MASTERY_STATE_KEY] = {
+            "numerator": numerator,
+            "denominator": denominator,
+            "count": len(history),
+            "last": history[-1] if history else None,
+        }
+    return len(pending)
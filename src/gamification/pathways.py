@@ -0,0 +1,212 @@
+"""
+Pathway Progress Index
+
+Pathways are named, ordered node lists. The index resolves them once against
+a compiled tree into positional arrays (pathway -> node indices in pathway
+order) and a reverse index (node -> pathways containing it), so that
+
+- a skill completion updates per-pathway counters of one student in time
+  proportional to the pathways containing the skill (``PathwayTracker``)
+- progress of every student in every pathway (the instructor heatmap) costs
+  one pass over each student's skill records (``PathwayIndex.heatmap``)
+
+Counts follow ``SkillTree.calculate_progress``: a pathway node counts once
+when its record in the nested ``skills`` dictionary is marked completed.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .compiled import CompiledSkillTree
+
+
+def _pathway_progress(completed: int, total: int) -> Dict[str, Any]:
+    return {
+        "completed": completed,
+        "total": total,
+        "percentage": (completed / total) * 100 if total else 0,
+    }
+
+
+class PathwayIndex:
+    """Positional and reverse indexes of a compiled tree's pathways."""
+
+    def __init__(self, compiled: CompiledSkillTree):
+        self.compiled = compiled
+        self.names: List[str] = [name for name, _, _ in compiled.pathway_groups]
+        self.totals: List[int] = [total for _, _, total in compiled.pathway_groups]
+        self.slot: Dict[str, int] = {name: g for g, name in enumerate(self.names)}
+        self.positions: List[Tuple[int, ...]] = compiled.pathway_positions
+
+        # Node -> pathways containing it (each pathway once)
+        node_pathways: List[List[int]] = [[] for _ in range(compiled.size)]
+        for g, positions in enumerate(self.positions):
+            for i in dict.fromkeys(positions):
+                node_pathways[i].append(g)
+        self.node_pathways: List[Tuple[int, ...]] = [
+            tuple(slots) for slots in node_pathways
+        ]
+
+    @classmethod
+    def for_tree(cls, compiled: CompiledSkillTree) -> "PathwayIndex":
+        """Cached index for a compiled tree."""
+        index = compiled.derived.get("pathway_index")
+        if index is None:
+            index = cls(compiled)
+            compiled.derived["pathway_index"] = index
+        return index
+
+    def pathways_of(self, node_id: str) -> List[str]:
+        """Names of the pathways containing a node."""
+        i = self.compiled.index.get(node_id)
+        if i is None:
+            return []
+        return [self.names[g] for g in self.node_pathways[i]]
+
+    def completed_counts(self, student_progress: Dict[str, Any]) -> List[int]:
+        """Completed nodes per pathway for one student."""
+        counts = [0] * len(self.names)
+        index, node_pathways = self.compiled.index, self.node_pathways
+        for skill_id, skill_data in student_progress.get("skills", {}).items():
+            i = index.get(skill_id)
+            if i is not None and skill_data.get("completed", False):
+                for g in node_pathways[i]:
+                    counts[g] += 1
+        return counts
+
+    def progress(self, counts: List[int]) -> Dict[str, Dict[str, Any]]:
+        """``pathway_progress`` section of ``calculate_progress`` from counts."""
+        return {
+            name: _pathway_progress(count, total)
+            for name, count, total in zip(self.names, counts, self.totals)
+        }
+
+    def next_nodes(self, student_progress: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        """First node of each pathway the student has not completed yet."""
+        skills = student_progress.get("skills", {})
+        node_ids = self.compiled.node_ids
+        next_nodes: Dict[str, Optional[str]] = {}
+        for name, positions in zip(self.names, self.positions):
+            next_nodes[name] = next(
+                (
+                    node_ids[i]
+                    for i in positions
+                    if not skills.get(node_ids[i], {}).get("completed", False)
+                ),
+                None,
+            )
+        return next_nodes
+
+    def heatmap(
+        self,
+        cohort: Iterable[Dict[str, Any]],
+        pathways: Optional[Iterable[str]] = None,
+    ) -> "PathwayHeatmap":
+        """Progress of every student in every (or the given) pathway."""
+        slots = (
+            list(range(len(self.names)))
+            if pathways is None
+            else [self.slot[name] for name in pathways]
+        )
+        student_ids, rows = [], []
+        for student_progress in cohort:
+            counts = self.completed_counts(student_progress)
+            student_ids.append(str(student_progress.get("student_id", "unknown")))
+            rows.append([counts[g] for g in slots])
+        return PathwayHeatmap(
+            student_ids=student_ids,
+            pathways=[self.names[g] for g in slots],
+            totals=[self.totals[g] for g in slots],
+            completed=rows,
+        )
+
+
+@dataclass
+class PathwayHeatmap:
+    """Students x pathways completed-node counts."""
+
+    student_ids: List[str]
+    pathways: List[str]
+    totals: List[int]
+    completed: List[List[int]]
+
+    def percentages(self) -> List[List[float]]:
+        """Completion percentage of every student in every pathway."""
+        return [
+            [
+                (count / total) * 100 if total else 0
+                for count, total in zip(row, self.totals)
+            ]
+            for row in self.completed
+        ]
+
+    def pathway_averages(self) -> Dict[str, float]:
+        """Mean completion percentage of each pathway over the class."""
+        rows = self.percentages()
+        if not rows:
+            return {name: 0 for name in self.pathways}
+        return {
+            name: sum(row[g] for row in rows) / len(rows)
+            for g, name in enumerate(self.pathways)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "students": self.student_ids,
+            "pathways": self.pathways,
+            "totals": self.totals,
+            "completed": self.completed,
+            "percentages": self.percentages(),
+        }
+
+
+class PathwayTracker:
+    """
+    Per-pathway progress of one student, updated per skill event.
+
+    The tracker does not write to the progress dictionary; report each
+    completion change with ``record_completion`` after recording it, or call
+    ``refresh`` after arbitrary edits.
+    """
+
+    def __init__(self, tree: Any, student_progress: Dict[str, Any]):
+        self.tree = tree
+        self.student_progress = student_progress
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Recompute the counters from the student's progress record."""
+        self.index = PathwayIndex.for_tree(self.tree.compile())
+        index = self.index.compiled.index
+        self.completed = {
+            index[skill_id]
+            for skill_id, skill_data in self.student_progress.get("skills", {}).items()
+            if skill_id in index and skill_data.get("completed", False)
+        }
+        self.counts = self.index.completed_counts(self.student_progress)
+
+    def record_completion(
+        self, skill_id: str, completed: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Update the pathways containing a skill; returns those that changed."""
+        i = self.index.compiled.index.get(skill_id)
+        if i is None or (i in self.completed) == completed:
+            return {}
+
+        delta = 1 if completed else -1
+        if completed:
+            self.completed.add(i)
+        else:
+            self.completed.discard(i)
+
+        changed = {}
+        for g in self.index.node_pathways[i]:
+            self.counts[g] += delta
+            changed[self.index.names[g]] = _pathway_progress(
+                self.counts[g], self.index.totals[g]
+            )
+        return changed
+
+    def progress(self) -> Dict[str, Dict[str, Any]]:
+        """Current progress in every pathway."""
+        return self.index.progress(self.counts)
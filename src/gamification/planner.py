@@ -0,0 +1,178 @@
+"""
+Learning Path Planner
+
+Minimum-time study plans toward a target node or pathway. Prerequisites
+are conjunctive, so the work needed for a target is its prerequisite
+closure minus what the student has already satisfied; the closure is
+weighted by ``estimated_time_minutes`` and returned in a valid topological
+study order.
+
+Ancestor closures are student independent and memoized per target on the
+compiled tree, so planning the same target for many students only repeats a
+linear sweep over the cached closure.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .compiled import CompiledSkillTree, skills_view
+
+
+@dataclass
+class StudyPlan:
+    """Ordered study steps toward one or more target nodes."""
+
+    targets: List[str]
+    steps: List[str] = field(default_factory=list)
+    total_minutes: int = 0
+    blocked_by: List[str] = field(default_factory=list)  # Unknown prerequisites
+
+    @property
+    def reachable(self) -> bool:
+        return not self.blocked_by
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "targets": self.targets,
+            "steps": self.steps,
+            "total_minutes": self.total_minutes,
+            "total_hours": round(self.total_minutes / 60, 1),
+            "blocked_by": self.blocked_by,
+        }
+
+
+class LearningPathPlanner:
+    """Prerequisite-closure planner over a compiled tree."""
+
+    def __init__(self, compiled: CompiledSkillTree):
+        self.compiled = compiled
+        n = compiled.size
+        prereqs = compiled.prereq_indices
+
+        # Topological positions (Kahn); nodes on or behind a cycle get none
+        dependents: List[List[int]] = [[] for _ in range(n)]
+        remaining = [len(p) for p in prereqs]
+        for i, node_prereqs in enumerate(prereqs):
+            for p in node_prereqs:
+                dependents[p].append(i)
+        order = [i for i in range(n) if remaining[i] == 0]
+        head = 0
+        while head < len(order):
+            i = order[head]
+            head += 1
+            for d in dependents[i]:
+                remaining[d] -= 1
+                if remaining[d] == 0:
+                    order.append(d)
+
+        self.position: Dict[int, int] = {i: pos for pos, i in enumerate(order)}
+        self.sinks: List[int] = [i for i in order if not dependents[i]]
+        self._closures: Dict[int, Tuple[int, ...]] = {}
+
+    @classmethod
+    def for_tree(cls, compiled: CompiledSkillTree) -> "LearningPathPlanner":
+        """Cached planner for a compiled tree."""
+        planner = compiled.derived.get("planner")
+        if planner is None:
+            planner = cls(compiled)
+            compiled.derived["planner"] = planner
+        return planner
+
+    def closure(self, i: int) -> Tuple[int, ...]:
+        """Node ``i`` and all its ancestors, in reverse topological order."""
+        cached = self._closures.get(i)
+        if cached is not None:
+            return cached
+
+        if i not in self.position:
+            raise ValueError(
+                f"Node '{self.compiled.node_ids[i]}' is part of or depends on a "
+                "circular prerequisite chain"
+            )
+
+        seen = {i}
+        stack = [i]
+        while stack:
+            for p in self.compiled.prereq_indices[stack.pop()]:
+                if p not in seen:
+                    seen.add(p)
+                    stack.append(p)
+
+        closure = tuple(sorted(seen, key=self.position.__getitem__, reverse=True))
+        self._closures[i] = closure
+        return closure
+
+    def plan(
+        self, student_progress: Dict[str, Any], target_ids: Iterable[str]
+    ) -> StudyPlan:
+        """Minimum-time plan covering every target node."""
+        compiled = self.compiled
+        target_ids = list(target_ids)
+        targets = []
+        for target_id in target_ids:
+            if target_id not in compiled.index:
+                raise ValueError(f"Unknown target node '{target_id}'")
+            targets.append(compiled.index[target_id])
+
+        skills = skills_view(student_progress)
+
+        def satisfied(p: int, threshold: Optional[float]) -> bool:
+            record = skills.get(compiled.ref_ids[p], {})
+            if not record.get("completed", False):
+                return False
+            return threshold is None or record.get("mastery_score", 1.0) >= threshold
+
+        # Sweep the union of closures from the targets toward the roots; a
+        # node is needed if a needed dependent is not yet satisfied by it
+        needed = set()
+        pending = set()
+        for t in targets:
+            if not satisfied(t, None):
+                pending.add(t)
+
+        candidates = set()
+        for t in targets:
+            candidates.update(self.closure(t))
+        sweep = sorted(candidates, key=self.position.__getitem__, reverse=True)
+
+        blocked = []
+        for i in sweep:
+            if i not in pending:
+                continue
+            needed.add(i)
+            node = compiled.nodes[i]
+            for p in compiled.prereq_indices[i]:
+                if not satisfied(p, node.mastery_threshold):
+                    pending.add(p)
+            for prereq in compiled.dangling_prerequisites.get(node.id, ()):
+                record = skills.get(prereq, {})
+                if not record.get("completed", False) or (
+                    record.get("mastery_score", 1.0) < node.mastery_threshold
+                ):
+                    blocked.append(prereq)
+
+        steps = sorted(needed, key=self.position.__getitem__)
+        return StudyPlan(
+            targets=target_ids,
+            steps=[compiled.node_ids[i] for i in steps],
+            total_minutes=sum(compiled.nodes[i].estimated_time_minutes for i in steps),
+            blocked_by=sorted(set(blocked)),
+        )
+
+    def cheapest_target(self, student_progress: Dict[str, Any]) -> Optional[StudyPlan]:
+        """Plan for the unfinished leaf node that is quickest to reach."""
+        skills = skills_view(student_progress)
+        best: Optional[StudyPlan] = None
+        for i in self.sinks:
+            node_id = self.compiled.node_ids[i]
+            if skills.get(node_id, {}).get("completed", False):
+                continue
+            plan = self.plan(student_progress, [node_id])
+            if not plan.reachable or not plan.steps:
+                continue
+            if best is None or (plan.total_minutes, len(plan.steps)) < (
+                best.total_minutes,
+                len(best.steps),
+            ):
+                best = plan
+        return best
@@ -0,0 +1,161 @@
+"""
+Unlock Requirement Compiler
+
+A node's ``unlock_requirements`` map requirement types to values, e.g.
+``{"badge_earned": "matrix_badge", "quiz_score": ("quiz_3", 0.8)}``. Each
+entry is compiled once into a predicate over a student's progress record by
+the factory registered for its type, with the value already unpacked and
+normalized. Compiled trees cache the predicates of all their nodes.
+
+Courses add requirement types by registering a factory::
+
+    @register_requirement("streak_days")
+    def streak_days(node, value):
+        return lambda progress: progress.get("streak", 0) >= value
+
+Unknown requirement types always pass, as they always have.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import SkillNode
+
+Predicate = Callable[[Dict[str, Any]], bool]
+RequirementFactory = Callable[[Any, Any], Predicate]
+
+
+def _always(progress: Dict[str, Any]) -> bool:
+    return True
+
+
+class RequirementRegistry:
+    """Requirement type -> predicate factory ``factory(node, value)``."""
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, RequirementFactory] = {}
+        self.version = 0  # Bumped on registration; invalidates compiled caches
+
+    def register(
+        self, requirement_type: str, factory: Optional[RequirementFactory] = None
+    ) -> Any:
+        """Register a factory (usable as a decorator); replaces existing ones."""
+
+        def decorator(factory: RequirementFactory) -> RequirementFactory:
+            self._factories[requirement_type] = factory
+            self.version += 1
+            return factory
+
+        if factory is not None:
+            return decorator(factory)
+        return decorator
+
+    def unregister(self, requirement_type: str) -> None:
+        """Remove a requirement type (it then always passes)."""
+        if self._factories.pop(requirement_type, None) is not None:
+            self.version += 1
+
+    @property
+    def requirement_types(self) -> List[str]:
+        return sorted(self._factories)
+
+    def compile(self, node: Any, requirement_type: str, value: Any) -> Predicate:
+        """Predicate of one requirement of ``node``."""
+        factory = self._factories.get(requirement_type)
+        if factory is None:
+            return _always
+        return factory(node, value)
+
+    def compile_node(self, node: Any) -> Tuple[Predicate, ...]:
+        """Predicates of all requirements of ``node``."""
+        if type(node)._check_requirement is not SkillNode._check_requirement:
+            # Subclasses with their own requirement logic keep using it
+            return tuple(
+                _bound_check(node, requirement_type, value)
+                for requirement_type, value in node.unlock_requirements.items()
+            )
+        return tuple(
+            self.compile(node, requirement_type, value)
+            for requirement_type, value in node.unlock_requirements.items()
+        )
+
+    def check_many(
+        self,
+        node: Any,
+        requirement_type: str,
+        value: Any,
+        student_records: Iterable[Dict[str, Any]],
+    ) -> List[bool]:
+        """Evaluate one requirement for many students, compiling it once."""
+        predicate = self.compile(node, requirement_type, value)
+        return [predicate(progress) for progress in student_records]
+
+
+def _bound_check(node: Any, requirement_type: str, value: Any) -> Predicate:
+    return lambda progress: node._check_requirement(requirement_type, value, progress)
+
+
+def _as_list(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+# Default registry used by SkillNode and compiled trees
+requirement_registry = RequirementRegistry()
+register_requirement = requirement_registry.register
+
+
+@register_requirement("quiz_score")
+def _quiz_score(node: Any, value: Any) -> Predicate:
+    quiz_id, min_score = value
+
+    def predicate(progress: Dict[str, Any]) -> bool:
+        return progress.get("quiz_scores", {}).get(quiz_id, 0) >= min_score
+
+    return predicate
+
+
+@register_requirement("assignment_completion")
+def _assignment_completion(node: Any, value: Any) -> Predicate:
+    assignment_ids = tuple(_as_list(value))
+    threshold = node.mastery_threshold
+
+    def predicate(progress: Dict[str, Any]) -> bool:
+        assignments = progress.get("assignments", {})
+        for assignment_id in assignment_ids:
+            assignment_data = assignments.get(assignment_id, {})
+            if not assignment_data.get("completed", False):
+                return False
+            # Check quality of completion
+            if assignment_data.get("score", 0) < threshold:
+                return False
+        return True
+
+    return predicate
+
+
+@register_requirement("badge_earned")
+def _badge_earned(node: Any, value: Any) -> Predicate:
+    badge_ids = _as_list(value)
+    if len(badge_ids) == 1:
+        badge_id = badge_ids[0]
+        return lambda progress: badge_id in progress.get("badges", [])
+
+    def predicate(progress: Dict[str, Any]) -> bool:
+        earned_badges = progress.get("badges", [])
+        return all(badge_id in earned_badges for badge_id in badge_ids)
+
+    return predicate
+
+
+def _minimum(field: str) -> RequirementFactory:
+    def factory(node: Any, value: Any) -> Predicate:
+        return lambda progress: progress.get(field, 0) >= value
+
+    return factory
+
+
+# Minimum time spent in previous activities
+register_requirement("time_spent", _minimum("total_time_spent"))
+# Social learning requirements
+register_requirement("peer_interactions", _minimum("peer_interaction_score"))
+# Overall mastery requirement
+register_requirement("mastery_level", _minimum("overall_mastery"))
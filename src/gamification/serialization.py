@@ -0,0 +1,457 @@
+"""
+Binary Skill Tree Format
+
+Versioned, columnar file format for persisting skill trees, so workers load
+prebuilt trees instead of rebuilding them from course JSON/YAML.
+
+Layout (all integers little-endian)::
+
+    preamble   magic "SKTR", format version (u16), flags (u16),
+               header length (u64)
+    header     UTF-8 JSON: tree metadata, node ids, names, descriptions,
+               non-default node fields, badges, pathways, the level and
+               category indexes, and the column directory
+    columns    8-byte aligned numeric arrays, one value per node:
+               level, difficulty, xp_required, estimated_time_minutes,
+               mastery_threshold, plus the prerequisite adjacency in CSR form
+               (prereq_offsets, prereq_refs)
+
+With the ``FLAG_DETACHED_DETAILS`` flag, descriptions and non-default fields
+are not part of the header but stored as one UTF-8 JSON record per node in a
+``details`` byte column (indexed by ``detail_offsets``), so a reader only
+parses the records of the nodes it decodes.
+
+Prerequisites refer to node indices; ids of prerequisites missing from the
+tree are appended after the node ids. Columns are read straight from the
+file buffer, which can be memory-mapped. Loading inserts nodes directly
+with the stored level/category indexes instead of going through
+``SkillTree.add_node``.
+"""
+
+import enum
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import MISSING, asdict, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import (
+    AccessibilityFeatures,
+    AdaptiveParameters,
+    Badge,
+    BadgeCategory,
+    DifficultyLevel,
+    LearningObjective,
+    SkillLevel,
+    SkillNode,
+    SkillTree,
+    SocialFeatures,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SKTR"
+FORMAT_VERSION = 1
+FLAG_DETACHED_DETAILS = 1
+_PREAMBLE = struct.Struct("<4sHHQ")
+_ALIGNMENT = 8
+
+_DIFFICULTIES = list(DifficultyLevel)
+
+# Node fields stored as columns or header arrays rather than per-node extras
+_COLUMN_FIELDS = {
+    "id",
+    "name",
+    "description",
+    "level",
+    "difficulty",
+    "xp_required",
+    "estimated_time_minutes",
+    "mastery_threshold",
+    "prerequisites",
+}
+
+_FEATURE_TYPES = {
+    "adaptive_params": AdaptiveParameters,
+    "social_features": SocialFeatures,
+    "accessibility": AccessibilityFeatures,
+}
+
+
+def _default(f: Any) -> Any:
+    if f.default is not MISSING:
+        return f.default
+    if f.default_factory is not MISSING:
+        return f.default_factory()
+    return MISSING
+
+
+def _encode(value: Any) -> Any:
+    """JSON-compatible form of a node or badge field value."""
+    if isinstance(value, LearningObjective):
+        return {"__objective__": value.to_dict()}
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (AdaptiveParameters, SocialFeatures, AccessibilityFeatures)):
+        return {key: _encode(item) for key, item in asdict(value).items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict) or hasattr(value, "items"):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _decode_objectives(values: List[Any]) -> List[Any]:
+    return [
+        LearningObjective(**value["__objective__"])
+        if isinstance(value, dict) and "__objective__" in value
+        else value
+        for value in values
+    ]
+
+
+def _decode_node_field(name: str, value: Any) -> Any:
+    if name == "learning_objectives":
+        return _decode_objectives(value)
+    if name == "adaptive_params":
+        value = dict(value)
+        value["base_difficulty"] = DifficultyLevel(value["base_difficulty"])
+        return AdaptiveParameters(**value)
+    if name in _FEATURE_TYPES:
+        return _FEATURE_TYPES[name](**value)
+    return value
+
+
+def _encode_badge(badge: Any) -> Dict[str, Any]:
+    return {f.name: _encode(getattr(badge, f.name)) for f in fields(Badge)}
+
+
+def _decode_badge(data: Dict[str, Any], badge_class: type) -> Any:
+    data = dict(data)
+    data["category"] = BadgeCategory(data["category"])
+    data["accessibility"] = AccessibilityFeatures(**data["accessibility"])
+    data["learning_objectives"] = _decode_objectives(data["learning_objectives"])
+    return badge_class(**data)
+
+
+def save_tree(tree: SkillTree, path: str, detached_details: bool = False) -> int:
+    """
+    Write ``tree`` to ``path`` in the binary format; returns bytes written.
+
+    Args:
+        tree: Tree to write
+        path: Output file
+        detached_details: Store node details outside the header, for readers
+            that decode only some nodes (see ``LazySkillTree``)
+    """
+    nodes = list(tree.nodes.values())
+    node_ids = [node.id for node in nodes]
+    ref_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    ref_ids = list(node_ids)
+
+    prereq_offsets = array("q", [0])
+    prereq_refs = array("q")
+    for node in nodes:
+        for prereq in node.prerequisites:
+            ref = ref_index.get(prereq)
+            if ref is None:
+                ref = ref_index[prereq] = len(ref_ids)
+                ref_ids.append(prereq)
+            prereq_refs.append(ref)
+        prereq_offsets.append(len(prereq_refs))
+
+    columns = {
+        "level": array("q", [node.level.value for node in nodes]),
+        "difficulty": array(
+            "q", [_DIFFICULTIES.index(node.difficulty) for node in nodes]
+        ),
+        "xp_required": array("q", [node.xp_required for node in nodes]),
+        "estimated_time_minutes": array(
+            "q", [node.estimated_time_minutes for node in nodes]
+        ),
+        "mastery_threshold": array("d", [node.mastery_threshold for node in nodes]),
+        "prereq_offsets": prereq_offsets,
+        "prereq_refs": prereq_refs,
+    }
+
+    # Only fields that differ from the dataclass defaults are stored per node
+    defaults = {
+        f.name: _encode(_default(f))
+        for f in fields(SkillNode)
+        if f.name not in _COLUMN_FIELDS
+    }
+    extras = []
+    for node in nodes:
+        node_extras = {}
+        for name, default in defaults.items():
+            value = _encode(getattr(node, name))
+            if value != default:
+                node_extras[name] = value
+        extras.append(node_extras)
+
+    flags = 0
+    if detached_details:
+        flags |= FLAG_DETACHED_DETAILS
+        detail_offsets = array("q", [0])
+        details = bytearray()
+        for node, node_extras in zip(nodes, extras):
+            details += json.dumps(
+                [node.description, node_extras], separators=(",", ":"), default=str
+            ).encode("utf-8")
+            detail_offsets.append(len(details))
+        columns["detail_offsets"] = detail_offsets
+        columns["details"] = array("B", details)  # Last: keeps columns aligned
+
+    directory = {}
+    offset = 0
+    for name, column in columns.items():
+        directory[name] = {
+            "type": column.typecode,
+            "offset": offset,
+            "length": len(column),
+        }
+        offset += len(column) * column.itemsize
+
+    header = {
+        "tree": {
+            "name": tree.name,
+            "description": tree.description,
+            "metadata": tree.metadata,
+            "created_date": tree.created_date,
+            "version": tree.version,
+            "learning_analytics": tree.learning_analytics,
+        },
+        "node_ids": node_ids,
+        "dangling_ids": ref_ids[len(node_ids) :],
+        "names": [node.name for node in nodes],
+        "badges": [_encode_badge(badge) for badge in tree.badges.values()],
+        "pathways": tree.pathways,
+        "levels": {str(level): ids for level, ids in tree.levels.items()},
+        "categories": tree.categories,
+        "columns": directory,
+    }
+    if not detached_details:
+        header["descriptions"] = [node.description for node in nodes]
+        header["extras"] = extras
+    header_bytes = json.dumps(header, separators=(",", ":"), default=str).encode(
+        "utf-8"
+    )
+    padding = -(_PREAMBLE.size + len(header_bytes)) % _ALIGNMENT
+
+    with open(path, "wb") as handle:
+        handle.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, flags, len(header_bytes)))
+        handle.write(header_bytes)
+        handle.write(b"\0" * padding)
+        for column in columns.values():
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            column.tofile(handle)
+        written = handle.tell()
+
+    logger.info(f"Saved skill tree '{tree.name}' ({len(nodes)} nodes) to {path}")
+    return written
+
+
+class SkillTreeFile:
+    """
+    Reader for the binary skill tree format.
+
+    Columns are views into the file buffer (memory-mapped with
+    ``use_mmap=True``); nodes are decoded individually on request.
+    """
+
+    def __init__(self, path: str, use_mmap: bool = False):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._memory: Optional[memoryview] = None
+        self._views: Dict[str, memoryview] = {}
+        with open(path, "rb") as handle:
+            if use_mmap:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer: Any = self._mmap
+            else:
+                buffer = handle.read()
+
+        if len(buffer) < _PREAMBLE.size:
+            self.close()
+            raise ValueError(f"{path} is not a skill tree file")
+        magic, version, flags, header_length = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a skill tree file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Unsupported skill tree format version {version} "
+                f"(expected {FORMAT_VERSION})"
+            )
+
+        header_end = _PREAMBLE.size + header_length
+        self.header: Dict[str, Any] = json.loads(
+            bytes(buffer[_PREAMBLE.size : header_end]).decode("utf-8")
+        )
+        self._memory = memoryview(buffer)
+        self._data_start = header_end + (-header_end % _ALIGNMENT)
+        self.node_ids: List[str] = self.header["node_ids"]
+        self.ref_ids: List[str] = self.node_ids + self.header["dangling_ids"]
+        self.size = len(self.node_ids)
+        self.detached_details = bool(flags & FLAG_DETACHED_DETAILS)
+
+    def __enter__(self) -> "SkillTreeFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release column views and the memory map."""
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        if self._memory is not None:
+            self._memory.release()
+            self._memory = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def column(self, name: str) -> Any:
+        """Numeric column as a read-only sequence."""
+        view = self._views.get(name)
+        if view is not None:
+            return view
+
+        entry = self.header["columns"][name]
+        typecode = entry["type"]
+        start = self._data_start + entry["offset"]
+        end = start + entry["length"] * array(typecode).itemsize
+        if sys.byteorder != "little":
+            column = array(typecode, self._memory[start:end].tobytes())
+            column.byteswap()
+            view = memoryview(column)
+        else:
+            with self._memory[start:end] as raw:
+                view = raw.cast(typecode)
+        self._views[name] = view
+        return view
+
+    def prerequisites(self, i: int) -> List[str]:
+        """Prerequisite ids of node ``i``."""
+        offsets = self.column("prereq_offsets")
+        refs = self.column("prereq_refs")
+        return [self.ref_ids[r] for r in refs[offsets[i] : offsets[i + 1]]]
+
+    def details(self, i: int) -> Tuple[str, Dict[str, Any]]:
+        """Description and encoded non-default fields of node ``i``."""
+        if not self.detached_details:
+            return self.header["descriptions"][i], self.header["extras"][i]
+        offsets = self.column("detail_offsets")
+        with self.column("details")[offsets[i] : offsets[i + 1]] as raw:
+            description, extras = json.loads(bytes(raw).decode("utf-8"))
+        return description, extras
+
+    def node(self, i: int, node_class: type = SkillNode) -> Any:
+        """Decode node ``i`` as ``node_class`` (``SkillNode`` or compatible)."""
+        description, extras = self.details(i)
+        kwargs = {
+            name: _decode_node_field(name, value) for name, value in extras.items()
+        }
+        return node_class(
+            id=self.node_ids[i],
+            name=self.header["names"][i],
+            description=description,
+            level=SkillLevel(self.column("level")[i]),
+            difficulty=_DIFFICULTIES[self.column("difficulty")[i]],
+            xp_required=self.column("xp_required")[i],
+            estimated_time_minutes=self.column("estimated_time_minutes")[i],
+            mastery_threshold=self.column("mastery_threshold")[i],
+            prerequisites=self.prerequisites(i),
+            **kwargs,
+        )
+
+    def nodes(self, node_class: type = SkillNode) -> List[Any]:
+        """Decode all nodes, reading each column once."""
+        header = self.header
+        levels = [SkillLevel(value) for value in self.column("level").tolist()]
+        difficulties = [_DIFFICULTIES[i] for i in self.column("difficulty").tolist()]
+        xp_required = self.column("xp_required").tolist()
+        estimated_times = self.column("estimated_time_minutes").tolist()
+        thresholds = self.column("mastery_threshold").tolist()
+        offsets = self.column("prereq_offsets").tolist()
+        refs = [self.ref_ids[r] for r in self.column("prereq_refs").tolist()]
+
+        nodes = []
+        for i, node_id in enumerate(self.node_ids):
+            description, extras = self.details(i)
+            if extras:
+                extras = {
+                    name: _decode_node_field(name, value)
+                    for name, value in extras.items()
+                }
+            nodes.append(
+                node_class(
+                    id=node_id,
+                    name=header["names"][i],
+                    description=description,
+                    level=levels[i],
+                    difficulty=difficulties[i],
+                    xp_required=xp_required[i],
+                    estimated_time_minutes=estimated_times[i],
+                    mastery_threshold=thresholds[i],
+                    prerequisites=refs[offsets[i] : offsets[i + 1]],
+                    **extras,
+                )
+            )
+        return nodes
+
+    def badges(self, badge_class: type = Badge) -> List[Any]:
+        """Decode all badges as ``badge_class``."""
+        return [_decode_badge(data, badge_class) for data in self.header["badges"]]
+
+    def new_tree(self) -> SkillTree:
+        """Empty tree carrying the stored metadata, pathways and indexes."""
+        info = self.header["tree"]
+        tree = SkillTree(info["name"], info["description"], info["metadata"])
+        tree.created_date = info["created_date"]
+        tree.version = info["version"]
+        tree.learning_analytics = info["learning_analytics"]
+        tree.pathways = self.header["pathways"]
+        tree.levels = {int(level): ids for level, ids in self.header["levels"].items()}
+        tree.categories = self.header["categories"]
+        return tree
+
+
+def load_tree(path: str, use_mmap: bool = False, compact: bool = False) -> SkillTree:
+    """
+    Load a tree written by ``save_tree``.
+
+    Args:
+        path: File written by ``save_tree``
+        use_mmap: Read columns from a memory map instead of a file copy
+        compact: Build ``CompactSkillNode``/``CompactBadge`` instances
+    """
+    if compact:
+        from .compact import CompactBadge, CompactSkillNode
+
+        node_class: type = CompactSkillNode
+        badge_class: type = CompactBadge
+    else:
+        node_class, badge_class = SkillNode, Badge
+
+    with SkillTreeFile(path, use_mmap=use_mmap) as reader:
+        tree = reader.new_tree()
+        for node in reader.nodes(node_class):
+            tree.nodes[node.id] = node
+        for badge in reader.badges(badge_class):
+            tree.badges[badge.id] = badge
+
+    tree.invalidate_caches()
+    logger.info(
+        f"Loaded skill tree '{tree.name}' ({len(tree.nodes)} nodes, "
+        f"{len(tree.badges)} badges) from {path}"
+    )
+    return tree
@@ -0,0 +1,392 @@
+"""
+Skill Tree Pacing Simulator
+
+Monte Carlo "what-if" runs of a skill tree before it is published. Synthetic
+students with sampled performance and daily study time work through the
+tree one day at a time:
+
+- each student studies the first unlocked, uncompleted node in
+  ``get_unlocked_nodes`` order for ``minutes_per_day`` minutes
+- once a node's ``estimated_time_minutes`` are spent, the student makes an
+  attempt scored around their performance; each attempt earns XP and a
+  passing score (at least the node's ``mastery_threshold``) completes the
+  node with that score as its mastery, otherwise the student retries
+- unlocks follow the compiled rules: adaptive XP requirement for the
+  student's performance band, prerequisites completed with sufficient
+  mastery
+
+The whole class is simulated at once as students x nodes NumPy matrices.
+Unlocks are maintained from the day's events (passed nodes, XP crossing a
+requirement) rather than re-evaluated for every student and node.
+Custom unlock requirements (quizzes, badges, ...) cannot be simulated and
+are treated as met; ``SimulationResult.unsimulated_nodes`` lists the nodes
+carrying them.
+
+Bottlenecks are the nodes students wait on longest: student-days in which
+every prerequisite was complete but the node stayed locked, either for lack
+of XP or because a prerequisite was passed below the node's threshold.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .compiled import (
+    CompiledSkillTree,
+    DEFAULT_PERFORMANCE_BAND,
+    HIGH_PERFORMANCE_BAND,
+    LOW_PERFORMANCE_BAND,
+)
+
+_BANDS = (HIGH_PERFORMANCE_BAND, LOW_PERFORMANCE_BAND, DEFAULT_PERFORMANCE_BAND)
+
+
+@dataclass
+class SimulationConfig:
+    """Population and study-behaviour parameters of a simulation."""
+
+    students: int = 1000
+    days: int = 365
+    # Performance (average score) ~ Normal(mean, sd), clipped to [0, 1],
+    # unless a sampler ``f(rng, students) -> array`` is given
+    performance_mean: float = 0.75
+    performance_sd: float = 0.12
+    performance_sampler: Optional[Callable[[Any, int], Any]] = field(
+        default=None, repr=False
+    )
+    minutes_per_day_mean: float = 60.0
+    minutes_per_day_sd: float = 20.0
+    min_minutes_per_day: float = 10.0
+    score_noise: float = 0.1  # Standard deviation of attempt scores
+    retry_fraction: float = 0.5  # Share of a node's time needed to retry it
+    xp_per_attempt: int = 100  # Scaled by the attempt score
+    mastery_bonus_xp: int = 50  # Awarded on passing
+    seed: Optional[int] = None
+
+
+@dataclass
+class SimulationResult:
+    """Per-student unlock/completion days and per-node aggregates."""
+
+    node_ids: List[str]
+    config: SimulationConfig
+    unlock_day: np.ndarray  # students x nodes, NaN when never unlocked
+    completion_day: np.ndarray  # students x nodes, NaN when never completed
+    attempts: np.ndarray  # students x nodes
+    xp_blocked_days: np.ndarray  # Per node, student-days locked for lack of XP
+    mastery_blocked_days: np.ndarray  # Per node, locked by prerequisite mastery
+    days_simulated: int
+    unsimulated_nodes: List[str] = field(default_factory=list)
+
+    def unlocked_fraction(self) -> np.ndarray:
+        return (~np.isnan(self.unlock_day)).mean(axis=0)
+
+    def completed_fraction(self) -> np.ndarray:
+        return (~np.isnan(self.completion_day)).mean(axis=0)
+
+    def time_to_unlock(
+        self, percentiles: Sequence[float] = (10, 50, 90)
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """Distribution of the unlock day of every node (over unlocking students)."""
+        unlocked = ~np.isnan(self.unlock_day)
+        distributions = {}
+        for j, node_id in enumerate(self.node_ids):
+            days = self.unlock_day[unlocked[:, j], j]
+            if len(days) == 0:
+                distributions[node_id] = {"mean": None, "min": None, "max": None}
+                distributions[node_id].update({f"p{p:g}": None for p in percentiles})
+                continue
+            stats: Dict[str, Optional[float]] = {
+                "mean": float(days.mean()),
+                "min": float(days.min()),
+                "max": float(days.max()),
+            }
+            for p, value in zip(percentiles, np.percentile(days, percentiles)):
+                stats[f"p{p:g}"] = float(value)
+            distributions[node_id] = stats
+        return distributions
+
+    def bottlenecks(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Nodes with the most student-days of waiting, worst first."""
+        blocked = self.xp_blocked_days + self.mastery_blocked_days
+        never_unlocked = 1.0 - self.unlocked_fraction()
+        order = np.argsort(-blocked, kind="stable")
+        bottlenecks = []
+        for j in order[:limit]:
+            if blocked[j] == 0:
+                break
+            bottlenecks.append(
+                {
+                    "node_id": self.node_ids[j],
+                    "blocked_student_days": int(blocked[j]),
+                    "average_wait_days": float(blocked[j]) / self.config.students,
+                    "reason": (
+                        "xp"
+                        if self.xp_blocked_days[j] >= self.mastery_blocked_days[j]
+                        else "prerequisite_mastery"
+                    ),
+                    "never_unlocked_fraction": float(never_unlocked[j]),
+                }
+            )
+        return bottlenecks
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for reports (distributions, fractions, bottlenecks)."""
+        unlocked = self.unlocked_fraction()
+        completed = self.completed_fraction()
+        mean_attempts = self.attempts.sum(axis=0) / np.maximum(
+            (~np.isnan(self.completion_day)).sum(axis=0), 1
+        )
+        time_to_unlock = self.time_to_unlock()
+        return {
+            "students": self.config.students,
+            "days_simulated": self.days_simulated,
+            "nodes": {
+                node_id: {
+                    "unlocked_fraction": float(unlocked[j]),
+                    "completed_fraction": float(completed[j]),
+                    "mean_attempts": float(mean_attempts[j]),
+                    "time_to_unlock": time_to_unlock[node_id],
+                }
+                for j, node_id in enumerate(self.node_ids)
+            },
+            "bottlenecks": self.bottlenecks(),
+            "unsimulated_nodes": self.unsimulated_nodes,
+        }
+
+
+class _TreeArrays:
+    """Array view of a compiled tree used by the simulation."""
+
+    def __init__(self, compiled: CompiledSkillTree):
+        n = compiled.size
+        self.size = n
+        self.estimated_minutes = np.array(
+            [node.estimated_time_minutes for node in compiled.nodes], dtype=np.float64
+        )
+        self.thresholds = np.array(
+            [node.mastery_threshold for node in compiled.nodes], dtype=np.float64
+        )
+
+        # Distinct prerequisites per node (ids outside the tree never complete)
+        # and the reverse edges between tree nodes, as CSR arrays
+        self.needed = np.zeros(n, dtype=np.int16)
+        dependents: List[List[int]] = [[] for _ in range(n)]
+        for i, node in enumerate(compiled.nodes):
+            refs = dict.fromkeys(compiled.ref_index[p] for p in node.prerequisites)
+            self.needed[i] = len(refs)
+            for ref in refs:
+                if ref < n:
+                    dependents[ref].append(i)
+        self.dependent_starts = np.cumsum(
+            [0] + [len(targets) for targets in dependents]
+        ).astype(np.intp)
+        self.dependents = np.array(
+            [i for targets in dependents for i in targets], dtype=np.intp
+        )
+
+        # Per performance band (high, low, default): XP requirement per node
+        # and the nodes sorted by it
+        self.xp_requirements = np.array(
+            [compiled.xp_requirements[band] for band in _BANDS], dtype=np.int64
+        ).reshape(len(_BANDS), n)
+        self.xp_order = np.argsort(self.xp_requirements, axis=1, kind="stable")
+        self.xp_sorted = np.take_along_axis(self.xp_requirements, self.xp_order, 1)
+
+        # Study order (get_unlocked_nodes order) and each node's position in it
+        self.study_order = np.array(compiled.sort_order, dtype=np.intp)
+        self.study_position = np.empty(n, dtype=np.intp)
+        self.study_position[self.study_order] = np.arange(n)
+
+
+def _expand_ranges(starts, ends):
+    """Row of each element and the concatenated ranges ``starts[k]:ends[k]``."""
+    lengths = ends - starts
+    rows = np.repeat(np.arange(len(starts)), lengths)
+    first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    offsets = np.arange(lengths.sum()) - first
+    return rows, np.repeat(starts, lengths) + offsets
+
+
+def _sample_population(config: SimulationConfig, rng: Any):
+    students = config.students
+    if config.performance_sampler is not None:
+        performance = np.asarray(
+            config.performance_sampler(rng, students), dtype=np.float64
+        )
+    else:
+        performance = rng.normal(
+            config.performance_mean, config.performance_sd, students
+        )
+    performance = np.clip(performance, 0.0, 1.0)
+    minutes_per_day = np.maximum(
+        rng.normal(config.minutes_per_day_mean, config.minutes_per_day_sd, students),
+        config.min_minutes_per_day,
+    )
+    # Adaptive XP bands of performance_band, in _BANDS order
+    bands = np.where(performance > 0.9, 0, np.where(performance < 0.6, 1, 2))
+    return performance, minutes_per_day, bands
+
+
+def simulate(
+    compiled: CompiledSkillTree, config: Optional[SimulationConfig] = None
+) -> SimulationResult:
+    """
+    Simulate a population of students working through a compiled tree.
+
+    Unlock state is maintained from events: a passed node increments the
+    satisfied-prerequisite counters of its dependents, and an XP gain
+    unlocks the nodes whose requirement it crossed (a slice of the
+    requirement-sorted node order). Work per day is proportional to the day's
+    attempts and unlocks, not to students x nodes.
+    """
+    config = config or SimulationConfig()
+    rng = np.random.default_rng(config.seed)
+    students, n = config.students, compiled.size
+    tree = _TreeArrays(compiled)
+    performance, minutes_per_day, bands = _sample_population(config, rng)
+
+    xp = np.zeros(students, dtype=np.int64)
+    target = np.full(students, -1, dtype=np.intp)
+    remaining = np.zeros(students, dtype=np.float64)
+    # Idle students whose available nodes changed since they last looked
+    needs_work = np.ones(students, dtype=bool)
+
+    # Prerequisites completed, and completed with the dependent's threshold
+    prerequisites_done = np.zeros((students, n), dtype=np.int16)
+    prerequisites_met = np.zeros((students, n), dtype=np.int16)
+    unlocked = np.zeros((students, n), dtype=bool)
+    available = np.zeros((students, n), dtype=bool)  # Columns in study order
+
+    nan = np.float32(np.nan)
+    unlock_day = np.full((students, n), nan, dtype=np.float32)
+    completion_day = np.full((students, n), nan, dtype=np.float32)
+    met_day = np.full((students, n), nan, dtype=np.float32)
+    done_day = np.full((students, n), nan, dtype=np.float32)
+    attempts = np.zeros((students, n), dtype=np.int32)
+
+    def unlock(rows, nodes, day):
+        fresh = ~unlocked[rows, nodes]
+        rows, nodes = rows[fresh], nodes[fresh]
+        unlocked[rows, nodes] = True
+        unlock_day[rows, nodes] = day
+        available[rows, tree.study_position[nodes]] = True
+        needs_work[rows] = True
+
+    # Nodes without prerequisites; XP 0 meets requirements of 0
+    roots = np.flatnonzero(tree.needed == 0)
+    met_day[:, roots] = 0
+    done_day[:, roots] = 0
+    rows, nodes = np.nonzero(tree.xp_requirements[bands][:, roots] <= 0)
+    unlock(rows, roots[nodes], 0)
+
+    day = 0
+    for day in range(1, config.days + 1):
+        # Idle students pick the first available node in study order
+        idle = np.flatnonzero((target < 0) & needs_work)
+        if len(idle):
+            choices = available[idle]
+            has_work = choices.any(axis=1)
+            starting = idle[has_work]
+            target[starting] = tree.study_order[choices[has_work].argmax(axis=1)]
+            remaining[starting] = tree.estimated_minutes[target[starting]]
+            needs_work[idle] = False
+
+        working = np.flatnonzero(target >= 0)
+        if len(working) == 0:
+            day -= 1  # Nothing can change any more
+            break
+
+        remaining[working] -= minutes_per_day[working]
+        attempting = working[remaining[working] <= 0]
+        nodes = target[attempting]
+        scores = np.clip(
+            performance[attempting]
+            + rng.normal(0.0, config.score_noise, len(attempting)),
+            0.0,
+            1.0,
+        )
+        attempts[attempting, nodes] += 1
+        old_xp = xp[attempting]
+        passed = scores >= tree.thresholds[nodes]
+        new_xp = (
+            old_xp
+            + (config.xp_per_attempt * scores).astype(np.int64)
+            + np.where(passed, config.mastery_bonus_xp, 0)
+        )
+        xp[attempting] = new_xp
+
+        failing = ~passed
+        remaining[attempting[failing]] = (
+            config.retry_fraction * tree.estimated_minutes[nodes[failing]]
+        )
+
+        passing, passed_nodes, passed_scores = (
+            attempting[passed],
+            nodes[passed],
+            scores[passed],
+        )
+        completion_day[passing, passed_nodes] = day
+        available[passing, tree.study_position[passed_nodes]] = False
+        target[passing] = -1
+        needs_work[passing] = True
+
+        # Passed nodes count towards their dependents' prerequisites (a student
+        # passes at most one node per day, so the (student, dependent) pairs
+        # are distinct)
+        k, edges = _expand_ranges(
+            tree.dependent_starts[passed_nodes], tree.dependent_starts[passed_nodes + 1]
+        )
+        rows, dependents = passing[k], tree.dependents[edges]
+        prerequisites_done[rows, dependents] += 1
+        finished = prerequisites_done[rows, dependents] == tree.needed[dependents]
+        done_day[rows[finished], dependents[finished]] = day
+        sufficient = passed_scores[k] >= tree.thresholds[dependents]
+        rows, dependents = rows[sufficient], dependents[sufficient]
+        prerequisites_met[rows, dependents] += 1
+        ready = prerequisites_met[rows, dependents] == tree.needed[dependents]
+        rows, dependents = rows[ready], dependents[ready]
+        met_day[rows, dependents] = day
+        xp_met = xp[rows] >= tree.xp_requirements[bands[rows], dependents]
+        unlock(rows[xp_met], dependents[xp_met], day)
+
+        # XP gains unlock ready nodes whose requirement they crossed
+        student_bands = bands[attempting]
+        k, positions = _expand_ranges(
+            _searchsorted_rows(tree.xp_sorted, student_bands, old_xp),
+            _searchsorted_rows(tree.xp_sorted, student_bands, new_xp),
+        )
+        rows = attempting[k]
+        crossed = tree.xp_order[student_bands[k], positions]
+        ready = prerequisites_met[rows, crossed] == tree.needed[crossed]
+        unlock(rows[ready], crossed[ready], day)
+
+    horizon = np.float32(config.days)
+    # Prerequisites met, waiting for XP; completed, but below a threshold
+    xp_wait = np.where(np.isnan(unlock_day), horizon, unlock_day) - met_day
+    mastery_wait = np.where(np.isnan(met_day), horizon - done_day, 0)
+    unsimulated = sorted(set(compiled.requirement_nodes) | set(compiled.override_nodes))
+    return SimulationResult(
+        node_ids=list(compiled.node_ids),
+        config=config,
+        unlock_day=unlock_day,
+        completion_day=completion_day,
+        attempts=attempts,
+        xp_blocked_days=np.nansum(xp_wait, axis=0).astype(np.int64),
+        mastery_blocked_days=np.nansum(mastery_wait, axis=0).astype(np.int64),
+        days_simulated=day,
+        unsimulated_nodes=[compiled.node_ids[i] for i in unsimulated],
+    )
+
+
+def _searchsorted_rows(sorted_rows, row_of, values):
+    """``searchsorted(sorted_rows[row_of[k]], values[k], "right")`` for every k."""
+    positions = np.empty(len(values), dtype=np.intp)
+    for row in range(len(sorted_rows)):
+        selected = row_of == row
+        if selected.any():
+            positions[selected] = np.searchsorted(
+                sorted_rows[row], values[selected], side="right"
+            )
+    return positions
@@ -0,0 +1,156 @@
+"""
+Skill Tree Structure Validation
+
+Single-pass structural analysis of a compiled skill tree, linear in the
+number of nodes and prerequisite edges and free of recursion, so it scales
+to trees with tens of thousands of nodes:
+
+- strongly connected components (iterative Tarjan) for circular dependencies
+- prerequisites naming no node in the tree
+- nodes unreachable from the root nodes (Kahn's algorithm); these can never
+  be unlocked through the tree
+- prerequisite depth statistics and a valid study order
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from .compiled import CompiledSkillTree
+
+
+@dataclass
+class TreeStructureReport:
+    """Result of ``analyze_structure``."""
+
+    cycles: List[List[str]] = field(default_factory=list)
+    dangling_prerequisites: Dict[str, List[str]] = field(default_factory=dict)
+    roots: List[str] = field(default_factory=list)
+    unreachable: List[str] = field(default_factory=list)
+    depths: Dict[str, int] = field(default_factory=dict)
+    topological_order: List[str] = field(default_factory=list)
+
+    def depth_statistics(self) -> Dict[str, Any]:
+        """Summary of prerequisite chain depths of the reachable nodes."""
+        if not self.depths:
+            return {"max_depth": 0, "average_depth": 0.0, "depth_histogram": {}}
+
+        histogram: Dict[int, int] = {}
+        for depth in self.depths.values():
+            histogram[depth] = histogram.get(depth, 0) + 1
+        return {
+            "max_depth": max(histogram),
+            "average_depth": round(sum(self.depths.values()) / len(self.depths), 2),
+            "depth_histogram": dict(sorted(histogram.items())),
+        }
+
+
+def strongly_connected_components(
+    adjacency: Sequence[Sequence[int]],
+) -> List[List[int]]:
+    """
+    Iterative Tarjan SCC over ``adjacency`` (node -> successors).
+
+    Components are returned in the order Tarjan completes them: every
+    component comes after all components reachable from it.
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for start in range(n):
+        if index[start] != -1:
+            continue
+
+        # Explicit call stack of (node, position in its successor list)
+        work = [(start, 0)]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack[start] = True
+
+        while work:
+            node, position = work[-1]
+            successors = adjacency[node]
+            if position < len(successors):
+                work[-1] = (node, position + 1)
+                succ = successors[position]
+                if index[succ] == -1:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    work.append((succ, 0))
+                elif on_stack[succ] and index[succ] < lowlink[node]:
+                    lowlink[node] = index[succ]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def analyze_structure(compiled: CompiledSkillTree) -> TreeStructureReport:
+    """Analyze cycles, dangling prerequisites, reachability and depth in O(V+E)."""
+    n = compiled.size
+    ids = compiled.node_ids
+    prereqs = compiled.prereq_indices
+    report = TreeStructureReport(
+        dangling_prerequisites={
+            node_id: list(missing)
+            for node_id, missing in compiled.dangling_prerequisites.items()
+        }
+    )
+
+    # Circular dependencies: components with more than one node or a self-loop
+    for component in strongly_connected_components(prereqs):
+        if len(component) > 1 or component[0] in prereqs[component[0]]:
+            report.cycles.append([ids[i] for i in sorted(component)])
+
+    # Reachability and depth: Kahn's algorithm from the root nodes. Unknown
+    # prerequisites are never satisfied, so their dependents stay unreached.
+    dependents: List[List[int]] = [[] for _ in range(n)]
+    remaining = [0] * n
+    for i, node in enumerate(compiled.nodes):
+        remaining[i] = len(node.prerequisites)
+        for p in prereqs[i]:
+            dependents[p].append(i)
+
+    depth = [0] * n
+    queue = [i for i in range(n) if remaining[i] == 0]
+    report.roots = [ids[i] for i in queue]
+    head = 0
+    while head < len(queue):
+        i = queue[head]
+        head += 1
+        for d in dependents[i]:
+            if depth[i] + 1 > depth[d]:
+                depth[d] = depth[i] + 1
+            remaining[d] -= 1
+            if remaining[d] == 0:
+                queue.append(d)
+
+    reached = [False] * n
+    for i in queue:
+        reached[i] = True
+    report.topological_order = [ids[i] for i in queue]
+    report.depths = {ids[i]: depth[i] for i in queue}
+    report.unreachable = [ids[i] for i in range(n) if not reached[i]]
+    return report
@@ -0,0 +1,235 @@
+"""
+Incremental Learning Statistics
+
+``SkillTree.calculate_progress`` reports a learning velocity (from skill
+completion dates) and a completion-time estimate (from the time spent per
+completed skill). Both are kept as running statistics in the student's
+progress record::
+
+    "learning_stats": {
+        "completion_times": [...],  # Sorted completion dates, epoch microseconds
+        "time_spent": 540,  # Total time_spent of all skill records
+        "completed": 9,  # Skill records marked completed
+        "records": 11,  # Skill records covered
+    }
+
+``record_skill_progress`` updates a skill record and the statistics
+together, parsing at most one date. Once a student has statistics it must be
+the only writer of their skill records (``SkillTree.record_skill_progress``
+and ``UnlockFrontier.complete_skill`` go through it): changes made to a
+record in place are not detected, because that would mean rescanning every
+record on each read. Code that edits records directly has to call
+``backfill_learning_stats(..., force=True)`` afterwards.
+
+As a safety net, statistics covering a different number of records than the
+student has (records added or removed directly) are treated as stale and
+the full computation over the skill records is used instead; it stays the
+reference path for ``verify_learning_stats``.
+"""
+
+import datetime
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LEARNING_STATS_KEY = "learning_stats"
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_SECONDS_PER_WEEK = 7 * 24 * 3600
+
+
+def _epoch_microseconds(completion_date: str) -> Optional[int]:
+    """Completion date as epoch microseconds (None if unparseable)."""
+    try:
+        moment = datetime.datetime.fromisoformat(completion_date)
+    except ValueError:
+        return None
+    epoch = _EPOCH if moment.tzinfo is None else _EPOCH_UTC
+    return (moment - epoch) // _MICROSECOND
+
+
+def _contribution(skill_data: Dict[str, Any]) -> Tuple[Any, bool, Optional[int]]:
+    """(time spent, completed, completion time) of one skill record."""
+    completed = bool(skill_data.get("completed", False))
+    completion_time = None
+    if completed and "completion_date" in skill_data:
+        completion_time = _epoch_microseconds(skill_data["completion_date"])
+    return skill_data.get("time_spent", 0), completed, completion_time
+
+
+def learning_stats(student_progress: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The running statistics, or None if missing or stale.
+
+    Only a changed number of skill records marks them stale; see the module
+    docstring for in-place edits.
+    """
+    stats = student_progress.get(LEARNING_STATS_KEY)
+    if stats is None:
+        return None
+    if stats["records"] != len(student_progress.get("skills", {})):
+        return None
+    return stats
+
+
+def rebuild_learning_stats(student_progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute the statistics from the skill records."""
+    skills = student_progress.get("skills", {})
+    completion_times = []
+    time_spent = 0
+    completed_count = 0
+    for skill_data in skills.values():
+        spent, completed, completion_time = _contribution(skill_data)
+        time_spent += spent
+        completed_count += completed
+        if completion_time is not None:
+            completion_times.append(completion_time)
+    completion_times.sort()
+
+    stats = {
+        "completion_times": completion_times,
+        "time_spent": time_spent,
+        "completed": completed_count,
+        "records": len(skills),
+    }
+    student_progress[LEARNING_STATS_KEY] = stats
+    return stats
+
+
+def record_skill_progress(
+    student_progress: Dict[str, Any], skill_id: str, **skill_data: Any
+) -> Dict[str, Any]:
+    """
+    Update a skill record and the learning statistics together.
+
+    The record's previous contribution is replaced by the new one, so the
+    cost does not depend on the number of skills. This must be the only
+    writer of skill records that have statistics. Returns the skill record.
+    """
+    skills = student_progress.setdefault("skills", {})
+    stats = learning_stats(student_progress)
+    if stats is None:
+        stats = rebuild_learning_stats(student_progress)
+
+    record = skills.get(skill_id)
+    if record is None:
+        record = skills[skill_id] = {}
+        stats["records"] += 1
+    else:
+        spent, completed, completion_time = _contribution(record)
+        stats["time_spent"] -= spent
+        stats["completed"] -= completed
+        if completion_time is not None:
+            times = stats["completion_times"]
+            del times[bisect_left(times, completion_time)]
+
+    record.update(skill_data)
+    spent, completed, completion_time = _contribution(record)
+    stats["time_spent"] += spent
+    stats["completed"] += completed
+    if completion_time is not None:
+        insort(stats["completion_times"], completion_time)
+    return record
+
+
+def backfill_learning_stats(
+    student_records: Iterable[Dict[str, Any]], force: bool = False
+) -> int:
+    """
+    Add statistics to many students (skipping current ones unless forced).
+
+    Use ``force=True`` after skill records were edited in place.
+    """
+    updated = 0
+    for student_progress in student_records:
+        if force or learning_stats(student_progress) is None:
+            rebuild_learning_stats(student_progress)
+            updated += 1
+    return updated
+
+
+def velocity_from_times(completion_times: List[int], records: int) -> Dict[str, Any]:
+    """Learning velocity from sorted completion times (epoch microseconds)."""
+    if records < 2 or len(completion_times) < 2:
+        return {"nodes_per_week": 0.0, "trend": "insufficient_data"}
+
+    def weeks(start: int, end: int) -> float:
+        return (end - start) / 10**6 / _SECONDS_PER_WEEK
+
+    count = len(completion_times)
+    first, last = completion_times[0], completion_times[-1]
+    nodes_per_week = count / max(weeks(first, last), 1)
+
+    # Calculate trend (acceleration/deceleration)
+    if count >= 4:
+        # Compare first half vs second half velocity
+        mid_point = count // 2
+        middle = completion_times[mid_point]
+        first_half_velocity = mid_point / max(weeks(first, middle), 1)
+        second_half_velocity = (count - mid_point) / max(weeks(middle, last), 1)
+
+        if second_half_velocity > first_half_velocity * 1.2:
+            trend = "accelerating"
+        elif second_half_velocity < first_half_velocity * 0.8:
+            trend = "decelerating"
+        else:
+            trend = "stable"
+    else:
+        trend = "stable"
+
+    return {
+        "nodes_per_week": round(nodes_per_week, 2),
+        "trend": trend,
+        "total_completed": count,
+    }
+
+
+def learning_velocity(student_progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Learning velocity, from the running statistics when they are current."""
+    stats = learning_stats(student_progress)
+    if stats is None:
+        return full_learning_velocity(student_progress)
+    return velocity_from_times(stats["completion_times"], stats["records"])
+
+
+def full_learning_velocity(student_progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Learning velocity recomputed from every skill record."""
+    skills = student_progress.get("skills", {})
+    completion_times = sorted(
+        completion_time
+        for _, _, completion_time in map(_contribution, skills.values())
+        if completion_time is not None
+    )
+    return velocity_from_times(completion_times, len(skills))
+
+
+def average_time_per_skill(student_progress: Dict[str, Any]) -> Optional[float]:
+    """
+    Time spent per completed skill (None without any skill records).
+
+    All records' time counts, divided by the number of completed ones.
+    """
+    stats = learning_stats(student_progress)
+    if stats is not None:
+        if not stats["records"]:
+            return None
+        return stats["time_spent"] / max(stats["completed"], 1)
+
+    skills = student_progress.get("skills", {})
+    if not skills:
+        return None
+    total_time = sum(skill.get("time_spent", 0) for skill in skills.values())
+    completed_count = sum(
+        1 for skill in skills.values() if skill.get("completed", False)
+    )
+    return total_time / max(completed_count, 1)
+
+
+def verify_learning_stats(student_progress: Dict[str, Any]) -> bool:
+    """Whether the stored statistics match a full recomputation."""
+    stats = student_progress.get(LEARNING_STATS_KEY)
+    if stats is None:
+        return False
+    expected = rebuild_learning_stats(dict(student_progress))
+    return stats == expected
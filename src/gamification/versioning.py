@@ -0,0 +1,205 @@
+"""
+Content-Addressed Tree Versions
+
+A tree version identifies the content of a tree: its nodes (including their
+prerequisite edges), badges and pathways, and the order in which nodes,
+badges and pathways (each kind separately) were added. Trees built from the
+same course definition get the same version, in any process, so derived data
+(layouts, visualization payloads, compiled evaluators) can be cached under it.
+
+Each element contributes a digest of its canonical encoding (timestamps such
+as ``created_date`` and ``last_updated`` are left out). The version combines
+
+- the sum of all element digests modulo 2**128, so replacing an element
+  swaps out its old digest
+- per kind, a rolling hash over element keys in insertion order, extended
+  when a new key is appended
+
+``SkillTree.add_node``, ``add_badge`` and ``create_pathway`` update the digest
+in place; ``invalidate_caches`` (after in-place edits or removals) drops it,
+and the next ``SkillTree.content_version`` rebuilds it from scratch.
+
+``TreeManifest`` records the element digests and prerequisite edges of one
+version, so later versions can be diffed against it (``diff_manifests``).
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Tuple
+
+from . import Badge, SkillNode
+from .serialization import _encode
+
+_DIGEST_SIZE = 16
+_MODULUS = 1 << (8 * _DIGEST_SIZE)
+_ORDER_MODULUS = (1 << 127) - 1  # Mersenne prime
+_ORDER_BASE = 0x9E3779B97F4A7C15F39CC0605CEDC835
+
+_TIMESTAMP_FIELDS = {"created_date", "last_updated"}
+_NODE_FIELDS = [f.name for f in fields(SkillNode) if f.name not in _TIMESTAMP_FIELDS]
+_BADGE_FIELDS = [f.name for f in fields(Badge) if f.name not in _TIMESTAMP_FIELDS]
+
+ElementKey = Tuple[str, str]  # (kind, id)
+KINDS = ("node", "badge", "pathway")
+
+
+def _hash(data: bytes) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest(), "little"
+    )
+
+
+def _payload(kind: str, value: Any) -> Any:
+    if kind == "node":
+        return {name: _encode(getattr(value, name)) for name in _NODE_FIELDS}
+    if kind == "badge":
+        return {name: _encode(getattr(value, name)) for name in _BADGE_FIELDS}
+    return {
+        name: _encode(item)
+        for name, item in value.items()
+        if name not in _TIMESTAMP_FIELDS
+    }
+
+
+def element_digest(kind: str, key: str, value: Any) -> int:
+    """Digest of one node, badge or pathway."""
+    encoded = json.dumps(
+        [kind, key, _payload(kind, value)],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return _hash(encoded.encode("utf-8"))
+
+
+class TreeDigest:
+    """Incrementally maintained content digest of a tree."""
+
+    def __init__(self) -> None:
+        self.elements: Dict[ElementKey, int] = {}
+        self.total = 0
+        self.order: Dict[str, int] = dict.fromkeys(KINDS, 0)
+
+    @classmethod
+    def of_tree(cls, tree: Any) -> "TreeDigest":
+        """Digest of every element of ``tree``, in insertion order."""
+        digest = cls()
+        for node_id, node in tree.nodes.items():
+            digest.set("node", node_id, node)
+        for badge_id, badge in tree.badges.items():
+            digest.set("badge", badge_id, badge)
+        for name, pathway in tree.pathways.items():
+            digest.set("pathway", name, pathway)
+        return digest
+
+    def set(self, kind: str, key: str, value: Any) -> None:
+        """Add an element or replace its previous content."""
+        element = (kind, key)
+        new = element_digest(kind, key, value)
+        old = self.elements.get(element)
+        if old is None:
+            key_hash = _hash(key.encode("utf-8"))
+            self.order[kind] = (
+                self.order[kind] * _ORDER_BASE + key_hash
+            ) % _ORDER_MODULUS
+        else:
+            self.total -= old
+        self.elements[element] = new
+        self.total = (self.total + new) % _MODULUS
+
+    @property
+    def version(self) -> str:
+        """Hex version string of the current content."""
+        combined = b"".join(
+            value.to_bytes(_DIGEST_SIZE, "little")
+            for value in (self.total, *self.order.values())
+        )
+        return hashlib.blake2b(combined, digest_size=_DIGEST_SIZE).hexdigest()
+
+
+@dataclass(frozen=True)
+class TreeManifest:
+    """Element digests and prerequisite edges of one tree version."""
+
+    version: str
+    elements: Dict[ElementKey, int]
+    prerequisites: Dict[str, Tuple[str, ...]]
+
+    @classmethod
+    def of_tree(cls, tree: Any) -> "TreeManifest":
+        digest = tree.content_digest()
+        return cls(
+            version=digest.version,
+            elements=dict(digest.elements),
+            prerequisites={
+                node_id: tuple(node.prerequisites)
+                for node_id, node in tree.nodes.items()
+            },
+        )
+
+    def ids(self, kind: str) -> List[str]:
+        return [key for element_kind, key in self.elements if element_kind == kind]
+
+
+@dataclass
+class TreeDiff:
+    """Structural changes between two tree versions."""
+
+    old_version: str
+    new_version: str
+    added_nodes: List[str] = field(default_factory=list)
+    removed_nodes: List[str] = field(default_factory=list)
+    changed_nodes: List[str] = field(default_factory=list)
+    added_edges: List[Tuple[str, str]] = field(default_factory=list)
+    removed_edges: List[Tuple[str, str]] = field(default_factory=list)
+    added_badges: List[str] = field(default_factory=list)
+    removed_badges: List[str] = field(default_factory=list)
+    changed_badges: List[str] = field(default_factory=list)
+    added_pathways: List[str] = field(default_factory=list)
+    removed_pathways: List[str] = field(default_factory=list)
+    changed_pathways: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether no element changed (the order may still differ)."""
+        return not any(
+            getattr(self, f.name)
+            for f in fields(self)
+            if f.name not in ("old_version", "new_version")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def diff_manifests(old: TreeManifest, new: TreeManifest) -> TreeDiff:
+    """Changes from ``old`` to ``new``; edges are (prerequisite, node) pairs."""
+    diff = TreeDiff(old_version=old.version, new_version=new.version)
+    for kind in KINDS:
+        old_ids, new_ids = old.ids(kind), new.ids(kind)
+        old_set, new_set = set(old_ids), set(new_ids)
+        getattr(diff, f"added_{kind}s").extend(
+            key for key in new_ids if key not in old_set
+        )
+        getattr(diff, f"removed_{kind}s").extend(
+            key for key in old_ids if key not in new_set
+        )
+        getattr(diff, f"changed_{kind}s").extend(
+            key
+            for key in new_ids
+            if key in old_set and old.elements[kind, key] != new.elements[kind, key]
+        )
+
+    for node_id in dict.fromkeys([*old.prerequisites, *new.prerequisites]):
+        before = old.prerequisites.get(node_id, ())
+        after = new.prerequisites.get(node_id, ())
+        if before == after:
+            continue
+        diff.added_edges.extend(
+            (prereq, node_id) for prereq in after if prereq not in before
+        )
+        diff.removed_edges.extend(
+            (prereq, node_id) for prereq in before if prereq not in after
+        )
+    return diff
@@ -22,12 +22,15 @@ __description__ = "Next-Generation Gamified Learning Platform"
 __author__ = "AI Agent Development Team"
 __description__ = "Next-Generation Gamified Learning Platform"
 
+import atexit
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 
+from .core.xp_curves import engine_level, engine_level_array
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -77,7 +80,12 @@ class StudentGameProfile:
 class GamificationEngine:
     """Central engine that coordinates all gamification systems"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        store: Optional["ProfileStore"] = None,
+        flush_batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
         # Initialize all subsystems
         self.rpg_system = RPGPlayerSystem()
         self.pet_system = MathPetSystem()
@@ -103,8 +111,23 @@ class GamificationEngine:
             "event_bonus": 1.0,
         }
 
-        self._load_data()
+        # Persistence: SQLite in the data directory unless another store is
+        # given; profile changes are written behind in batches, by a
+        # background thread at the latest flush_interval seconds after they
+        # were made, and at exit
+        self.store = store if store is not None else SQLiteProfileStore()
+        self._writer = ProfileWriteBuffer(
+            self.store,
+            self.student_profiles.get,
+            batch_size=flush_batch_size,
+            max_delay=flush_interval,
+        )
+        self._closed = False
+
         self._initialize_cross_system_achievements()
+        self._load_data()
+        self._writer.start()
+        atexit.register(self.close)
 
     def onboard_student(
         self, student_id: str, canvas_user_id: str = None, preferences: Dict = None
@@ -156,7 +179,7 @@ class GamificationEngine:
         self._give_welcome_rewards(student_id)
 
         logger.info(f"Gamification onboarding completed for student {student_id}")
-        self._save_data()
+        self._save_data(student_id)
         return True
 
     def _give_welcome_rewards(self, student_id: str):
@@ -252,15 +275,12 @@ class GamificationEngine:
 
     def _calculate_level(self, total_xp: int) -> int:
         """Calculate level based on total XP"""
-        # Level formula: each level requires more XP
-        level = 1
-        xp_needed = 0
-
-        while total_xp >= xp_needed:
-            level += 1
-            xp_needed += level * 100  # Each level needs level * 100 XP
+        # Level formula: each level needs level * 100 XP (closed-form inverse)
+        return engine_level(total_xp)
 
-        return level - 1
+    def calculate_levels(self, total_xp: Iterable[int]) -> List[int]:
+        """Levels of many XP totals at once (e.g. a whole roster)"""
+        return engine_level_array(list(total_xp)).tolist()
 
     def _handle_level_up(self, student_id: str, old_level: int, new_level: int):
         """Handle student leveling up"""
@@ -333,7 +353,7 @@ class GamificationEngine:
         )
         results["achievements_unlocked"] = achievements
 
-        self._save_data()
+        self._save_data(student_id)
         return results
 
     def _calculate_activity_xp(self, activity_type: str, performance_data: Dict) -> int:
@@ -505,7 +525,7 @@ class GamificationEngine:
         if rewards["daily_xp"] > 0:
             self.award_xp(student_id, rewards["daily_xp"], "daily_login")
 
-        self._save_data()
+        self._save_data(student_id)
         return rewards
 
     def _initialize_cross_system_achievements(self):
@@ -537,19 +557,48 @@ class GamificationEngine:
     def _load_data(self):
         """Load all gamification data"""
         try:
-            # In a real implementation, this would load from a database
-            pass
+            self.student_profiles.update(self.store.load_profiles())
+            self.cross_system_achievements.update(self.store.load_achievements())
+            logger.info(f"Loaded {len(self.student_profiles)} gamification profiles")
         except Exception as e:
             logger.error(f"Error loading gamification data: {e}")
 
-    def _save_data(self):
-        """Save all gamification data"""
+    def _save_data(self, student_id: Optional[str] = None):
+        """Queue a student's changes for the next batched write (all: write now)"""
         try:
-            # In a real implementation, this would save to a database
-            logger.debug("Gamification data saved successfully")
+            if student_id is not None:
+                self._writer.mark_dirty(student_id)
+            else:
+                self._writer.mark_many_dirty(list(self.student_profiles))
+                self.flush()
         except Exception as e:
             logger.error(f"Error saving gamification data: {e}")
 
+    def flush(self) -> int:
+        """Write pending profile changes and achievement definitions now"""
+        saved = self._writer.flush()
+        self.store.save_achievements(self.cross_system_achievements)
+        return saved
+
+    def close(self):
+        """Stop background flushing, write pending changes and close the store"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._writer.stop()
+        self.store.save_achievements(self.cross_system_achievements)
+        self.store.close()
+
+
+# Persistence backends (import the profile class defined above)
+from .storage import (
+    MemoryProfileStore,
+    ProfileStore,
+    ProfileWriteBuffer,
+    SQLiteProfileStore,
+)
+
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -28,6 +28,13 @@ import uuid
 import uuid
 import hashlib
 
+from .xp_curves import (
+    skill_total_xp,
+    skill_total_xp_array,
+    skill_xp_between,
+    skill_xp_requirement,
+)
+
 # Privacy-respecting analytics (FERPA compliant)
 try:
     from ...analytics.privacy_respecting_analytics import (
@@ -95,12 +102,9 @@ class Skill:
 
     def calculate_xp_requirement(self, level: int) -> int:
         """Calculate XP required for a specific level (exponential curve)"""
-        if level <= 1:
-            return 0
-        # RuneScape-inspired XP curve: exponential growth with diminishing returns
-        base = 100
-        multiplier = 1.1 ** (level - 1)
-        return int(base * multiplier)
+        # RuneScape-inspired XP curve: exponential growth with diminishing returns,
+        # tabulated once in xp_curves
+        return skill_xp_requirement(level)
 
     def add_experience(
         self, xp_gained: int, specialization: MathematicalSpecialization
@@ -349,13 +353,11 @@ class PlayerProfile:
 
     def calculate_total_xp(self) -> int:
         """Calculate total XP earned across all skills"""
-        total = 0
-        for skill in self.skills.values():
-            # Add current XP plus XP for completed levels
-            for level in range(1, skill.current_level):
-                total += skill.calculate_xp_requirement(level)
-            total += skill.current_xp
-        return total
+        # Current XP plus XP for completed levels (cumulative table lookup)
+        return sum(
+            skill_total_xp(skill.current_level, skill.current_xp)
+            for skill in self.skills.values()
+        )
 
     def get_specialization_bonuses(self) -> Dict[str, float]:
         """Get XP multipliers based on specialization"""
@@ -446,9 +448,7 @@ class PlayerProfile:
                     break
 
             if next_unlock_level:
-                xp_needed = 0
-                for lvl in range(skill.current_level + 1, next_unlock_level + 1):
-                    xp_needed += skill.calculate_xp_requirement(lvl)
+                xp_needed = skill_xp_between(skill.current_level, next_unlock_level)
                 xp_needed -= skill.current_xp
 
                 available_abilities.append(
@@ -924,6 +924,30 @@ class PlayerProfileManager:
 
         return profile.award_experience(skill_id, xp_amount, source)
 
+    def refresh_totals(self) -> None:
+        """Recompute total XP and total levels of every profile in one pass"""
+        # NumPy is only needed for roster-wide computations
+        import numpy as np
+
+        profiles = list(self.profiles.values())
+        owners, levels, current_xp = [], [], []
+        for i, profile in enumerate(profiles):
+            for skill in profile.skills.values():
+                owners.append(i)
+                levels.append(skill.current_level)
+                current_xp.append(skill.current_xp)
+
+        owners = np.asarray(owners, dtype=np.intp)
+        total_xp = np.zeros(len(profiles), dtype=np.int64)
+        total_levels = np.zeros(len(profiles), dtype=np.int64)
+        np.add.at(total_xp, owners, skill_total_xp_array(levels, current_xp))
+        np.add.at(total_levels, owners, np.asarray(levels, dtype=np.int64))
+        for profile, xp, level in zip(
+            profiles, total_xp.tolist(), total_levels.tolist()
+        ):
+            profile.total_xp = xp
+            profile.total_levels = level
+
     def get_leaderboard(
         self, metric: str = "total_xp", limit: int = 10
     ) -> List[Dict[str, Any]]:
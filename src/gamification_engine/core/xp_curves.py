@@ -0,0 +1,128 @@
+"""
+XP Curves
+=========
+
+Level computations for the two XP curves of the gamification engine,
+without level-by-level loops:
+
+- Engine levels (``GamificationEngine``): reaching level ``L`` takes
+  ``100 * k`` XP for every ``k`` in ``2..L``, i.e. a cumulative
+  ``100 * (L * (L + 1) / 2 - 1)``; the level of a total is inverted in
+  closed form with an integer square root.
+- Skill levels (``Skill``): level ``L >= 2`` requires ``int(100 * 1.1 **
+  (L - 1))`` XP. Requirements and their prefix sums are tabulated once,
+  shared by all profiles, and extended on demand; levels of a cumulative
+  total are found by bisection.
+
+The ``*_array`` variants compute whole rosters with NumPy.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, List
+
+ENGINE_XP_STEP = 100
+SKILL_BASE_XP = 100
+SKILL_GROWTH = 1.1
+
+
+# Engine curve
+
+
+def engine_level_threshold(level: int) -> int:
+    """Total XP at which the engine level ``level`` is reached"""
+    if level <= 1:
+        return 0
+    return ENGINE_XP_STEP * (level * (level + 1) // 2 - 1)
+
+
+def engine_level(total_xp: float) -> int:
+    """Engine level of a total XP (0 for negative totals)"""
+    if total_xp < 0:
+        return 0
+    # Largest L with L * (L + 1) / 2 <= total_xp // step + 1
+    m = math.floor(total_xp) // ENGINE_XP_STEP + 1
+    return (math.isqrt(8 * m + 1) - 1) // 2
+
+
+def engine_level_array(total_xp: Any) -> Any:
+    """Engine levels of many totals (NumPy array in, int64 array out)"""
+    # NumPy is only needed for roster-wide computations
+    import numpy as np
+
+    totals = np.floor(np.asarray(total_xp, dtype=np.float64)).astype(np.int64)
+    m = np.maximum(totals, 0) // ENGINE_XP_STEP + 1
+    root = _isqrt_array(8 * m + 1)
+    return np.where(totals < 0, 0, (root - 1) // 2)
+
+
+def _isqrt_array(values: Any) -> Any:
+    """Exact integer square roots of non-negative int64 values"""
+    import numpy as np
+
+    root = np.floor(np.sqrt(values.astype(np.float64))).astype(np.int64)
+    # Float rounding can be off by one for large values
+    root -= root * root > values
+    root += (root + 1) * (root + 1) <= values
+    return root
+
+
+# Skill curve
+
+_skill_requirements: List[int] = [0, 0]  # Index = level
+_skill_cumulative: List[int] = [0, 0]  # XP of levels 1..index
+
+
+def _extend_skill_tables(level: int) -> None:
+    for next_level in range(len(_skill_requirements), level + 1):
+        requirement = int(SKILL_BASE_XP * SKILL_GROWTH ** (next_level - 1))
+        _skill_requirements.append(requirement)
+        _skill_cumulative.append(_skill_cumulative[-1] + requirement)
+
+
+def skill_xp_requirement(level: int) -> int:
+    """XP required for a skill level (exponential curve)"""
+    if level <= 1:
+        return 0
+    if level >= len(_skill_requirements):
+        _extend_skill_tables(level)
+    return _skill_requirements[level]
+
+
+def skill_cumulative_xp(level: int) -> int:
+    """Sum of the requirements of skill levels ``1..level``"""
+    if level <= 1:
+        return 0
+    if level >= len(_skill_cumulative):
+        _extend_skill_tables(level)
+    return _skill_cumulative[level]
+
+
+def skill_xp_between(from_level: int, to_level: int) -> int:
+    """Sum of the requirements of skill levels ``from_level + 1..to_level``"""
+    if to_level <= from_level:
+        return 0
+    return skill_cumulative_xp(to_level) - skill_cumulative_xp(max(from_level, 0))
+
+
+def skill_level_for_xp(total_xp: float, max_level: int = 100) -> int:
+    """Highest skill level whose cumulative requirement ``total_xp`` covers"""
+    _extend_skill_tables(max_level)
+    return max(bisect_right(_skill_cumulative, total_xp, 1, max_level + 1) - 1, 1)
+
+
+def skill_total_xp(current_level: int, current_xp: int) -> int:
+    """Total XP earned in a skill (completed levels plus current progress)"""
+    return skill_cumulative_xp(current_level - 1) + current_xp
+
+
+def skill_total_xp_array(current_levels: Any, current_xp: Any) -> Any:
+    """``skill_total_xp`` of many skills (NumPy arrays in, int64 array out)"""
+    import numpy as np
+
+    levels = np.asarray(current_levels, dtype=np.int64)
+    completed = np.maximum(levels - 1, 0)
+    if completed.size:
+        _extend_skill_tables(int(completed.max()))
+    cumulative = np.asarray(_skill_cumulative, dtype=np.int64)
+    return cumulative[completed] + np.asarray(current_xp, dtype=np.int64)
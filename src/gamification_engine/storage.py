@@ -0,0 +1,320 @@
+"""
+Gamification Engine Persistence
+===============================
+
+Storage backends for ``StudentGameProfile`` records and cross-system
+achievement definitions, plus a write-behind buffer so that frequent
+profile updates (logins, activities) are written in batches instead of one
+synchronous save per event.
+
+- ``ProfileStore``: the pluggable interface
+- ``SQLiteProfileStore``: default backend, SQLite in WAL mode
+- ``MemoryProfileStore``: non-persistent backend for tests and demos
+- ``ProfileWriteBuffer``: dirty tracking and batched flushes, with an
+  optional background thread flushing changes that wait too long
+
+Stores and buffers are thread-safe, so one engine can serve the request
+threads of a Flask app.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import StudentGameProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "gamification_engine.db"
+# The project's data directory (next to config/), not the working directory
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+
+def default_db_path() -> str:
+    """
+    Database path from the environment
+
+    ``GAMIFICATION_DB_PATH`` names the file; relative paths are resolved
+    against ``GAMIFICATION_DATA_DIR`` (default: the project's data directory).
+    """
+    data_dir = Path(os.getenv("GAMIFICATION_DATA_DIR") or DEFAULT_DATA_DIR)
+    return str(data_dir / os.getenv("GAMIFICATION_DB_PATH", DEFAULT_DB_NAME))
+
+
+_PROFILE_FIELDS = {f.name for f in fields(StudentGameProfile)}
+
+
+def profile_to_record(profile: StudentGameProfile) -> Dict[str, Any]:
+    """JSON-compatible form of a profile"""
+    record = asdict(profile)
+    if profile.last_activity is not None:
+        record["last_activity"] = profile.last_activity.isoformat()
+    return record
+
+
+def profile_from_record(record: Dict[str, Any]) -> StudentGameProfile:
+    """Rebuild a profile, ignoring fields this version does not know"""
+    data = {key: value for key, value in record.items() if key in _PROFILE_FIELDS}
+    if data.get("last_activity"):
+        data["last_activity"] = datetime.fromisoformat(data["last_activity"])
+    return StudentGameProfile(**data)
+
+
+class ProfileStore(ABC):
+    """Interface of profile and achievement storage backends"""
+
+    @abstractmethod
+    def load_profiles(self) -> Dict[str, StudentGameProfile]:
+        """All stored profiles by student id"""
+
+    @abstractmethod
+    def save_profiles(self, profiles: Iterable[StudentGameProfile]) -> int:
+        """Insert or replace profiles in one batch; returns the number saved"""
+
+    @abstractmethod
+    def load_achievements(self) -> Dict[str, Dict]:
+        """Stored cross-system achievement definitions by name"""
+
+    @abstractmethod
+    def save_achievements(self, achievements: Dict[str, Dict]) -> None:
+        """Insert or replace achievement definitions"""
+
+    def close(self) -> None:
+        """Release backend resources"""
+
+
+class MemoryProfileStore(ProfileStore):
+    """Store keeping serialized records in memory (nothing survives the process)"""
+
+    def __init__(self):
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self.achievements: Dict[str, Dict] = {}
+        self.batches = 0
+
+    def load_profiles(self) -> Dict[str, StudentGameProfile]:
+        return {
+            student_id: profile_from_record(record)
+            for student_id, record in self.profiles.items()
+        }
+
+    def save_profiles(self, profiles: Iterable[StudentGameProfile]) -> int:
+        saved = 0
+        for profile in profiles:
+            self.profiles[profile.student_id] = profile_to_record(profile)
+            saved += 1
+        self.batches += 1
+        return saved
+
+    def load_achievements(self) -> Dict[str, Dict]:
+        return json.loads(json.dumps(self.achievements))
+
+    def save_achievements(self, achievements: Dict[str, Dict]) -> None:
+        self.achievements.update(json.loads(json.dumps(achievements)))
+
+
+class SQLiteProfileStore(ProfileStore):
+    """
+    SQLite backend (one JSON document per profile)
+
+    The database runs in WAL mode with ``synchronous=NORMAL``: readers do not
+    block the writer, and a batch costs one transaction commit. The
+    connection may be used from any thread; a lock serializes access to it.
+    """
+
+    def __init__(self, path: Optional[str] = None, synchronous: str = "NORMAL"):
+        path = path or default_db_path()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        journal_mode = self._connection.execute("PRAGMA journal_mode=WAL").fetchone()
+        if journal_mode[0].lower() != "wal":
+            logger.warning(f"SQLite database {path} is not using WAL mode")
+        self._connection.execute(f"PRAGMA synchronous={synchronous}")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "student_id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "updated_at TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS achievements ("
+                "name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def load_profiles(self) -> Dict[str, StudentGameProfile]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT student_id, data FROM profiles"
+            ).fetchall()
+        return {
+            student_id: profile_from_record(json.loads(data))
+            for student_id, data in rows
+        }
+
+    def save_profiles(self, profiles: Iterable[StudentGameProfile]) -> int:
+        updated_at = datetime.now().isoformat()
+        rows = [
+            (
+                profile.student_id,
+                json.dumps(profile_to_record(profile), default=str),
+                updated_at,
+            )
+            for profile in profiles
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO profiles (student_id, data, updated_at) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def load_achievements(self) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, data FROM achievements"
+            ).fetchall()
+        return {name: json.loads(data) for name, data in rows}
+
+    def save_achievements(self, achievements: Dict[str, Dict]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO achievements (name, data) VALUES (?, ?)",
+                [
+                    (name, json.dumps(data, default=str))
+                    for name, data in achievements.items()
+                ],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ProfileWriteBuffer:
+    """
+    Write-behind buffer for profile changes
+
+    Changed profiles are only marked dirty; they are written together when
+    ``batch_size`` profiles are pending, when the oldest pending change is
+    ``max_delay`` seconds old, or on ``flush``. The age is checked as changes
+    come in; after ``start`` a background thread also flushes every
+    ``max_delay`` seconds, so the last changes before a quiet period are not
+    left pending. Profiles are read through ``get_profile`` at flush time,
+    so repeated changes to one student cost a single write.
+
+    After a failed write, incoming changes no longer trigger flushes: the
+    background thread retries, or without one the next change made
+    ``max_delay`` seconds after the failure. A store outage therefore does
+    not turn every change into a failing write on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        get_profile: Callable[[str], Optional[StudentGameProfile]],
+        batch_size: int = 500,
+        max_delay: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.store = store
+        self.get_profile = get_profile
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.clock = clock
+        self.dirty: Dict[str, None] = {}
+        self._oldest: Optional[float] = None
+        self._failing = False  # Last write failed; back off
+        self._lock = threading.Lock()  # Guards dirty, _oldest and _failing
+        self._flush_lock = threading.Lock()  # One flush at a time
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of profiles waiting to be written"""
+        return len(self.dirty)
+
+    def mark_dirty(self, student_id: str) -> None:
+        """Queue a student's profile; flushes when the batch is due"""
+        with self._lock:
+            if not self.dirty:
+                self._oldest = self.clock()
+            self.dirty[student_id] = None
+            overdue = self.clock() - self._oldest >= self.max_delay
+            if self._failing:
+                due = overdue and self._thread is None
+            else:
+                due = overdue or len(self.dirty) >= self.batch_size
+        if due:
+            self.flush()
+
+    def mark_many_dirty(self, student_ids: Iterable[str]) -> None:
+        """Queue several profiles without triggering a flush"""
+        with self._lock:
+            if not self.dirty:
+                self._oldest = self.clock()
+            self.dirty.update(dict.fromkeys(student_ids))
+
+    def flush(self) -> int:
+        """Write all pending profiles in one batch; returns the number written"""
+        with self._flush_lock:
+            # Take the pending set; changes made during the write queue again
+            with self._lock:
+                if not self.dirty:
+                    return 0
+                student_ids = list(self.dirty)
+                self.dirty, self._oldest = {}, None
+
+            profiles: List[StudentGameProfile] = [
+                profile
+                for profile in map(self.get_profile, student_ids)
+                if profile is not None
+            ]
+            try:
+                saved = self.store.save_profiles(profiles)
+            except Exception as e:
+                # Keep the changes queued; the retry waits max_delay seconds
+                logger.error(f"Error saving {len(profiles)} gamification profiles: {e}")
+                with self._lock:
+                    self.dirty = {**dict.fromkeys(student_ids), **self.dirty}
+                    self._oldest = self.clock()
+                    self._failing = True
+                return 0
+            with self._lock:
+                self._failing = False
+        logger.debug(f"Saved {saved} gamification profiles")
+        return saved
+
+    def start(self) -> None:
+        """Flush pending changes from a daemon thread every ``max_delay`` seconds"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-write-buffer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write what is still pending"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.max_delay):
+            if self.dirty:
+                self.flush()
@@ -2,8 +2,10 @@
 Pytest configuration and fixtures for the Canvas Course Gamification Framework.
 """
 
+import importlib
 import pytest
 import os
+import types
 from pathlib import Path
 from unittest.mock import Mock
 import tempfile
@@ -326,6 +328,36 @@ def canvas_config():
     )
 
 
+@pytest.fixture
+def live_connector(monkeypatch):
+    """
+    Import the live connector with placeholder ``src.security`` modules.
+
+    The security package is not part of this repository; the connector only
+    constructs its classes, which the tests never call.
+    """
+    pytest.importorskip("aiohttp")
+
+    security = types.ModuleType("src.security")
+    oauth_manager = types.ModuleType("src.security.oauth_manager")
+    oauth_manager.OAuthManager = type("OAuthManager", (), {})
+    privacy_protection = types.ModuleType("src.security.privacy_protection")
+    privacy_protection.PrivacyProtectionSystem = type("PrivacyProtectionSystem", (), {})
+    for module in (security, oauth_manager, privacy_protection):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    # Import the connector modules against the placeholders, unload them after
+    connector_modules = (
+        "src.canvas_integration.live_connector",
+        "src.canvas_integration.multi_course",
+    )
+    for name in connector_modules:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    yield importlib.import_module("src.canvas_integration.live_connector")
+    for name in connector_modules:
+        sys.modules.pop(name, None)
+
+
 # Custom markers for different test types
 def pytest_configure(config):
     """Configure custom pytest markers"""
@@ -0,0 +1,97 @@
+"""
+Unit tests for the compiled assignment classifier.
+"""
+
+from src.canvas_integration.assignment_classifier import AssignmentClassifier
+
+LAB_CONFIG = {
+    "classification": {
+        "assignment_types": [
+            {"type": "lab", "keywords": ["lab"]},
+            {"type": "exam", "keywords": ["exam"]},
+        ],
+    },
+    "gamification": {"xp_values": {"lab": 40}, "xp_multipliers": {"lab": 1.5}},
+}
+
+
+class TestAssignmentClassifier:
+    """Test keyword rules, caching and custom types."""
+
+    def test_first_listed_rule_wins(self):
+        """Test rule priority and word-start matching."""
+        classifier = AssignmentClassifier()
+
+        def classify(name, **data):
+            return classifier.classify({"name": name, **data})
+
+        assert classify("Final Project: Exam Prep").assignment_type == "project"
+        assert classify("Midterm Quiz").assignment_type == "exam"
+        assert classify("Unit Test 2").assignment_type == "exam"
+        assert classify("HW3").assignment_type == "homework"
+        assert classify("Matthew's reading").assignment_type == "homework"
+        assert classify("Weekly check", submission_types=["online_quiz"]) == (
+            classify("Quiz 1")
+        )
+        category = classify("Eigenvalues and linear systems").skill_category
+        assert category == "eigenvalue_expertise"
+        assert classify("Reading").skill_category == "general_practice"
+
+    def test_cache_key_is_id_and_updated_at(self):
+        """Test that edited assignments are classified again."""
+        classifier = AssignmentClassifier()
+        assignment = {"id": 1, "name": "Quiz 1", "updated_at": "2024-01-01"}
+
+        assert classifier.classify(assignment).assignment_type == "quiz"
+        assert classifier.classify(dict(assignment)).assignment_type == "quiz"
+        renamed = {**assignment, "name": "Exam 1", "updated_at": "2024-01-02"}
+        assert classifier.classify(renamed).assignment_type == "exam"
+        # Without an id nothing is cached
+        classifier.classify({"name": "Quiz 2"})
+
+        stats = classifier.get_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+        assert stats["cached_assignments"] == 2
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the bounded cache size."""
+        classifier = AssignmentClassifier(cache_size=2)
+        for assignment_id in (1, 2, 1, 3):
+            classifier.classify({"id": assignment_id, "name": "Quiz"})
+
+        assert classifier.get_cache_stats()["cached_assignments"] == 2
+        classifier.classify({"id": 1, "name": "Quiz"})
+        assert classifier.cache_hits == 2
+
+    def test_custom_types_keep_their_xp_settings(self):
+        """Test a config-defined assignment type."""
+        classifier = AssignmentClassifier.from_config(LAB_CONFIG)
+        lab = classifier.classify({"name": "Lab 4", "points_possible": 10})
+
+        assert lab.assignment_type == "lab"
+        assert lab.xp_value == 40
+        assert lab.xp_multiplier == 1.5
+        assert "lab" in classifier.assignment_types
+
+    def test_connector_reports_custom_types_as_default(self, live_connector):
+        """Test that custom types do not abort the connector's sync."""
+        connector = live_connector.CanvasAPIConnector(config=LAB_CONFIG)
+
+        assert connector._classify_assignment({"name": "Lab 4"}) == (
+            live_connector.AssignmentType.HOMEWORK
+        )
+        assert connector._classify_assignment({"name": "Exam 1"}) == (
+            live_connector.AssignmentType.EXAM
+        )
+        assert connector._calculate_xp_value({"name": "Lab 4"}) == 40
+
+    def test_connector_paths_share_labels(self, live_connector):
+        """Test that both connector code paths use the classifier's labels."""
+        connector = live_connector.CanvasAPIConnector(config={})
+        assignment = {"name": "Matrix determinants", "description": ""}
+
+        assert connector._map_to_skill_category(assignment) == "matrix_mastery"
+        assert connector._extract_skill_category(assignment) == "matrix_mastery"
+        assert connector._categorize_assignment({"name": "Unit Test 2"}) == (
+            connector._classify_assignment({"name": "Unit Test 2"})
+        )
@@ -0,0 +1,346 @@
+"""
+Unit tests for the Canvas Live Events receiver and live XP awards.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.canvas_integration.live_events import LiveEventReceiver
+
+SECRET = "test-secret"
+PATH = "/canvas/live-events"
+
+
+def sign(body, secret=SECRET):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def envelope(event_name, **body):
+    return json.dumps({"metadata": {"event_name": event_name}, "body": body}).encode()
+
+
+async def post_events(receiver, requests):
+    """Post (body, signature) pairs to a receiver; returns the responses."""
+    app = web.Application()
+    app.router.add_post(PATH, receiver._handle_request)
+    responses = []
+    async with TestClient(TestServer(app)) as client:
+        for body, signature in requests:
+            response = await client.post(
+                PATH, data=body, headers={"X-Canvas-Signature": signature}
+            )
+            responses.append(
+                (response.status, dict(response.headers), await response.json())
+            )
+    return responses
+
+
+class TestLiveEventReceiver:
+    """Test signature checks, backpressure and dispatch."""
+
+    def test_valid_signature_accepted(self):
+        """Test that signed events are acknowledged and queued."""
+
+        async def scenario():
+            receiver = LiveEventReceiver(SECRET)
+            body = envelope("grade_change", user_id="1", score=8)
+            responses = await post_events(receiver, [(body, "sha256=" + sign(body))])
+            return receiver, responses
+
+        receiver, responses = asyncio.run(scenario())
+        assert responses[0][0] == 202
+        assert receiver.stats["accepted"] == 1
+        event_type, event, _ = receiver.queue.get_nowait()
+        assert event_type == "grade_change"
+        assert event["body"]["score"] == 8
+
+    def test_invalid_signature_rejected(self):
+        """Test that unsigned or wrongly signed events are rejected."""
+
+        async def scenario():
+            receiver = LiveEventReceiver(SECRET)
+            body = envelope("grade_change", user_id="1", score=8)
+            responses = await post_events(
+                receiver, [(body, sign(body, "other-secret")), (body, "")]
+            )
+            return receiver, responses
+
+        receiver, responses = asyncio.run(scenario())
+        assert [status for status, _, _ in responses] == [401, 401]
+        assert receiver.stats["rejected_signature"] == 2
+        assert receiver.queue.empty()
+
+    def test_full_queue_answers_retry_after(self):
+        """Test that a full queue answers 503 with Retry-After."""
+
+        async def scenario():
+            receiver = LiveEventReceiver(
+                SECRET, max_queue_size=1, retry_after_seconds=7
+            )
+            body = envelope("submission_created", user_id="1")
+            return receiver, await post_events(
+                receiver, [(body, sign(body)), (body, sign(body))]
+            )
+
+        receiver, responses = asyncio.run(scenario())
+        assert responses[0][0] == 202
+        status, headers, _ = responses[1]
+        assert status == 503
+        assert headers["Retry-After"] == "7"
+        assert receiver.stats["rejected_backpressure"] == 1
+
+    def test_dispatch_runs_sync_and_async_handlers(self):
+        """Test that typed and wildcard handlers all receive the event."""
+        received = []
+
+        async def on_grade(event):
+            received.append(("async", event["body"]["score"]))
+
+        async def scenario():
+            receiver = LiveEventReceiver(SECRET)
+            receiver.register_handler("grade_change", on_grade)
+            receiver.register_handler("*", lambda event: received.append(("sync", 0)))
+            event = receiver.parse_event(json.loads(envelope("grade_change", score=5)))
+            handled = await receiver.dispatch("grade_change", event)
+            unhandled = await receiver.dispatch("course_created", event)
+            return receiver, handled, unhandled
+
+        receiver, handled, unhandled = asyncio.run(scenario())
+        assert handled == 2
+        assert unhandled == 1  # Only the wildcard handler
+        assert received == [("async", 5), ("sync", 0), ("sync", 0)]
+
+
+class RecordingProfile:
+    """Player profile stub for onboarding and learning interactions."""
+
+    specialization = None
+
+    def start_privacy_compliant_session(self):
+        pass
+
+    def record_learning_interaction(self, **interaction):
+        pass
+
+
+class RecordingPlayerManager:
+    """Player manager recording XP awards."""
+
+    def __init__(self, failures=0):
+        self.awards = []
+        self.profiles = {}
+        self.failures = failures
+
+    def award_xp(self, student_id, skill_id, xp_amount, source="problem_solving"):
+        if self.failures:
+            self.failures -= 1
+            return {"error": "Profile store unavailable"}
+        self.awards.append(xp_amount)
+        return {"success": True}
+
+    def create_player(self, student_id, display_name, specialization):
+        self.profiles[student_id] = RecordingProfile()
+        return self.profiles[student_id]
+
+    def get_player(self, student_id):
+        return self.profiles.get(student_id)
+
+
+@pytest.fixture
+def connector(live_connector):
+    connector = live_connector.CanvasAPIConnector(
+        course_id=42,
+        config={
+            "gamification": {"mastery_bonus_xp": 50},
+            "live_events": {"enabled": True, "shared_secret": SECRET, "port": 0},
+        },
+        player_manager=RecordingPlayerManager(),
+    )
+    connector.assignments[7] = live_connector.CanvasAssignment(
+        canvas_id=7,
+        name="Homework 1",
+        description="",
+        points_possible=10,
+        due_at=None,
+        course_id=42,
+        assignment_type=live_connector.AssignmentType.HOMEWORK,
+        skill_category="linear_algebra",
+        xp_multiplier=10.0,
+    )
+    connector.students[1] = live_connector.CanvasStudent(
+        canvas_user_id=1,
+        name="Student",
+        email="",
+        course_id=42,
+        player_id="player_1",
+        pseudonymized_id="pseudonym",
+    )
+    return connector
+
+
+class TestSubmissionAwards:
+    """Test that repeated submission events do not award XP twice."""
+
+    def test_redelivered_events_award_once(self, connector):
+        """Test that created + grade_change + redelivery award XP once."""
+        body = {"user_id": "1", "assignment_id": "7", "submission_id": "99"}
+
+        async def scenario():
+            await connector._on_submission_event({"body": {**body, "score": 6}})
+            await connector._on_submission_event({"body": {**body, "score": 6}})
+            await connector._on_submission_event(
+                {"event_type": "grade_change", "body": {**body, "score": 6}}
+            )
+
+        asyncio.run(scenario())
+        assert connector.player_manager.awards == [60]
+        assert len(connector.xp_transactions) == 1
+
+    def test_regrade_awards_only_the_difference(self, connector):
+        """Test that higher regrades pay the delta and lower ones nothing."""
+        body = {"user_id": "1", "assignment_id": "7", "submission_id": "99"}
+
+        async def scenario():
+            for score in (6, 9, 7, 9):
+                await connector._on_submission_event({"body": {**body, "score": score}})
+
+        asyncio.run(scenario())
+        # 60 XP, then 90 + 50 mastery bonus = 140 in total
+        assert connector.player_manager.awards == [60, 80]
+
+    def test_polled_submission_matches_live_event(self, connector):
+        """Test that a polled submission (with "id") is not awarded again."""
+
+        async def scenario():
+            await connector._on_submission_event(
+                {
+                    "body": {
+                        "user_id": "1",
+                        "assignment_id": "7",
+                        "submission_id": "99",
+                        "score": 6,
+                    }
+                }
+            )
+            await connector._on_submission_event(
+                {"body": {"user_id": 1, "assignment_id": 7, "id": 99, "score": 6}}
+            )
+
+        asyncio.run(scenario())
+        assert connector.player_manager.awards == [60]
+
+    def test_failed_awards_are_retried(self, connector):
+        """Test that a submission is recorded as paid only after the award."""
+        connector.player_manager.failures = 1
+        body = {"user_id": "1", "assignment_id": "7", "submission_id": "99"}
+        event = {"body": {**body, "score": 6}}
+
+        async def scenario():
+            await connector._on_submission_event(event)
+            await connector._on_submission_event(event)
+            await connector._on_submission_event(event)
+
+        asyncio.run(scenario())
+        assert connector.player_manager.awards == [60]
+        assert connector.awarded_submissions[("42", 7, 99, 1)] == (6.0, 60)
+
+
+class TestLiveConnector:
+    """Test enrollment events, the webhook bridge and the polling fallback."""
+
+    def test_enrollment_creates_student_profile(self, connector):
+        """Test that enrollment_created onboards new students once."""
+        event = {"body": {"user_id": "5", "user_name": "New Student"}}
+
+        async def scenario():
+            await connector._on_enrollment_created(event)
+            await connector._on_enrollment_created(event)
+            await connector._on_enrollment_created(
+                {"body": {"user_id": "6", "type": "TeacherEnrollment"}}
+            )
+
+        asyncio.run(scenario())
+        student = connector.students[5]
+        assert student.player_id == student.pseudonymized_id
+        assert list(connector.player_manager.profiles) == [student.player_id]
+        assert 6 not in connector.students
+
+    def test_events_reach_webhook_client_handlers(self, connector):
+        """Test that signed events reach CanvasAPIClient webhook handlers."""
+        from src.canvas_api import CanvasAPIClient
+
+        client = CanvasAPIClient(
+            api_url="https://test.instructure.com", api_token="test_token"
+        )
+        received = []
+        client.register_webhook_handler("grade_change", received.append)
+        connector.webhook_client = client
+
+        async def scenario():
+            assert await connector.start_live_events()
+            body = envelope(
+                "grade_change",
+                user_id="1",
+                assignment_id="7",
+                submission_id="99",
+                score=6,
+            )
+            responses = await post_events(connector.live_events, [(body, sign(body))])
+            await connector.live_events.stop()
+            return responses
+
+        responses = asyncio.run(scenario())
+        assert responses[0][0] == 202
+        assert [event["body"]["score"] for event in received] == [6]
+        assert connector.player_manager.awards == [60]
+
+    def test_poll_follows_every_page(self, connector):
+        """Test that polling awards graded submissions from all pages."""
+        submissions = [
+            {"id": 100 + i, "user_id": 1, "assignment_id": 7, "score": 6}
+            for i in range(3)
+        ]
+        fail_last_page = []
+
+        async def list_submissions(request):
+            page = int(request.query.get("page", 1))
+            if page == 3 and fail_last_page:
+                return web.json_response({"errors": []}, status=500)
+            headers = {}
+            if page < 3:
+                next_url = request.url.update_query({"page": page + 1})
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            return web.json_response([submissions[page - 1]], headers=headers)
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get(
+                "/api/v1/courses/42/students/submissions", list_submissions
+            )
+            async with TestClient(TestServer(app)) as client:
+                connector.base_url = str(client.make_url("/"))
+                connector.session = client.session
+                await connector._process_xp_awards()  # Starts the window
+                window_start = connector.last_xp_poll
+
+                fail_last_page.append(True)
+                with pytest.raises(RuntimeError):
+                    await connector._process_xp_awards()
+                assert connector.last_xp_poll == window_start
+
+                fail_last_page.clear()
+                await connector._process_xp_awards()
+                return window_start
+
+        window_start = asyncio.run(scenario())
+        assert connector.last_xp_poll > window_start
+        # The first two submissions were awarded by the failed poll already
+        assert connector.player_manager.awards == [60, 60, 60]
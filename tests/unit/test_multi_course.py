@@ -0,0 +1,101 @@
+"""
+Unit tests for the multi-course Canvas connector.
+"""
+
+import asyncio
+
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def multi_course(live_connector, tmp_path):
+    multi_course = importlib.import_module("src.canvas_integration.multi_course")
+    return multi_course.MultiCourseConnector(
+        config_path=str(tmp_path / "missing.yml"),
+        course_ids=[101, 102, 103],
+        max_concurrent_syncs=2,
+    )
+
+
+class TestSharedSession:
+    """Test that course connectors never close the shared session."""
+
+    def test_closing_one_course_keeps_the_others_working(self, multi_course):
+        """Test that closing or removing a course leaves the session open."""
+
+        async def scenario():
+            await multi_course.initialize_session()
+            session = multi_course.session
+            await multi_course.connectors[101].close()
+            await multi_course.remove_course(102)
+            state = (
+                session.closed,
+                multi_course.connectors[103].session is session,
+                list(multi_course.connectors),
+            )
+            await multi_course.close()
+            return state, session.closed
+
+        (closed, shared, courses), closed_at_exit = asyncio.run(scenario())
+        assert not closed
+        assert shared
+        assert courses == [101, 103]
+        assert closed_at_exit
+
+    def test_courses_added_later_share_the_session(self, multi_course):
+        """Test that a course added after the session exists uses it."""
+
+        async def scenario():
+            await multi_course.initialize_session()
+            connector = multi_course.add_course(104)
+            await connector.close()
+            state = (
+                connector.session is multi_course.session,
+                connector.session.closed,
+            )
+            await multi_course.close()
+            return state
+
+        assert asyncio.run(scenario()) == (True, False)
+
+
+class TestFairSync:
+    """Test the bounded fan-out of sync rounds."""
+
+    def test_sync_rounds_are_bounded_and_fair(self, multi_course):
+        """Test the concurrency limit, ordering and failure counts."""
+        multi_course.add_course(104)
+        running = []
+        peak = []
+        started = []
+
+        def fake_sync(course_id):
+            async def sync_course_data():
+                started.append(course_id)
+                running.append(course_id)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(course_id)
+                return course_id != 102
+
+            return sync_course_data
+
+        for course_id, connector in multi_course.connectors.items():
+            connector.sync_course_data = fake_sync(course_id)
+
+        async def scenario():
+            await multi_course.initialize_session()
+            first = await multi_course.sync_all_courses()
+            multi_course.last_course_sync[101] = None  # Waiting longest now
+            second_order = multi_course._sync_order()
+            await multi_course.close()
+            return first, second_order
+
+        first, second_order = asyncio.run(scenario())
+        assert max(peak) == 2
+        assert started == [101, 102, 103, 104]
+        assert first == {101: True, 102: False, 103: True, 104: True}
+        assert multi_course.course_sync_failures == {101: 0, 102: 1, 103: 0, 104: 0}
+        assert second_order[0] == 101
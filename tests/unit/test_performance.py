@@ -372,3 +372,74 @@ class TestScalability:
         expected_max_time = 0.5 * size_factor
         assert validation_time < expected_max_time
         assert result.is_valid
+
+
+class TestSkillTreeMemory:
+    """Memory benchmark for the compact skill tree representation"""
+
+    def node_inputs(self, count):
+        """Constructor arguments for a long chain of skill nodes"""
+        from src.gamification import SkillLevel
+
+        return [
+            dict(
+                id=f"skill-{i}",
+                name=f"Skill {i}",
+                description="Generated skill",
+                level=SkillLevel(1 + i % 5),
+                xp_required=10 * i,
+                prerequisites=[f"skill-{i - 1}"] if i else [],
+                tags=["algebra", "generated"],
+            )
+            for i in range(count)
+        ]
+
+    def build_nodes(self, node_class, inputs):
+        """Nodes that own their lists, as when loaded from a file"""
+        return [
+            node_class(
+                **{
+                    **kwargs,
+                    "prerequisites": list(kwargs["prerequisites"]),
+                    "tags": list(kwargs["tags"]),
+                }
+            )
+            for kwargs in inputs
+        ]
+
+    def measure(self, build):
+        """Bytes allocated by the objects returned from build"""
+        import gc
+        import tracemalloc
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            objects = build()
+            allocated = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert objects
+        return allocated
+
+    def test_compact_nodes_memory(self):
+        """Test that compact nodes take substantially less memory"""
+        from src.gamification import CompactSkillNode, SkillNode
+
+        count = 5000
+        inputs = self.node_inputs(count)
+        # Warm up both classes on the same inputs so that interned strings and
+        # shared values left by earlier tests or this build are not measured
+        warm = (
+            self.build_nodes(SkillNode, inputs),
+            self.build_nodes(CompactSkillNode, inputs),
+        )
+        regular = self.measure(lambda: self.build_nodes(SkillNode, inputs))
+        compact = self.measure(lambda: self.build_nodes(CompactSkillNode, inputs))
+        del warm
+
+        print(
+            f"Per node: SkillNode {regular / count:.0f} B, "
+            f"CompactSkillNode {compact / count:.0f} B"
+        )
+        assert compact < regular * 0.7
@@ -0,0 +1,281 @@
+"""
+Unit tests for gamification engine profile persistence.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import src.gamification_engine as engine_module
+from src.gamification_engine import StudentGameProfile
+from src.gamification_engine.storage import (
+    MemoryProfileStore,
+    ProfileWriteBuffer,
+    SQLiteProfileStore,
+)
+
+# Subsystems GamificationEngine constructs but this package does not define
+SUBSYSTEMS = (
+    "RPGPlayerSystem",
+    "MathPetSystem",
+    "GuildManager",
+    "PeerTeachingEngine",
+    "PvPBattleEngine",
+    "TournamentManager",
+    "WorldBuilder",
+    "RealTimeEventEngine",
+)
+
+
+def make_profile(student_id, total_xp=0):
+    return StudentGameProfile(
+        student_id=student_id,
+        total_xp=total_xp,
+        badges=["First Steps"],
+        last_activity=datetime(2024, 9, 1, 8, 30),
+    )
+
+
+class FailingStore(MemoryProfileStore):
+    """Store whose profile writes always fail."""
+
+    def __init__(self):
+        super().__init__()
+        self.attempts = 0
+
+    def save_profiles(self, profiles):
+        self.attempts += 1
+        raise OSError("disk full")
+
+
+class TestSQLiteProfileStore:
+    """Test the default SQLite backend."""
+
+    def test_default_path_is_in_the_data_directory(self, tmp_path, monkeypatch):
+        """Test that the default database ignores the working directory."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GAMIFICATION_DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.setenv("GAMIFICATION_DB_PATH", "engine/profiles.db")
+        store = SQLiteProfileStore()
+        store.close()
+
+        assert store.path == str(tmp_path / "data" / "engine" / "profiles.db")
+        assert (tmp_path / "data" / "engine" / "profiles.db").exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["data"]
+
+    def test_profiles_survive_reopening(self, tmp_path):
+        """Test that saved profiles and achievements are read back."""
+        path = str(tmp_path / "engine.db")
+        store = SQLiteProfileStore(path)
+        assert store.save_profiles([make_profile("alice", 150), make_profile("bob")])
+        store.save_achievements({"Triple Threat": {"reward_xp": 200}})
+        store.save_profiles([make_profile("alice", 300)])
+        store.close()
+
+        reopened = SQLiteProfileStore(path)
+        profiles = reopened.load_profiles()
+        achievements = reopened.load_achievements()
+        reopened.close()
+
+        assert sorted(profiles) == ["alice", "bob"]
+        assert profiles["alice"] == make_profile("alice", 300)
+        assert achievements == {"Triple Threat": {"reward_xp": 200}}
+
+    def test_uses_write_ahead_logging(self, tmp_path):
+        """Test that file databases are opened in WAL mode."""
+        store = SQLiteProfileStore(str(tmp_path / "engine.db"))
+        mode = store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+        store.close()
+
+        assert mode == "wal"
+
+
+class TestProfileWriteBuffer:
+    """Test dirty tracking and batched write-behind flushes."""
+
+    def test_repeated_changes_are_written_once_per_batch(self):
+        """Test that a login storm becomes a few batched writes."""
+        store = MemoryProfileStore()
+        profiles = {f"s{i}": make_profile(f"s{i}") for i in range(250)}
+        writer = ProfileWriteBuffer(
+            store, profiles.get, batch_size=100, clock=lambda: 0.0
+        )
+
+        for _ in range(3):
+            for student_id in profiles:
+                profiles[student_id].daily_login_streak += 1
+                writer.mark_dirty(student_id)
+
+        assert store.batches == 7  # 750 changes
+        assert writer.pending == 50
+        assert writer.flush() == 50
+        assert writer.pending == 0
+        assert store.load_profiles()["s0"].daily_login_streak == 3
+        assert store.load_profiles()["s249"].daily_login_streak == 3
+
+    def test_flushes_after_max_delay(self):
+        """Test that pending changes are written once they get old."""
+        now = [0.0]
+        store = MemoryProfileStore()
+        profiles = {"alice": make_profile("alice")}
+        writer = ProfileWriteBuffer(
+            store, profiles.get, max_delay=5.0, clock=lambda: now[0]
+        )
+
+        writer.mark_dirty("alice")
+        now[0] = 4.0
+        writer.mark_dirty("alice")
+        assert store.batches == 0
+
+        now[0] = 6.0
+        writer.mark_dirty("alice")
+        assert store.batches == 1
+        assert writer.pending == 0
+
+    def test_failed_flush_keeps_changes_queued(self):
+        """Test that a backend error does not lose pending profiles."""
+        profiles = {"alice": make_profile("alice")}
+        writer = ProfileWriteBuffer(FailingStore(), profiles.get)
+        writer.mark_dirty("alice")
+
+        assert writer.flush() == 0
+        assert writer.pending == 1
+
+    def test_failed_flush_backs_off(self):
+        """Test that changes after a failed write do not retry at once."""
+        now = [0.0]
+        store = FailingStore()
+        profiles = {f"s{i}": make_profile(f"s{i}") for i in range(10)}
+        writer = ProfileWriteBuffer(
+            store, profiles.get, batch_size=1, max_delay=5.0, clock=lambda: now[0]
+        )
+
+        for student_id in profiles:
+            writer.mark_dirty(student_id)
+        assert store.attempts == 1
+
+        now[0] = 6.0
+        writer.mark_dirty("s0")
+        writer.mark_dirty("s1")
+        assert store.attempts == 2
+        assert writer.pending == 10
+
+        # With a background thread, only the thread retries
+        writer.max_delay = 60.0
+        writer.start()
+        now[0] = 100.0
+        writer.mark_dirty("s2")
+        assert store.attempts == 2
+        writer.stop()
+        assert store.attempts == 3
+
+    def test_background_thread_flushes_quiet_changes(self):
+        """Test that a change is written without any later activity."""
+        store = MemoryProfileStore()
+        profiles = {"alice": make_profile("alice")}
+        writer = ProfileWriteBuffer(
+            store, profiles.get, max_delay=0.01, clock=lambda: 0.0
+        )
+        writer.start()
+        writer.mark_dirty("alice")
+
+        deadline = time.monotonic() + 5
+        while writer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.stop()
+
+        assert writer.pending == 0
+        assert "alice" in store.profiles
+
+    def test_concurrent_changes_reach_sqlite(self, tmp_path, caplog):
+        """Test marks and flushes from several threads on one SQLite store."""
+        store = SQLiteProfileStore(str(tmp_path / "engine.db"))
+        profiles = {f"s{i}": make_profile(f"s{i}", i) for i in range(400)}
+        writer = ProfileWriteBuffer(store, profiles.get, batch_size=25)
+
+        def mark(offset):
+            for i in range(offset, 400, 4):
+                writer.mark_dirty(f"s{i}")
+
+        threads = [threading.Thread(target=mark, args=(k,)) for k in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.stop()
+
+        saved = store.load_profiles()
+        store.close()
+        assert "Error saving" not in caplog.text
+        assert writer.pending == 0
+        assert len(saved) == 400
+        assert saved["s399"].total_xp == 399
+
+
+@pytest.fixture
+def atexit_hooks(monkeypatch):
+    """Exit hooks registered through the engine module."""
+    hooks = []
+    monkeypatch.setattr(engine_module.atexit, "register", hooks.append)
+    monkeypatch.setattr(engine_module.atexit, "unregister", hooks.remove)
+    return hooks
+
+
+@pytest.fixture
+def engine_class(monkeypatch, atexit_hooks):
+    """GamificationEngine with stub subsystems."""
+    for name in SUBSYSTEMS:
+        monkeypatch.setattr(engine_module, name, lambda *args: object(), raising=False)
+    return engine_module.GamificationEngine
+
+
+class TestGamificationEngineStorage:
+    """Test how the engine loads, queues and writes profiles."""
+
+    def test_load_save_flush_and_close(self, engine_class, atexit_hooks):
+        """Test the engine's use of its store and write buffer."""
+        store = MemoryProfileStore()
+        store.save_profiles([make_profile("alice", 150)])
+        store.save_achievements({"Triple Threat": {"reward_xp": 300}})
+
+        engine = engine_class(store=store, flush_interval=60.0)
+        assert engine.student_profiles["alice"].total_xp == 150
+        assert engine.cross_system_achievements["Triple Threat"] == {"reward_xp": 300}
+        assert "Gamification Master" in engine.cross_system_achievements
+        assert atexit_hooks == [engine.close]
+        assert engine._writer._thread.is_alive()
+
+        engine.student_profiles["alice"].total_xp = 200
+        engine._save_data("alice")
+        assert store.batches == 1  # Queued, not written
+        assert engine.flush() == 1
+        assert store.load_profiles()["alice"].total_xp == 200
+        assert "Gamification Master" in store.load_achievements()
+
+        engine.student_profiles["bob"] = make_profile("bob", 10)
+        engine._save_data()  # Everything, immediately
+        assert sorted(store.load_profiles()) == ["alice", "bob"]
+
+        engine.student_profiles["bob"].total_xp = 20
+        engine._save_data("bob")
+        thread = engine._writer._thread
+        engine.close()
+        engine.close()
+        assert not thread.is_alive()
+        assert store.load_profiles()["bob"].total_xp == 20
+        assert atexit_hooks == []
+
+    def test_default_store_uses_the_data_directory(
+        self, engine_class, tmp_path, monkeypatch
+    ):
+        """Test that a bare engine writes to the configured data directory."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("GAMIFICATION_DATA_DIR", str(tmp_path / "data"))
+        monkeypatch.delenv("GAMIFICATION_DB_PATH", raising=False)
+        engine = engine_class()
+        engine.close()
+
+        assert engine.store.path == str(tmp_path / "data" / "gamification_engine.db")
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["data"]
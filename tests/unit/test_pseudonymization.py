@@ -0,0 +1,158 @@
+"""
+Unit tests for the shared pseudonymization service.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from src.analytics.pseudonymization import (
+    PseudonymizationService,
+    legacy_email_hash,
+    legacy_pseudonyms,
+)
+
+JAN = datetime(2024, 1, 15)
+FEB = datetime(2024, 2, 15)
+
+
+class TestPseudonymizationService:
+    """Test keyed pseudonyms, epochs and the memo cache."""
+
+    def test_pseudonyms_depend_on_key_namespace_and_epoch(self):
+        """Test that pseudonyms are stable per key, namespace and epoch."""
+        service = PseudonymizationService("secret")
+
+        pseudonym = service.pseudonymize(42, now=JAN)
+        assert pseudonym == PseudonymizationService("secret").pseudonymize(
+            "42", now=JAN
+        )
+        assert len(pseudonym) == 16
+        assert pseudonym != PseudonymizationService("other").pseudonymize(42, now=JAN)
+        assert pseudonym != service.pseudonymize(42, namespace="analytics", now=JAN)
+        assert pseudonym != service.pseudonymize(42, now=FEB)
+        assert service.pseudonymize(42, granularity="static", now=JAN) == (
+            service.pseudonymize(42, granularity="static", now=FEB)
+        )
+        assert service.pseudonymize_many([42, 7], now=JAN) == [
+            pseudonym,
+            service.pseudonymize(7, now=JAN),
+        ]
+        with pytest.raises(ValueError, match="granularity"):
+            service.pseudonymize(42, granularity="week")
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test that recently read pseudonyms stay cached."""
+        service = PseudonymizationService("secret", cache_size=2)
+        service.pseudonymize_many([1, 2], now=JAN)
+        service.pseudonymize(1, now=JAN)  # 2 is now least recently used
+        service.pseudonymize(3, now=JAN)
+
+        hits = service.cache_hits
+        service.pseudonymize(1, now=JAN)
+        assert service.cache_hits == hits + 1
+        service.pseudonymize(2, now=JAN)
+        assert service.cache_hits == hits + 1
+        assert service.get_stats()["cached_pseudonyms"] == 2
+
+    def test_granularities_of_a_namespace_keep_their_state(self):
+        """Test that mixing daily and monthly rotation does not rebuild."""
+        service = PseudonymizationService("secret")
+        service.pseudonymize(1, granularity="day", now=JAN)
+        service.pseudonymize(1, granularity="month", now=JAN)
+        misses = service.cache_misses
+
+        for _ in range(3):
+            service.pseudonymize(1, granularity="day", now=JAN)
+            service.pseudonymize(1, granularity="month", now=JAN)
+        assert service.cache_misses == misses
+        assert len(service.get_stats()["active_epochs"]) == 2
+
+        # A new epoch replaces only the state of its own granularity
+        service.pseudonymize(1, granularity="month", now=FEB)
+        assert sorted(service.get_stats()["active_epochs"]) == [
+            "student:2024-01-15",
+            "student:2024-02",
+        ]
+
+
+class TestSharedStudentPseudonyms:
+    """Test that the connector and analytics agree, and the legacy ids."""
+
+    def test_analytics_uses_the_student_pseudonym(self):
+        """Test that analytics learner ids equal the student pseudonyms."""
+        from src.analytics.privacy_respecting_analytics import (
+            PrivacyRespectingAnalytics,
+        )
+
+        service = PseudonymizationService("secret")
+        analytics = PrivacyRespectingAnalytics(pseudonymizer=service)
+        assert analytics._pseudonymize_id("42") == service.pseudonymize(42)
+        assert analytics.pseudonymize_ids(["42", "7"]) == (
+            service.pseudonymize_many([42, 7])
+        )
+
+        daily = PrivacyRespectingAnalytics(
+            pseudonymizer=service, pseudonym_rotation="day"
+        )
+        assert daily._pseudonymize_id("42") == service.pseudonymize(
+            42, granularity="day"
+        )
+
+    def test_connector_and_analytics_agree(self, live_connector):
+        """Test that a player id is the student's analytics pseudonym."""
+        connector = live_connector.CanvasAPIConnector(
+            config={"privacy": {"pseudonym_rotation": "day"}},
+            pseudonymizer=PseudonymizationService("secret"),
+        )
+        assert connector._create_pseudonym(42) == (
+            connector.analytics._pseudonymize_id("42")
+        )
+
+    def test_legacy_ids_map_to_current_pseudonyms(self):
+        """Test the reproduction and migration of unkeyed legacy ids."""
+        player_id, learner_id = legacy_pseudonyms(42, now=JAN)
+        assert player_id == (hashlib.sha256(b"student_42_2024-01").hexdigest()[:16])
+        daily_salt = hashlib.sha256(b"eagle_adventures_salt_2024-01-15").hexdigest()
+        assert learner_id == (
+            hashlib.sha256(f"42_{daily_salt[:16]}".encode()).hexdigest()[:16]
+        )
+        assert legacy_email_hash("a@example.edu") == (
+            hashlib.sha256(b"a@example.edu").hexdigest()[:16]
+        )
+
+        service = PseudonymizationService("secret")
+        mapping = service.migration_map([42, 7], now=JAN)
+        assert mapping[player_id] == service.pseudonymize(42, now=JAN)
+        assert mapping[learner_id] == service.pseudonymize(42, now=JAN)
+        assert mapping[legacy_pseudonyms(7, now=JAN)[0]] == (
+            service.pseudonymize(7, now=JAN)
+        )
+
+    def test_connector_adopts_legacy_profiles(self, live_connector):
+        """Test that a profile under a legacy player id is moved, not lost."""
+        connector = live_connector.CanvasAPIConnector(
+            config={}, pseudonymizer=PseudonymizationService("secret")
+        )
+        legacy_id = legacy_pseudonyms(42)[0]
+        legacy_profile = connector.player_manager.create_player(
+            student_id=legacy_id,
+            display_name="Player",
+            specialization=live_connector.MathematicalSpecialization.INTERDISCIPLINARY,
+        )
+        student = live_connector.CanvasStudent(
+            canvas_user_id=42,
+            name="Student",
+            email="",
+            course_id=1,
+            pseudonymized_id=connector._create_pseudonym(42),
+        )
+
+        assert asyncio.run(connector._create_student_profile(student))
+        assert connector.player_manager.get_player(student.player_id) is (
+            legacy_profile
+        )
+        assert legacy_profile.student_id == student.player_id
+        assert legacy_id not in connector.player_manager.profiles
@@ -0,0 +1,97 @@
+"""
+Unit tests for the supervised background scheduler.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from src.canvas_integration.scheduler import TaskScheduler, activity_aware_interval
+
+
+class TestTaskScheduler:
+    """Test job supervision, overlap protection and restarts."""
+
+    def test_jobs_run_and_failures_are_counted(self):
+        """Test that failing runs are recorded and retried."""
+        calls = []
+
+        async def flaky():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("Canvas unavailable")
+
+        async def scenario():
+            scheduler = TaskScheduler()
+            scheduler.add_job("flaky", flaky, interval=0.01, retry_interval=0.01)
+            scheduler.start()
+            while len(calls) < 3:
+                await asyncio.sleep(0.005)
+            metrics = scheduler.get_metrics()["flaky"]
+            await scheduler.stop()
+            return metrics
+
+        metrics = asyncio.run(scenario())
+        assert metrics["failures"] == 1
+        assert metrics["consecutive_failures"] == 0
+        assert metrics["last_error"] == "Canvas unavailable"
+        assert metrics["runs"] >= 2
+
+    def test_run_now_skips_while_running(self):
+        """Test that a job never overlaps with itself."""
+        started = []
+
+        async def slow():
+            started.append(True)
+            await asyncio.sleep(0.05)
+
+        async def scenario():
+            scheduler = TaskScheduler()
+            scheduler.add_job("slow", slow, interval=60, run_immediately=False)
+            first = asyncio.create_task(scheduler.run_now("slow"))
+            await asyncio.sleep(0)
+            second = await scheduler.run_now("slow")
+            return await first, second, scheduler.jobs["slow"].metrics
+
+        first, second, metrics = asyncio.run(scenario())
+        assert (first, second) == (True, False)
+        assert started == [True]
+        assert metrics.skipped_overlaps == 1
+
+    def test_restart_in_a_new_event_loop(self):
+        """Test that jobs can be registered again after stop."""
+        runs = []
+
+        async def job():
+            runs.append(True)
+
+        # Created outside any event loop, as connectors do
+        scheduler = TaskScheduler()
+
+        async def run_once():
+            scheduler.add_job("sync", job, interval=60)
+            scheduler.start()
+            assert scheduler.running
+            await scheduler.run_now("sync")
+            await scheduler.stop()
+            return scheduler.running, dict(scheduler.jobs)
+
+        assert asyncio.run(run_once()) == (False, {})
+        assert asyncio.run(run_once()) == (False, {})
+        assert len(runs) >= 2
+
+
+class TestActivityAwareInterval:
+    """Test adaptive polling intervals."""
+
+    def test_deadlines_and_quiet_hours(self):
+        """Test faster polling near deadlines and slower polling at night."""
+        now = datetime(2024, 3, 4, 14, 0)
+        due_dates = []
+        interval_fn = activity_aware_interval(lambda: due_dates, now_fn=lambda: now)
+
+        assert interval_fn(600) == 600
+        due_dates.append(now + timedelta(hours=3))
+        assert interval_fn(600) == 150
+        due_dates[:] = [None, now + timedelta(days=3)]
+        now = datetime(2024, 3, 5, 2, 0)
+        assert interval_fn(600) == 2400
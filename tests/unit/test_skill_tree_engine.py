@@ -0,0 +1,1312 @@
+"""
+Unit tests for the skill tree evaluation engine.
+"""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+from src.gamification import (
+    AdaptiveParameters,
+    Badge,
+    CompactBadge,
+    CompactSkillNode,
+    LearningObjective,
+    PathwayIndex,
+    ProgressChange,
+    SkillLevel,
+    SkillNode,
+    SkillTree,
+    backfill_learning_stats,
+    backfill_mastery_states,
+    requirement_registry,
+)
+from src.gamification.mastery import stored_mastery, weighted_mastery
+from src.gamification.velocity import (
+    full_learning_velocity,
+    learning_stats,
+    verify_learning_stats,
+)
+
+
+def build_branching_tree():
+    """basic -> (vectors, matrices) -> eigen, plus a node with a custom requirement."""
+    tree = SkillTree("Branching Tree", "A tree with two branches")
+    tree.add_node(
+        SkillNode(
+            id="basic",
+            name="Basic",
+            description="Basic concepts",
+            level=SkillLevel.RECOGNITION,
+            xp_required=0,
+            tags=["foundations"],
+        )
+    )
+    tree.add_node(
+        SkillNode(
+            id="vectors",
+            name="Vectors",
+            description="Vector operations",
+            level=SkillLevel.APPLICATION,
+            xp_required=100,
+            prerequisites=["basic"],
+            tags=["algebra"],
+        )
+    )
+    tree.add_node(
+        SkillNode(
+            id="matrices",
+            name="Matrices",
+            description="Matrix operations",
+            level=SkillLevel.APPLICATION,
+            xp_required=150,
+            prerequisites=["basic"],
+            tags=["algebra"],
+        )
+    )
+    tree.add_node(
+        SkillNode(
+            id="eigen",
+            name="Eigenvalues",
+            description="Eigenvalues and eigenvectors",
+            level=SkillLevel.SYNTHESIS,
+            xp_required=300,
+            prerequisites=["vectors", "matrices"],
+            unlock_requirements={"badge_earned": "matrix_badge"},
+            tags=["algebra"],
+        )
+    )
+    tree.create_pathway("algebra_track", ["basic", "vectors", "eigen"])
+    return tree
+
+
+class TestCompiledSkillTree:
+    """Test the compiled, index-backed evaluation engine."""
+
+    def test_compile_is_cached_until_structure_changes(self):
+        """Test that the compiled tree is reused until a node is added."""
+        tree = build_branching_tree()
+        compiled = tree.compile()
+        assert tree.compile() is compiled
+
+        tree.add_node(
+            SkillNode(
+                id="extra",
+                name="Extra",
+                description="Extra node",
+                level=SkillLevel.RECOGNITION,
+                xp_required=0,
+            )
+        )
+        assert tree.compile() is not compiled
+        assert tree.compile().size == 5
+
+    @pytest.mark.parametrize(
+        "progress",
+        [
+            {"total_xp": 0},
+            {"total_xp": 200, "basic": {"completed": True}},
+            {
+                "total_xp": 400,
+                "average_performance": 0.95,
+                "skills": {
+                    "basic": {"completed": True},
+                    "vectors": {"completed": True, "mastery_score": 0.9},
+                    "matrices": {"completed": True, "mastery_score": 0.5},
+                },
+            },
+            {
+                "total_xp": 400,
+                "badges": ["matrix_badge"],
+                "skills": {
+                    "basic": {"completed": True},
+                    "vectors": {"completed": True},
+                    "matrices": {"completed": True},
+                },
+            },
+        ],
+    )
+    def test_unlocked_nodes_match_node_unlock_checks(self, progress):
+        """Test that compiled evaluation agrees with SkillNode.is_unlocked."""
+        tree = build_branching_tree()
+        expected = [
+            node.id for node in tree.nodes.values() if node.is_unlocked(progress)
+        ]
+
+        unlocked = [node.id for node in tree.get_unlocked_nodes(progress)]
+        assert sorted(unlocked) == sorted(expected)
+
+    def test_unknown_prerequisite_satisfied_by_progress(self):
+        """Test that prerequisites outside the tree are read from progress."""
+        tree = SkillTree("Dangling Tree", "Tree with an external prerequisite")
+        tree.add_node(
+            SkillNode(
+                id="advanced",
+                name="Advanced",
+                description="Needs external course",
+                level=SkillLevel.INTUITION,
+                xp_required=0,
+                prerequisites=["external_course"],
+            )
+        )
+
+        assert tree.get_unlocked_nodes({"total_xp": 0}) == []
+        unlocked = tree.get_unlocked_nodes(
+            {"total_xp": 0, "external_course": {"completed": True}}
+        )
+        assert [node.id for node in unlocked] == ["advanced"]
+
+    def test_calculate_progress_aggregates(self):
+        """Test level, category and pathway aggregates from bitsets."""
+        tree = build_branching_tree()
+        progress = {
+            "total_xp": 200,
+            "skills": {
+                "basic": {"completed": True, "assessment_scores": [1.0]},
+                "vectors": {"completed": True, "assessment_scores": [0.5, 0.9]},
+            },
+        }
+
+        stats = tree.calculate_progress(progress)
+
+        assert stats["unlocked_nodes"] == 3  # eigen needs 300 XP
+        assert stats["level_progress"][SkillLevel.APPLICATION.value]["unlocked"] == 2
+        assert stats["category_progress"]["algebra"] == {
+            "unlocked": 2,
+            "total": 3,
+            "percentage": pytest.approx(66.67, rel=1e-3),
+        }
+        assert stats["pathway_progress"]["algebra_track"]["completed"] == 2
+        assert stats["mastery_distribution"]["mastered"] == 1
+        assert sum(stats["mastery_distribution"].values()) == 4
+
+
+class TestCohortEvaluation:
+    """Test vectorized evaluation of a whole class."""
+
+    def test_cohort_matches_per_student_progress(self):
+        """Test that cohort results equal calculate_progress for each student."""
+        tree = build_branching_tree()
+        cohort = [
+            {"student_id": "s1", "total_xp": 0},
+            {"student_id": "s2", "total_xp": 200, "basic": {"completed": True}},
+            {
+                "student_id": "s3",
+                "total_xp": 500,
+                "badges": ["matrix_badge"],
+                "skills": {
+                    "basic": {"completed": True, "assessment_scores": [1.0]},
+                    "vectors": {"completed": True, "assessment_scores": [0.85]},
+                    "matrices": {"completed": True, "mastery_score": 0.9},
+                },
+            },
+        ]
+
+        evaluation = tree.evaluate_cohort(cohort)
+
+        assert evaluation.student_ids == ["s1", "s2", "s3"]
+        for s, progress in enumerate(cohort):
+            expected = tree.calculate_progress(progress)
+            actual = evaluation.student_progress(s)
+            for key, value in actual.items():
+                assert value == expected[key]
+
+    def test_next_available_and_summary(self):
+        """Test frontier masks and class-level summary."""
+        tree = build_branching_tree()
+        evaluation = tree.evaluate_cohort(
+            [{"total_xp": 0}, {"total_xp": 120, "basic": {"completed": True}}]
+        )
+
+        first_frontier = {
+            evaluation.node_ids[i] for i in evaluation.next_available[0].nonzero()[0]
+        }
+        assert first_frontier == {"vectors", "matrices"}
+        second_frontier = {
+            evaluation.node_ids[i] for i in evaluation.next_available[1].nonzero()[0]
+        }
+        assert second_frontier == {"matrices"}
+
+        summary = evaluation.summary()
+        assert summary["students"] == 2
+        assert summary["node_unlock_rates"]["basic"] == 1.0
+
+
+class TestUnlockFrontier:
+    """Test the incrementally maintained unlock frontier."""
+
+    def test_events_update_unlocked_and_available_sets(self):
+        """Test that completions and XP awards update only affected nodes."""
+        tree = build_branching_tree()
+        progress = {"total_xp": 0, "skills": {}}
+        frontier = tree.create_unlock_frontier(progress)
+        assert frontier.unlocked_ids == {"basic"}
+        assert frontier.available_ids == {"vectors", "matrices"}
+
+        update = frontier.add_xp(120)
+        assert update.newly_unlocked == []  # basic not completed yet
+
+        update = frontier.complete_skill("basic", mastery_score=0.9)
+        assert update.newly_unlocked == ["vectors"]
+        assert update.no_longer_available == ["vectors"]
+        assert progress["skills"]["basic"]["completed"] is True
+
+        update = frontier.add_xp(50)
+        assert update.newly_unlocked == ["matrices"]
+        assert frontier.available_ids == {"eigen"}
+
+    def test_frontier_matches_full_recomputation(self):
+        """Test that the frontier agrees with the tree's own queries."""
+        tree = build_branching_tree()
+        progress = {"total_xp": 500, "basic": {"completed": True}}
+        frontier = tree.create_unlock_frontier(progress)
+
+        frontier.complete_skill("vectors")
+        frontier.complete_skill("matrices", mastery_score=0.95)
+        progress["badges"] = ["matrix_badge"]
+        frontier.requirements_changed()
+
+        assert frontier.unlocked_ids == {
+            node.id for node in tree.get_unlocked_nodes(progress)
+        }
+        assert frontier.available_ids == {
+            node.id for node in tree.get_next_available_nodes(progress, limit=10)
+        }
+        assert "eigen" in frontier.unlocked_ids
+        assert "skills" not in progress  # Flat records stay flat
+
+    def test_new_progress_uses_nested_records(self):
+        """Test that completions on empty progress create the "skills" dict."""
+        tree = build_branching_tree()
+        progress = {"total_xp": 500}
+        frontier = tree.create_unlock_frontier(progress)
+
+        frontier.complete_skill("basic", mastery_score=0.9)
+
+        assert progress["skills"] == {
+            "basic": {"completed": True, "mastery_score": 0.9}
+        }
+        assert "vectors" in frontier.unlocked_ids
+        remaining = tree._estimate_completion_time(progress)["remaining_nodes"]
+        assert remaining == len(tree.nodes) - 1
+
+
+def build_chain_tree(prerequisites):
+    """Tree of level-1 nodes from a {node_id: [prerequisite ids]} mapping."""
+    tree = SkillTree("Structure Tree", "Tree for structure validation")
+    for node_id, prereqs in prerequisites.items():
+        tree.add_node(
+            SkillNode(
+                id=node_id,
+                name=node_id.title(),
+                description=f"Node {node_id}",
+                level=SkillLevel.RECOGNITION,
+                xp_required=0,
+                prerequisites=prereqs,
+            )
+        )
+    return tree
+
+
+class TestTreeValidation:
+    """Test linear-time structural validation."""
+
+    def test_reports_cycles_dangling_and_unreachable_nodes(self):
+        """Test that every structural problem is reported once."""
+        tree = build_chain_tree(
+            {
+                "root": [],
+                "a": ["c"],
+                "b": ["a"],
+                "c": ["b"],
+                "loop": ["loop"],
+                "external": ["root", "missing"],
+            }
+        )
+
+        issues = tree.validate_tree_integrity()
+
+        assert "Node 'external' has unknown prerequisite 'missing'" in issues["errors"]
+        assert (
+            "Circular dependency detected involving nodes 'a', 'b', 'c'"
+            in issues["errors"]
+        )
+        assert "Circular dependency detected involving nodes 'loop'" in issues["errors"]
+        assert issues["statistics"]["circular_dependencies"] == 2
+        assert issues["statistics"]["unreachable_nodes"] == 5
+
+    def test_deep_tree_does_not_recurse(self):
+        """Test a prerequisite chain deeper than the recursion limit."""
+        depth = 5000
+        tree = build_chain_tree(
+            {f"n{i}": [f"n{i - 1}"] if i else [] for i in range(depth)}
+        )
+
+        issues = tree.validate_tree_integrity()
+
+        assert issues["errors"] == []
+        assert issues["warnings"] == []
+        assert issues["statistics"]["max_depth"] == depth - 1
+
+
+class TestLearningPathPlanner:
+    """Test the prerequisite-closure study planner."""
+
+    def test_plan_skips_satisfied_prerequisites(self):
+        """Test that completed, mastered prerequisites are not replanned."""
+        tree = build_branching_tree()
+        progress = {
+            "skills": {
+                "basic": {"completed": True},
+                "vectors": {"completed": True, "mastery_score": 0.5},
+            }
+        }
+
+        plan = tree.plan_learning_path(progress, "eigen")
+
+        assert plan.steps == ["vectors", "matrices", "eigen"]
+        assert plan.total_minutes == 3 * 60
+        assert plan.reachable
+
+    def test_pathway_target_and_memoized_closure(self):
+        """Test planning a pathway and reusing closures across students."""
+        tree = build_branching_tree()
+
+        first = tree.plan_learning_path({}, "algebra_track")
+        second = tree.plan_learning_path(
+            {"basic": {"completed": True}}, "algebra_track"
+        )
+
+        assert first.steps[0] == "basic" and first.steps[-1] == "eigen"
+        assert set(first.steps) == {"basic", "vectors", "matrices", "eigen"}
+        assert "basic" not in second.steps
+        # One cached closure per pathway node, shared by both plans
+        assert len(tree.compile().derived["planner"]._closures) == 3
+
+    def test_fast_track_recommendation_uses_study_plan(self):
+        """Test that fast_track recommendations follow the planned order."""
+        tree = build_branching_tree()
+
+        recommendation = tree.generate_learning_path_recommendation(
+            {"total_xp": 0}, goal="fast_track", target="matrices"
+        )
+
+        assert [n["id"] for n in recommendation["recommended_nodes"]] == [
+            "basic",
+            "matrices",
+        ]
+        assert recommendation["study_plan"]["total_minutes"] == 120
+
+
+class TestSkillTreeLayout:
+    """Test the layered layout engine."""
+
+    def test_prerequisites_are_laid_out_above_dependents(self):
+        """Test longest-path layering and centered coordinates."""
+        tree = build_branching_tree()
+
+        layout = tree.get_layout()
+
+        assert layout.layers == [["basic"], ["vectors", "matrices"], ["eigen"]]
+        assert layout.coordinates["basic"] == {"x": 75.0, "y": 100.0}
+        assert layout.coordinates["eigen"]["y"] == 300.0
+        assert layout.coordinates["vectors"]["x"] == 0.0
+        assert layout.coordinates["matrices"]["x"] == 150.0
+
+    def test_layout_is_cached_per_structure(self):
+        """Test that the layout is reused until the tree changes."""
+        tree = build_branching_tree()
+        layout = tree.get_layout()
+        assert tree.get_layout() is layout
+
+        tree.add_node(
+            SkillNode(
+                id="applications",
+                name="Applications",
+                description="Applied linear algebra",
+                level=SkillLevel.MASTERY,
+                xp_required=500,
+                prerequisites=["eigen", "basic"],
+            )
+        )
+        relaid = tree.get_layout()
+        assert relaid is not layout
+        assert relaid.layers[-1] == ["applications"]
+
+    def test_barycenter_sweeps_remove_crossings(self):
+        """Test that crossing reduction untangles a crossed bipartite layer."""
+        tree = build_chain_tree({"a": [], "b": [], "a_child": ["b"], "b_child": ["a"]})
+
+        layout = tree.get_layout()
+
+        assert layout.layers[1] == ["b_child", "a_child"]
+
+    def test_long_edges_share_virtual_nodes(self):
+        """Test that a prerequisite of every skill adds one chain of routing points."""
+        size = 2000
+        chain = {"n0": []}
+        for k in range(1, size):
+            chain[f"n{k}"] = [f"n{k - 1}", "n0"] if k > 1 else ["n0"]
+        tree = build_chain_tree(chain)
+
+        layout = tree.get_layout()
+
+        assert len(layout.layers) == size
+        assert layout.layers[-1] == [f"n{size - 1}"]
+        # One virtual node per layer spanned by n0's edges, not per edge
+        assert layout.virtual_nodes == size - 2
+        assert layout.width == 0.0
+
+
+class TestVisualizationPayload:
+    """Test the static/per-student split of the visualization data."""
+
+    progress = {
+        "total_xp": 120,
+        "skills": {
+            "basic": {
+                "completed": True,
+                "mastery_score": 0.9,
+                "assessment_scores": [0.9],
+            }
+        },
+    }
+
+    def test_static_payload_is_cached_per_structure(self):
+        """Test that the static payload and its JSON are built once."""
+        tree = build_branching_tree()
+        static = tree.get_static_visualization()
+
+        assert tree.get_static_visualization() is static
+        payload = tree.get_static_visualization_json()
+        assert tree.get_static_visualization_json() is payload
+        assert [node["id"] for node in static["nodes"]] == [
+            "basic",
+            "vectors",
+            "matrices",
+            "eigen",
+        ]
+        assert "status" not in static["nodes"][0]
+
+        tree.create_pathway("short_track", ["basic"])
+        assert tree.get_static_visualization() is not static
+        assert "short_track" in tree.get_static_visualization()["pathways"]
+
+    def test_student_delta_is_aligned_with_static_nodes(self):
+        """Test the compact per-student arrays."""
+        tree = build_branching_tree()
+
+        delta = tree.get_student_visualization_delta(self.progress)
+
+        legend = tree.get_static_visualization()["status_legend"]
+        assert [legend[code] for code in delta["status"]] == [
+            "unlocked",
+            "unlocked",
+            "available",
+            "locked",
+        ]
+        assert delta["mastery"] == [0.9, 0.0, 0.0, 0.0]
+        assert delta["tree_version"] == tree.get_static_visualization()["tree_version"]
+        assert delta["progress"] == tree.calculate_progress(self.progress)
+
+    def test_full_payload_merges_both_parts(self):
+        """Test that to_visualization_data keeps its per-node fields."""
+        tree = build_branching_tree()
+
+        data = tree.to_visualization_data(self.progress)
+
+        basic = data["nodes"][0]
+        assert basic["status"] == "unlocked"
+        assert basic["progress_status"] == "completed"
+        assert basic["mastery_score"] == 0.9
+        assert basic["accessibility"]["screen_reader_description"].endswith(
+            "Status: unlocked"
+        )
+        assert data["pathways"]["algebra_track"]["progress"]["completed"] == 1
+        assert "status" not in tree.get_static_visualization()["nodes"][0]
+
+
+class TestProgressReports:
+    """Test the shared-evaluation report pipeline and class exports."""
+
+    cohort = [
+        {
+            "student_id": f"student_{i}",
+            "total_xp": xp,
+            "skills": {"basic": {"completed": True, "mastery_score": 0.9}},
+        }
+        for i, xp in enumerate([0, 120, 200])
+    ]
+
+    def test_report_sections_share_one_evaluation(self, monkeypatch):
+        """Test that a report evaluates the student only once."""
+        tree = build_branching_tree()
+        calls = []
+        evaluate = tree.evaluate
+        monkeypatch.setattr(tree, "evaluate", lambda p: calls.append(p) or evaluate(p))
+
+        report = tree.export_progress_report(self.cohort[2])
+
+        assert len(calls) == 1
+        detailed = report["detailed_progress"]
+        unlocked = [skill["id"] for skill in detailed["unlocked_skills"]]
+        assert unlocked == ["basic", "vectors", "matrices"]
+        assert [skill["id"] for skill in detailed["available_skills"]] == ["eigen"]
+
+    @pytest.mark.parametrize("max_workers", [0, 2])
+    def test_jsonl_export_keeps_roster_order(self, tmp_path, max_workers):
+        """Test streaming a class to JSONL, in process and with a pool."""
+        tree = build_branching_tree()
+        output = tmp_path / "reports.jsonl"
+
+        summary = tree.export_class_reports(
+            iter(self.cohort), str(output), max_workers=max_workers, chunk_size=2
+        )
+
+        lines = output.read_text(encoding="utf-8").splitlines()
+        assert summary["reports"] == 3
+        assert [json.loads(line)["student_id"] for line in lines] == [
+            "student_0",
+            "student_1",
+            "student_2",
+        ]
+
+    def test_html_export_writes_one_file_per_student(self, tmp_path):
+        """Test the HTML export and its unique file names."""
+        tree = build_branching_tree()
+        cohort = self.cohort + [{"student_id": "student_0", "total_xp": 0}]
+
+        summary = tree.export_class_reports(
+            cohort, str(tmp_path / "html"), format="html", max_workers=0
+        )
+
+        assert summary["files"] == [
+            "student_0.html",
+            "student_1.html",
+            "student_2.html",
+            "student_0_1.html",
+        ]
+        page = (tmp_path / "html" / "student_1.html").read_text(encoding="utf-8")
+        assert "<title>Skill Tree Progress Report</title>" in page
+
+    def test_unknown_export_format_is_rejected(self, tmp_path):
+        """Test format validation."""
+        with pytest.raises(ValueError, match="Unsupported report format"):
+            build_branching_tree().export_class_reports([], str(tmp_path), format="pdf")
+
+
+class TestCompactRepresentation:
+    """Test the slotted, read-only node and badge representation."""
+
+    def test_compact_node_keeps_the_skill_node_api(self):
+        """Test to_dict, is_unlocked and read-only attributes."""
+        node = SkillNode(
+            id="vectors",
+            name="Vectors",
+            description="Vector operations",
+            level=SkillLevel.APPLICATION,
+            xp_required=100,
+            prerequisites=["basic"],
+            unlock_requirements={"badge_earned": "matrix_badge"},
+            tags=["algebra"],
+        )
+        compact = CompactSkillNode.from_node(node)
+        progress = {
+            "total_xp": 150,
+            "badges": ["matrix_badge"],
+            "skills": {"basic": {"completed": True, "mastery_score": 0.9}},
+        }
+
+        assert compact.to_dict() == node.to_dict()
+        assert compact.is_unlocked(progress) and node.is_unlocked(progress)
+        assert not compact.is_unlocked({**progress, "badges": []})
+        assert not hasattr(compact, "__dict__")
+        with pytest.raises(AttributeError):
+            compact.xp_required = 0
+
+    def test_default_sub_objects_and_strings_are_shared(self):
+        """Test shared feature objects and interned tags."""
+        first = CompactSkillNode("a", "A", "", SkillLevel.RECOGNITION, 0, tags=["x"])
+        second = CompactSkillNode("b", "B", "", SkillLevel.RECOGNITION, 0, tags=["x"])
+
+        assert first.social_features is second.social_features
+        assert first.adaptive_params is second.adaptive_params
+        assert first.tags[0] is second.tags[0]
+        assert first.prerequisites == ()
+
+    def test_shared_sub_objects_are_read_only_copies(self):
+        """Test that compact nodes do not alias the source node's objects."""
+        node = SkillNode("a", "A", "", SkillLevel.RECOGNITION, 0)
+        node.social_features.allows_peer_review = True
+        compact = CompactSkillNode.from_node(node)
+        other = CompactSkillNode.from_node(node)
+
+        node.social_features.allows_peer_review = False
+        node.adaptive_params.min_success_rate = 0.1
+        assert compact.social_features.allows_peer_review
+        assert compact.adaptive_params.min_success_rate == 0.6
+        assert compact.social_features is other.social_features
+        assert compact.social_features != node.social_features
+        assert compact.adaptive_params == AdaptiveParameters(min_success_rate=0.6)
+        with pytest.raises(AttributeError, match="read-only"):
+            compact.adaptive_params.min_success_rate = 0.0
+        assert compact.to_dict()["social_features"]["allows_peer_review"]
+        restored = pickle.loads(pickle.dumps(compact))
+        assert restored.social_features is compact.social_features
+
+    def test_compact_tree_matches_original(self):
+        """Test that a compacted tree evaluates students identically."""
+        tree = build_branching_tree()
+        tree.add_badge(
+            Badge(
+                id="matrix_badge",
+                name="Matrix Master",
+                description="Matrix operations",
+                criteria="Complete the matrices skill",
+                xp_value=50,
+            )
+        )
+        compact = tree.compact()
+        progress = {
+            "total_xp": 400,
+            "badges": ["matrix_badge"],
+            "skills": {
+                node_id: {"completed": True, "mastery_score": 0.9}
+                for node_id in ("basic", "vectors", "matrices")
+            },
+        }
+
+        assert isinstance(compact.nodes["eigen"], CompactSkillNode)
+        assert isinstance(compact.badges["matrix_badge"], CompactBadge)
+        assert compact.calculate_progress(progress) == tree.calculate_progress(progress)
+        restored = pickle.loads(pickle.dumps(compact))
+        assert [node.id for node in restored.get_unlocked_nodes(progress)] == [
+            "basic",
+            "vectors",
+            "matrices",
+            "eigen",
+        ]
+
+
+class TestTreeSerialization:
+    """Test the binary save/load format."""
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_round_trip(self, tmp_path, use_mmap):
+        """Test that nodes, badges, pathways and indexes survive a round trip."""
+        tree = build_branching_tree()
+        tree.nodes["eigen"].prerequisites.append("external_course")
+        tree.add_badge(
+            Badge(
+                id="matrix_badge",
+                name="Matrix Master",
+                description="Matrix operations",
+                criteria="Complete the matrices skill",
+                xp_value=50,
+                learning_objectives=[
+                    LearningObjective("lo1", "Multiply matrices", "apply")
+                ],
+            )
+        )
+        path = tmp_path / "tree.sktr"
+
+        tree.save(str(path))
+        loaded = SkillTree.load(str(path), use_mmap=use_mmap)
+
+        assert [node.to_dict() for node in loaded.nodes.values()] == [
+            node.to_dict() for node in tree.nodes.values()
+        ]
+        assert loaded.badges["matrix_badge"].to_canvas_format() == (
+            tree.badges["matrix_badge"].to_canvas_format()
+        )
+        assert loaded.pathways == tree.pathways
+        assert loaded.levels == tree.levels
+        assert loaded.categories == tree.categories
+        progress = {"total_xp": 200, "skills": {"basic": {"completed": True}}}
+        assert loaded.calculate_progress(progress) == tree.calculate_progress(progress)
+
+    def test_compact_load(self, tmp_path):
+        """Test loading straight into the compact representation."""
+        path = tmp_path / "tree.sktr"
+        build_branching_tree().save(str(path))
+
+        loaded = SkillTree.load(str(path), compact=True)
+
+        assert isinstance(loaded.nodes["basic"], CompactSkillNode)
+        assert loaded.nodes["eigen"].prerequisites == ("vectors", "matrices")
+
+    def test_rejects_foreign_and_future_files(self, tmp_path):
+        """Test magic and format version checks."""
+        foreign = tmp_path / "tree.json"
+        foreign.write_text('{"nodes": []}', encoding="utf-8")
+        with pytest.raises(ValueError, match="not a skill tree file"):
+            SkillTree.load(str(foreign))
+
+        future = tmp_path / "future.sktr"
+        build_branching_tree().save(str(future))
+        data = bytearray(future.read_bytes())
+        data[4:6] = (99).to_bytes(2, "little")
+        future.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="format version 99"):
+            SkillTree.load(str(future))
+
+
+class TestStreamingMastery:
+    """Test running recency-weighted mastery states."""
+
+    def test_recorded_scores_match_full_recomputation(self):
+        """Test O(1) updates against the history-based average."""
+        tree = build_branching_tree()
+        progress = {}
+        scores = [0.4, 0.9, 0.6, 1.0]
+
+        for score in scores:
+            mastery = tree.record_assessment(progress, "vectors", score)
+
+        record = progress["skills"]["vectors"]
+        assert record["assessment_scores"] == scores
+        assert record["mastery_state"]["count"] == 4
+        assert mastery == pytest.approx(weighted_mastery(scores))
+        assert tree.nodes["vectors"].calculate_mastery_score(progress) == mastery
+
+    def test_stale_state_falls_back_to_history(self):
+        """Test that editing the history directly is still honoured."""
+        tree = build_branching_tree()
+        progress = {}
+        tree.record_assessment(progress, "basic", 0.2)
+        progress["skills"]["basic"]["assessment_scores"].append(1.0)
+
+        assert stored_mastery(progress["skills"]["basic"]) is None
+        assert tree.nodes["basic"].calculate_mastery_score(progress) == (
+            pytest.approx(weighted_mastery([0.2, 1.0]))
+        )
+        with pytest.raises(ValueError, match="Unknown skill"):
+            tree.record_assessment(progress, "missing", 0.5)
+
+    def test_regrade_of_latest_score_is_detected(self):
+        """Test that replacing the latest score in place is honoured."""
+        tree = build_branching_tree()
+        progress = {}
+        tree.record_assessment(progress, "basic", 0.4)
+        tree.record_assessment(progress, "basic", 0.5)
+        record = progress["skills"]["basic"]
+        record["assessment_scores"][-1] = 0.9
+
+        assert stored_mastery(record) is None
+        assert tree.nodes["basic"].calculate_mastery_score(progress) == (
+            pytest.approx(weighted_mastery([0.4, 0.9]))
+        )
+        assert tree.record_assessment(progress, "basic", 1.0) == pytest.approx(
+            weighted_mastery([0.4, 0.9, 1.0])
+        )
+
+        # Earlier scores need a forced backfill
+        record["assessment_scores"][0] = 0.0
+        assert backfill_mastery_states([progress]) == 0
+        assert backfill_mastery_states([progress], force=True) == 1
+        assert stored_mastery(record) == pytest.approx(
+            weighted_mastery([0.0, 0.9, 1.0])
+        )
+
+    def test_backfill_adds_states_to_every_record(self):
+        """Test the batch recomputation for existing histories."""
+        records = [
+            {"skills": {"basic": {"assessment_scores": [0.5, 0.7, 0.9]}}},
+            {"skills": {"basic": {}, "vectors": {"assessment_scores": [1.0]}}},
+        ]
+
+        assert backfill_mastery_states(records) == 3
+        assert backfill_mastery_states(records) == 0
+
+        assert stored_mastery(records[0]["skills"]["basic"]) == pytest.approx(
+            weighted_mastery([0.5, 0.7, 0.9])
+        )
+        assert stored_mastery(records[1]["skills"]["basic"]) == 0.0
+        assert stored_mastery(records[1]["skills"]["vectors"]) == 1.0
+
+
+class TestRequirementCompiler:
+    """Test compiled unlock requirements and custom requirement types."""
+
+    def test_builtin_requirements_compile_to_predicates(self):
+        """Test that compiled predicates keep the requirement semantics."""
+        node = SkillNode(
+            id="graded",
+            name="Graded",
+            description="Needs graded work",
+            level=SkillLevel.APPLICATION,
+            xp_required=0,
+            mastery_threshold=0.7,
+        )
+        check = requirement_registry.compile
+        progress = {
+            "quiz_scores": {"q1": 0.8},
+            "assignments": {
+                "a1": {"completed": True, "score": 0.9},
+                "a2": {"completed": True, "score": 0.5},
+            },
+            "badges": ["b1", "b2"],
+            "total_time_spent": 30,
+        }
+
+        assert check(node, "quiz_score", ("q1", 0.75))(progress)
+        assert not check(node, "quiz_score", ("q2", 0.1))(progress)
+        assert check(node, "assignment_completion", "a1")(progress)
+        assert not check(node, "assignment_completion", ["a1", "a2"])(progress)
+        assert check(node, "badge_earned", ["b1", "b2"])(progress)
+        assert not check(node, "badge_earned", "b3")(progress)
+        assert not check(node, "time_spent", 45)(progress)
+        assert check(node, "unknown_type", None)(progress)
+
+    def test_custom_requirement_type(self):
+        """Test registering a requirement type after the tree was compiled."""
+        tree = build_branching_tree()
+        tree.nodes["eigen"].unlock_requirements = {"streak_days": 5}
+        tree.invalidate_caches()
+        progress = {
+            "total_xp": 400,
+            "streak": 3,
+            "skills": {
+                skill_id: {"completed": True, "mastery_score": 0.9}
+                for skill_id in ("basic", "vectors", "matrices")
+            },
+        }
+        assert "eigen" in [node.id for node in tree.get_unlocked_nodes(progress)]
+
+        requirement_registry.register(
+            "streak_days",
+            lambda node, days: lambda progress: progress.get("streak", 0) >= days,
+        )
+        try:
+            unlocked = [node.id for node in tree.get_unlocked_nodes(progress)]
+            assert "eigen" not in unlocked
+            assert not tree.nodes["eigen"].is_unlocked(progress)
+        finally:
+            requirement_registry.unregister("streak_days")
+
+    def test_batch_check_across_students(self):
+        """Test evaluating one node's requirements for a whole class."""
+        tree = build_branching_tree()
+        students = [{"badges": ["matrix_badge"]}, {"badges": []}, {}]
+
+        assert tree.check_unlock_requirements("eigen", students) == [
+            True,
+            False,
+            False,
+        ]
+        assert tree.check_unlock_requirements("basic", students) == [True] * 3
+        with pytest.raises(ValueError, match="Unknown skill"):
+            tree.check_unlock_requirements("missing", students)
+
+
+def build_badge_tree():
+    """Branching tree with badges gated on skills, badges and XP."""
+    tree = build_branching_tree()
+    for badge_id, requirements, prerequisites in [
+        ("first_steps", ["basic"], []),
+        ("matrix_badge", ["matrices"], []),
+        ("linear_algebra", ["vectors", "matrix_badge"], ["first_steps"]),
+        ("xp_500", ["xp:500"], []),
+    ]:
+        tree.add_badge(
+            Badge(
+                id=badge_id,
+                name=badge_id.replace("_", " ").title(),
+                description="",
+                criteria="",
+                xp_value=50,
+                unlock_requirements=requirements,
+                prerequisite_badges=prerequisites,
+            )
+        )
+    return tree
+
+
+class TestBadgeEngine:
+    """Test indexed badge eligibility and event-driven awarding."""
+
+    def test_eligible_badges_from_index(self):
+        """Test the full evaluation against the badge criteria."""
+        engine = build_badge_tree().badge_engine()
+        progress = {
+            "total_xp": 600,
+            "badges": ["first_steps"],
+            "skills": {
+                "basic": {"completed": True},
+                "matrices": {"completed": True},
+                "vectors": {"completed": False},
+            },
+        }
+
+        assert engine.eligible_badges(progress) == ["matrix_badge", "xp_500"]
+        assert engine.eligible_badges(progress, include_earned=True) == [
+            "first_steps",
+            "matrix_badge",
+            "xp_500",
+        ]
+        assert not engine.is_eligible("linear_algebra", progress)
+
+    def test_award_cascades_through_dependent_badges(self):
+        """Test that badges earned by an event unlock their dependents."""
+        engine = build_badge_tree().badge_engine()
+        progress = {
+            "total_xp": 450,
+            "badges": ["first_steps"],
+            "skills": {"basic": {"completed": True}, "vectors": {"completed": True}},
+        }
+
+        progress["skills"]["matrices"] = {"completed": True}
+        progress["total_xp"] = 520
+        awarded = engine.award(
+            ProgressChange(progress, skills=["matrices"], previous_xp=450)
+        )
+
+        assert awarded == ["matrix_badge", "xp_500", "linear_algebra"]
+        assert progress["badges"] == ["first_steps"] + awarded
+        assert engine.award(ProgressChange(progress, skills=["matrices"])) == []
+
+    def test_award_cohort_checks_only_changes(self):
+        """Test the bulk pass over a grade import."""
+        engine = build_badge_tree().badge_engine()
+        cohort = [
+            {"student_id": "s1", "skills": {"basic": {"completed": True}}},
+            {"student_id": "s2", "skills": {"vectors": {"completed": True}}},
+        ]
+
+        awarded = engine.award_cohort(
+            [ProgressChange(cohort[0], skills=["basic"]), ProgressChange(cohort[1])]
+        )
+
+        assert awarded == {"s1": ["first_steps"]}
+        assert "badges" not in cohort[1]
+
+
+class TestPathwayIndex:
+    """Test the pathway index, per-event tracker and class heatmap."""
+
+    def test_tracker_updates_only_containing_pathways(self):
+        """Test per-event pathway progress against calculate_progress."""
+        tree = build_branching_tree()
+        tree.create_pathway("matrix_track", ["basic", "matrices"])
+        progress = {"skills": {"basic": {"completed": True}}}
+        tracker = tree.create_pathway_tracker(progress)
+
+        progress["skills"]["vectors"] = {"completed": True}
+        changed = tracker.record_completion("vectors")
+
+        assert list(changed) == ["algebra_track"]
+        assert changed["algebra_track"]["completed"] == 2
+        assert tracker.record_completion("vectors") == {}
+        assert (
+            tracker.progress() == tree.calculate_progress(progress)["pathway_progress"]
+        )
+
+    def test_heatmap_and_next_nodes(self):
+        """Test batch progress of all students in all pathways."""
+        tree = build_branching_tree()
+        tree.create_pathway("matrix_track", ["basic", "matrices"])
+        cohort = [
+            {"student_id": "s1", "skills": {"basic": {"completed": True}}},
+            {
+                "student_id": "s2",
+                "skills": {
+                    "basic": {"completed": True},
+                    "matrices": {"completed": True},
+                },
+            },
+        ]
+
+        heatmap = tree.pathway_heatmap(cohort)
+
+        assert heatmap.pathways == ["algebra_track", "matrix_track"]
+        assert heatmap.completed == [[1, 1], [1, 2]]
+        assert heatmap.pathway_averages()["matrix_track"] == pytest.approx(75.0)
+        assert tree.pathway_heatmap(cohort, ["matrix_track"]).totals == [2]
+
+        index = PathwayIndex.for_tree(tree.compile())
+        assert index.pathways_of("basic") == ["algebra_track", "matrix_track"]
+        assert index.next_nodes(cohort[1]) == {
+            "algebra_track": "vectors",
+            "matrix_track": None,
+        }
+
+
+class TestLearningStats:
+    """Test incremental learning velocity and completion-time statistics."""
+
+    def test_recorded_progress_matches_full_recomputation(self):
+        """Test running statistics against the full history scan."""
+        tree = build_branching_tree()
+        progress = {"skills": {"basic": {"completed": True, "time_spent": 40}}}
+        dates = ["2024-01-01T10:00:00", "2024-01-03", "2024-01-20", "2024-02-01"]
+
+        for skill_id, date in zip(["basic", "vectors", "matrices", "eigen"], dates):
+            tree.record_skill_progress(
+                progress,
+                skill_id,
+                completed=True,
+                completion_date=date,
+                time_spent=30,
+            )
+
+        stats = learning_stats(progress)
+        assert stats["completed"] == 4
+        assert stats["time_spent"] == 120
+        assert stats["completion_times"] == sorted(stats["completion_times"])
+        assert verify_learning_stats(progress)
+        assert tree.calculate_progress(progress)["learning_velocity"] == (
+            full_learning_velocity(progress)
+        )
+        assert tree._estimate_completion_time(progress)["remaining_nodes"] == 0
+        with pytest.raises(ValueError, match="Unknown skill"):
+            tree.record_skill_progress(progress, "missing", completed=True)
+
+    def test_stale_statistics_fall_back_to_records(self):
+        """Test that records added by other code are still counted."""
+        tree = build_branching_tree()
+        progress = {}
+        tree.record_skill_progress(
+            progress, "basic", completed=True, completion_date="2024-01-01"
+        )
+        progress["skills"]["vectors"] = {
+            "completed": True,
+            "completion_date": "2024-03-01",
+        }
+
+        assert learning_stats(progress) is None
+        velocity = tree.calculate_progress(progress)["learning_velocity"]
+        assert velocity["total_completed"] == 2
+        assert backfill_learning_stats([progress]) == 1
+        assert verify_learning_stats(progress)
+
+    def test_in_place_completion(self):
+        """Test completing an existing record through and outside the API."""
+        tree = build_branching_tree()
+        progress = {}
+        tree.record_skill_progress(progress, "basic", time_spent=20)
+        tree.record_skill_progress(progress, "vectors", time_spent=10)
+
+        # Completing an existing record through the frontier keeps statistics
+        frontier = tree.create_unlock_frontier(progress)
+        frontier.complete_skill("basic", completion_date="2024-01-01")
+        assert learning_stats(progress)["completed"] == 1
+        assert verify_learning_stats(progress)
+
+        # Direct edits need a forced backfill
+        progress["skills"]["vectors"].update(
+            completed=True, completion_date="2024-01-15"
+        )
+        assert not verify_learning_stats(progress)
+        assert backfill_learning_stats([progress]) == 0
+        assert backfill_learning_stats([progress], force=True) == 1
+        assert verify_learning_stats(progress)
+        assert learning_stats(progress)["completed"] == 2
+        velocity = tree.calculate_progress(progress)["learning_velocity"]
+        assert velocity["total_completed"] == 2
+
+
+class TestPacingSimulation:
+    """Test the Monte Carlo what-if simulator."""
+
+    def test_unlock_order_follows_tree_rules(self):
+        """Test time-to-unlock distributions against prerequisites and XP."""
+        tree = build_branching_tree()
+        result = tree.simulate(students=200, days=120, seed=7)
+
+        distributions = result.time_to_unlock()
+        assert distributions["basic"]["max"] == 0.0
+        assert distributions["vectors"]["min"] > 0
+        assert distributions["eigen"]["min"] > distributions["vectors"]["min"]
+
+        unlocked = ~np.isnan(result.unlock_day)
+        completed = ~np.isnan(result.completion_day)
+        assert not (completed & ~unlocked).any()
+        assert (result.unlock_day[completed] <= result.completion_day[completed]).all()
+        assert result.unsimulated_nodes == ["eigen"]
+
+    def test_xp_gate_is_reported_as_bottleneck(self):
+        """Test that an unreachable XP requirement dominates the bottlenecks."""
+        tree = build_branching_tree()
+        tree.nodes["matrices"].xp_required = 10**6
+        tree.invalidate_caches()
+
+        summary = tree.simulate(students=100, days=60, seed=1).to_dict()
+
+        bottleneck = summary["bottlenecks"][0]
+        assert bottleneck["node_id"] == "matrices"
+        assert bottleneck["reason"] == "xp"
+        assert bottleneck["never_unlocked_fraction"] == 1.0
+        assert summary["nodes"]["eigen"]["unlocked_fraction"] == 0.0
+
+
+class TestLazySkillTree:
+    """Test lazily materialized trees over the binary format."""
+
+    @pytest.fixture
+    def saved_tree(self, tmp_path):
+        tree = build_branching_tree()
+        tree.add_node(
+            SkillNode(
+                id="statistics",
+                name="Statistics",
+                description="Descriptive statistics",
+                level=SkillLevel.APPLICATION,
+                xp_required=100,
+                prerequisites=["basic"],
+                learning_objectives=[
+                    LearningObjective("lo1", "Compute a mean", "apply")
+                ],
+            )
+        )
+        tree.add_badge(
+            Badge(
+                id="eigen_badge",
+                name="Eigen Expert",
+                description="Eigenvalues",
+                criteria="Complete the eigenvalues skill",
+                xp_value=50,
+                unlock_requirements=["eigen"],
+            )
+        )
+        path = tmp_path / "catalog.sktr"
+        tree.save(str(path), detached_details=True)
+        return tree, str(path)
+
+    def test_detached_details_round_trip(self, saved_tree):
+        """Test that eager loading reads detached node details."""
+        tree, path = saved_tree
+
+        loaded = SkillTree.load(path)
+
+        assert [node.to_dict() for node in loaded.nodes.values()] == [
+            node.to_dict() for node in tree.nodes.values()
+        ]
+
+    def test_nodes_are_decoded_on_access(self, saved_tree):
+        """Test that graph queries use the skeleton without decoding nodes."""
+        tree, path = saved_tree
+
+        with SkillTree.open_lazy(path) as lazy:
+            assert len(lazy) == 5 and "eigen" in lazy
+            assert lazy.prerequisites("eigen") == ["vectors", "matrices"]
+            assert lazy.dependents("basic") == ["vectors", "matrices", "statistics"]
+            assert lazy.level_of("eigen") == SkillLevel.SYNTHESIS
+            assert lazy.prerequisite_closure(["eigen"]) == [
+                "basic",
+                "vectors",
+                "matrices",
+                "eigen",
+            ]
+            assert lazy.materialized == 0
+
+            node = lazy.nodes["statistics"]
+            assert node.to_dict() == tree.nodes["statistics"].to_dict()
+            assert lazy.nodes["statistics"] is node
+            assert lazy.materialized == 1
+
+            with pytest.raises(KeyError):
+                lazy.prerequisites("missing")
+
+    def test_subtree_materializes_only_the_scope(self, saved_tree):
+        """Test a course-scoped view built from a pathway."""
+        tree, path = saved_tree
+
+        with SkillTree.open_lazy(path) as lazy:
+            course = lazy.subtree(pathways=["algebra_track"])
+            assert lazy.materialized == 4
+
+        assert list(course.nodes) == ["basic", "vectors", "matrices", "eigen"]
+        assert course.pathways == tree.pathways
+        assert course.levels == {1: ["basic"], 2: ["vectors", "matrices"], 4: ["eigen"]}
+        assert course.categories == tree.categories
+        assert list(course.badges) == ["eigen_badge"]
+        progress = {"total_xp": 200, "skills": {"basic": {"completed": True}}}
+        available = [node.id for node in tree.get_available_nodes(progress)]
+        assert [node.id for node in course.get_available_nodes(progress)] == [
+            node_id for node_id in available if node_id != "statistics"
+        ]
+
+        with SkillTree.open_lazy(path) as lazy:
+            basics = lazy.subtree(["statistics"])
+        assert list(basics.nodes) == ["basic", "statistics"]
+        assert basics.pathways == {} and basics.badges == {}
+
+
+class TestTreeVersioning:
+    """Test content-addressed tree versions and structural diffs."""
+
+    def test_version_identifies_content(self):
+        """Test that equal content gives equal versions across trees."""
+        tree = build_branching_tree()
+        version = tree.content_version
+
+        assert build_branching_tree().content_version == version
+        assert tree.compact().content_version == version
+        assert tree.get_static_visualization()["tree_version"] == version
+
+        tree.nodes["vectors"].xp_required = 120
+        tree.invalidate_caches()
+        assert tree.content_version != version
+
+    def test_incremental_updates_match_full_digest(self):
+        """Test that add_node/add_badge/create_pathway keep the digest current."""
+        tree = build_branching_tree()
+        tree.content_version
+        tree.add_node(
+            SkillNode(
+                id="statistics",
+                name="Statistics",
+                description="Descriptive statistics",
+                level=SkillLevel.APPLICATION,
+                xp_required=100,
+                prerequisites=["basic"],
+            )
+        )
+        tree.add_badge(
+            Badge(
+                id="stats_badge",
+                name="Statistician",
+                description="Statistics",
+                criteria="Complete statistics",
+                xp_value=20,
+            )
+        )
+        tree.create_pathway("stats_track", ["basic", "statistics"])
+        incremental = tree.content_version
+
+        tree.invalidate_caches()
+        assert tree.content_version == incremental
+
+    def test_diff_reports_structural_changes(self):
+        """Test node, edge, badge and pathway changes between versions."""
+        tree = build_branching_tree()
+        snapshot = tree.snapshot()
+
+        tree.nodes["eigen"].prerequisites.remove("matrices")
+        tree.nodes["vectors"].name = "Vector Spaces"
+        del tree.nodes["matrices"]
+        tree.pathways["algebra_track"]["nodes"] = ["basic", "eigen"]
+        tree.invalidate_caches()
+        tree.add_node(
+            SkillNode(
+                id="statistics",
+                name="Statistics",
+                description="Descriptive statistics",
+                level=SkillLevel.APPLICATION,
+                xp_required=100,
+                prerequisites=["basic"],
+            )
+        )
+
+        diff = tree.diff(snapshot)
+
+        assert diff.old_version == snapshot.version
+        assert diff.new_version == tree.content_version
+        assert diff.added_nodes == ["statistics"]
+        assert diff.removed_nodes == ["matrices"]
+        assert diff.changed_nodes == ["vectors", "eigen"]
+        assert diff.added_edges == [("basic", "statistics")]
+        assert diff.removed_edges == [("basic", "matrices"), ("matrices", "eigen")]
+        assert diff.changed_pathways == ["algebra_track"]
+        assert tree.diff(tree).is_empty
@@ -0,0 +1,103 @@
+"""
+Unit tests for the gamification engine XP curves.
+"""
+
+import numpy as np
+
+from src.gamification_engine.core.player_profile import (
+    MathematicalSpecialization,
+    PlayerProfileManager,
+)
+from src.gamification_engine.core.xp_curves import (
+    engine_level,
+    engine_level_array,
+    engine_level_threshold,
+    skill_cumulative_xp,
+    skill_level_for_xp,
+    skill_total_xp,
+    skill_total_xp_array,
+    skill_xp_between,
+    skill_xp_requirement,
+)
+
+
+def looped_engine_level(total_xp):
+    """Reference: the level-by-level loop of GamificationEngine."""
+    level = 1
+    xp_needed = 0
+    while total_xp >= xp_needed:
+        level += 1
+        xp_needed += level * 100
+    return level - 1
+
+
+def powered_requirement(level):
+    """Reference: the per-level pow of Skill.calculate_xp_requirement."""
+    return 0 if level <= 1 else int(100 * 1.1 ** (level - 1))
+
+
+class TestEngineCurve:
+    """Test the closed-form engine level inverse."""
+
+    def test_matches_level_loop(self):
+        """Test levels around every threshold and for negative totals."""
+        totals = [-50, 0, 1, 99.5]
+        for level in range(1, 60):
+            threshold = engine_level_threshold(level)
+            totals.extend([threshold - 1, threshold, threshold + 1])
+
+        for total in totals:
+            assert engine_level(total) == looped_engine_level(total)
+
+    def test_array_matches_scalar(self):
+        """Test the roster variant, including values beyond float precision."""
+        totals = [-1, 0, 199, 200, 123456, 10**15 + 7, 2**53 + 1]
+
+        levels = engine_level_array(np.array(totals))
+
+        assert levels.tolist() == [engine_level(total) for total in totals]
+
+
+class TestSkillCurve:
+    """Test the tabulated skill XP curve."""
+
+    def test_tables_match_pow_curve(self):
+        """Test requirements, prefix sums and differences against the pow."""
+        for level in range(-1, 150):
+            assert skill_xp_requirement(level) == powered_requirement(level)
+            assert skill_cumulative_xp(level) == sum(
+                powered_requirement(i) for i in range(1, level + 1)
+            )
+        assert skill_xp_between(10, 25) == sum(
+            powered_requirement(i) for i in range(11, 26)
+        )
+        assert skill_total_xp(0, 40) == 40
+
+    def test_level_for_xp_inverts_cumulative_table(self):
+        """Test the bisection lookup at and around table entries."""
+        for level in range(1, 100):
+            total = skill_cumulative_xp(level)
+            assert skill_level_for_xp(total) == level
+            assert skill_level_for_xp(total - 1) == max(level - 1, 1)
+
+    def test_roster_totals(self):
+        """Test vectorized totals against profile-by-profile totals."""
+        manager = PlayerProfileManager()
+        for i in range(5):
+            manager.create_player(
+                f"s{i}", f"Student {i}", MathematicalSpecialization.ENGINEER
+            )
+        skill_ids = list(manager.profiles["s0"].skills)
+        for i, profile in enumerate(manager.profiles.values()):
+            for j, skill_id in enumerate(skill_ids):
+                profile.skills[skill_id].current_level = (i * 7 + j * 3) % 40
+                profile.skills[skill_id].current_xp = i + j
+
+        manager.refresh_totals()
+
+        for profile in manager.profiles.values():
+            assert profile.total_xp == profile.calculate_total_xp()
+            assert profile.total_levels == profile.calculate_total_level()
+        assert skill_total_xp_array([0, 1, 30], [5, 5, 5]).tolist() == [
+            skill_total_xp(level, 5) for level in (0, 1, 30)
+        ]